@@ -644,6 +644,11 @@ class MaiBotMain:
 
     def create_main_system(self):
         """创建MainSystem实例"""
+        if global_config and global_config.debug.enable_import_profiler:
+            from src.common.lazy_import import import_profiler
+
+            import_profiler.install()
+
         from src.main import MainSystem
 
         self.main_system = MainSystem()
@@ -689,6 +694,13 @@ class MaiBotMain:
         await main_system.initialize()
         self._emit_component_summary()
 
+        # 输出启动阶段的模块导入耗时报告
+        if global_config and global_config.debug.enable_import_profiler:
+            from src.common.lazy_import import import_profiler
+
+            import_profiler.uninstall()
+            import_profiler.log_report(global_config.debug.import_profiler_top_n)
+
         # 显示彩蛋
         EasterEgg.show()
 
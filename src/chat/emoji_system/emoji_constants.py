@@ -3,4 +3,5 @@ import os
 BASE_DIR = os.path.join("data")
 EMOJI_DIR = os.path.join(BASE_DIR, "emoji")
 EMOJI_REGISTERED_DIR = os.path.join(BASE_DIR, "emoji_registed")
+EMOJI_VECTOR_FILE = os.path.join(BASE_DIR, "emoji_embeddings.npz")  # 表情包描述嵌入
 MAX_EMOJI_FOR_PROMPT = 20
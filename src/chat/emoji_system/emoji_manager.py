@@ -24,6 +24,7 @@ from src.chat.emoji_system.emoji_utils import (
     clear_temp_emoji,
     list_image_files,
 )
+from src.chat.emoji_system.emoji_vector_index import EmojiVectorIndex
 from src.chat.utils.utils_image import get_image_manager, image_path_to_base64
 from src.common.database.api.crud import CRUDBase
 from src.common.database.compatibility import get_db_session
@@ -51,6 +52,8 @@ class EmojiManager:
 
         self._scan_task = None
         self._emoji_index: dict[str, MaiEmoji] = {}
+        self._vector_index = EmojiVectorIndex()
+        self._vector_index_task: asyncio.Task | None = None
         self._integrity_yield_every = 50
         self._integrity_cursor = 0
         self._integrity_batch_size = 500
@@ -78,6 +81,8 @@ class EmojiManager:
         if self._scan_task and not self._scan_task.done():
             self._scan_task.cancel()
             logger.info("表情包扫描任务已取消")
+        if self._vector_index_task and not self._vector_index_task.done():
+            self._vector_index_task.cancel()
 
     def initialize(self) -> None:
         """初始化数据库连接和表情目录"""
@@ -121,6 +126,9 @@ class EmojiManager:
         """
         根据文本内容，使用LLM选择一个合适的表情包。
 
+        启用嵌入预筛时，先按描述嵌入的相似度选出少量候选再交给LLM；
+        最佳候选的相似度足够高且明显领先时直接选择，不调用LLM。
+
         Args:
             text_emotion (str): LLM希望表达的情感或意图的文本描述。
 
@@ -140,14 +148,38 @@ class EmojiManager:
             # 2. 根据全局配置决定候选表情包的数量
             if global_config is None:
                 raise RuntimeError("Global config is not initialized")
-            max_candidates = global_config.emoji.max_context_emojis
+            emoji_config = global_config.emoji
+            max_candidates = emoji_config.max_context_emojis
+
+            # 优先按描述嵌入的相似度预筛候选，相似度优势足够明显时直接选择
+            candidate_emojis: list[MaiEmoji] | None = None
+            if emoji_config.enable_embedding_prefilter:
+                ranked = await self._rank_emojis_by_embedding(
+                    text_emotion, all_emojis, emoji_config.embedding_candidate_count
+                )
+                if ranked:
+                    best_emoji, best_score = ranked[0]
+                    runner_up_score = ranked[1][1] if len(ranked) > 1 else -1.0
+                    if (
+                        best_score >= emoji_config.embedding_direct_pick_similarity
+                        and best_score - runner_up_score >= emoji_config.embedding_direct_pick_margin
+                    ):
+                        await self.record_usage(best_emoji.hash)
+                        logger.info(
+                            f"嵌入相似度直接选中表情包: {best_emoji.description} "
+                            f"(相似度 {best_score:.3f}, 领先 {best_score - runner_up_score:.3f}), "
+                            f"耗时: {(time.time() - _time_start):.2f}s"
+                        )
+                        return best_emoji.full_path, f"[表情包：{best_emoji.description}]", text_emotion
+                    candidate_emojis = [emoji for emoji, _ in ranked]
 
-            # 如果配置为0或者大于等于总数，则选择所有表情包
-            if max_candidates <= 0 or max_candidates >= len(all_emojis):
-                candidate_emojis = all_emojis
-            else:
-                # 否则，从所有表情包中随机抽取指定数量
-                candidate_emojis = random.sample(all_emojis, max_candidates)
+            if candidate_emojis is None:
+                # 如果配置为0或者大于等于总数，则选择所有表情包
+                if max_candidates <= 0 or max_candidates >= len(all_emojis):
+                    candidate_emojis = all_emojis
+                else:
+                    # 否则，从所有表情包中随机抽取指定数量
+                    candidate_emojis = random.sample(all_emojis, max_candidates)
 
             # 确保候选列表不为空
             if not candidate_emojis:
@@ -215,6 +247,41 @@ class EmojiManager:
             logger.error(traceback.format_exc())
             return None
 
+    async def _rank_emojis_by_embedding(
+        self, text_emotion: str, emojis: list[MaiEmoji], top_k: int
+    ) -> list[tuple[MaiEmoji, float]] | None:
+        """按描述嵌入与情感文本的相似度排序表情包
+
+        只在已索引的表情包中排序，其余表情包在后台补全索引；
+        没有任何已索引的表情包时返回 None 以回退到随机抽取。
+        """
+        if self._vector_index.needs_build(emojis):
+            self._schedule_vector_index_build()
+        indexed = [emoji for emoji in emojis if self._vector_index.is_indexed(emoji)]
+        if not indexed:
+            return None
+        return await self._vector_index.search(text_emotion, indexed, top_k)
+
+    def _schedule_vector_index_build(self) -> None:
+        """在后台为尚未索引的表情包生成描述嵌入"""
+        if global_config is None or not global_config.emoji.enable_embedding_prefilter:
+            return
+        if self._vector_index_task and not self._vector_index_task.done():
+            return
+
+        async def _build():
+            emojis = [e for e in self.emoji_objects if not e.is_deleted and e.description]
+            added = await self._vector_index.add_emojis(emojis)
+            if added:
+                logger.info(f"[嵌入索引] 已为 {added} 个表情包生成描述嵌入 (共 {len(self._vector_index)} 个)")
+
+        self._vector_index_task = asyncio.create_task(_build())
+
+    async def _index_new_emoji(self, emoji: MaiEmoji) -> None:
+        """注册新表情包时生成描述嵌入"""
+        if global_config is not None and global_config.emoji.enable_embedding_prefilter:
+            await self._vector_index.add_emojis([emoji])
+
     async def check_emoji_file_integrity(self) -> None:
         """检查表情包文件完整性
         遍历self.emoji_objects中的所有对象，检查文件是否存在
@@ -276,6 +343,7 @@ class EmojiManager:
                 for e in objects_to_remove:
                     if e.hash in self._emoji_index:
                         self._emoji_index.pop(e.hash, None)
+                    self._vector_index.remove(e.hash)
 
             self._integrity_cursor = (start + processed) % max(1, len(self.emoji_objects))
 
@@ -358,6 +426,7 @@ class EmojiManager:
             self.emoji_objects = emoji_objects
             self.emoji_num = len(emoji_objects)
             self._emoji_index = {e.hash: e for e in emoji_objects if getattr(e, "hash", None)}
+            self._schedule_vector_index_build()
 
             logger.info(f"[数据库] 加载完成: 共加载 {self.emoji_num} 个表情包记录。")
             if load_errors > 0:
@@ -514,6 +583,7 @@ class EmojiManager:
                 # 从emoji_objects列表中移除该对象
                 self.emoji_objects = [e for e in self.emoji_objects if e.hash != emoji_hash]
                 self._emoji_index.pop(emoji_hash, None)
+                self._vector_index.remove(emoji_hash)
                 # 更新计数
                 self.emoji_num -= 1
                 logger.info(f"[统计] 当前表情包数量: {self.emoji_num}")
@@ -598,6 +668,7 @@ class EmojiManager:
                             self.emoji_objects.append(new_emoji)
                             self._emoji_index[new_emoji.hash] = new_emoji
                             self.emoji_num += 1
+                            await self._index_new_emoji(new_emoji)
                             logger.info(f"[成功] 注册: {new_emoji.filename}")
                             return True
                         else:
@@ -844,6 +915,7 @@ class EmojiManager:
                     self.emoji_objects.append(new_emoji)
                     self._emoji_index[new_emoji.hash] = new_emoji
                     self.emoji_num += 1
+                    await self._index_new_emoji(new_emoji)
                     logger.info(f"[成功] 注册新表情包: {filename} (当前: {self.emoji_num}/{self.emoji_num_max})")
                     return True
                 else:
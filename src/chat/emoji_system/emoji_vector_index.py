@@ -0,0 +1,263 @@
+"""
+表情包描述向量索引
+
+表情包注册（或启动加载）时为其描述生成一次嵌入向量，保存在进程内的矩阵中，
+并按表情包哈希持久化到文件，重启后只需为新增或描述变化的表情包生成嵌入。
+选择表情包时只需为“想表达的情感”生成一次嵌入，即可通过余弦相似度取出最接近的候选。
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.chat.emoji_system.emoji_constants import EMOJI_VECTOR_FILE
+from src.common.logger import get_logger
+
+if TYPE_CHECKING:
+    from src.chat.emoji_system.emoji_entities import MaiEmoji
+    from src.llm_models.utils_model import LLMRequest
+
+logger = get_logger("emoji")
+
+EMBEDDING_BATCH_SIZE = 32  # 单次批量生成嵌入的描述数量
+QUERY_CACHE_SIZE = 256  # 缓存的情感文本嵌入数量
+FAILED_RETRY_SECONDS = 600  # 生成嵌入失败的表情包在该时间内不再重试
+BUILD_BACKOFF_BASE = 60  # 构建失败后暂停构建的基础时间（秒），连续失败时翻倍
+BUILD_BACKOFF_MAX = 1800
+
+
+class EmojiVectorIndex:
+    """按表情包哈希索引的描述嵌入（已归一化）"""
+
+    def __init__(self):
+        self._vectors: dict[str, np.ndarray] = {}
+        self._descriptions: dict[str, str] = {}  # 生成嵌入时使用的描述，描述变化时需要重新生成
+        self._matrix: np.ndarray | None = None
+        self._matrix_hashes: list[str] = []
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._embedding_model: "LLMRequest | None" = None
+        self._build_lock = asyncio.Lock()
+        self._retry_after: dict[str, float] = {}  # 生成嵌入失败的表情包哈希 -> 可重试时间
+        self._build_failures = 0
+        self._build_retry_after = 0.0
+        self._loaded = False  # 是否已从文件加载持久化的嵌入
+        self._dirty = False  # 内存中的嵌入是否有未持久化的变化
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def is_indexed(self, emoji: "MaiEmoji") -> bool:
+        """表情包是否已有与当前描述一致的嵌入"""
+        return self._descriptions.get(emoji.hash) == emoji.description
+
+    def needs_build(self, emojis: list["MaiEmoji"]) -> bool:
+        """是否有表情包需要（且当前允许）生成嵌入"""
+        now = time.time()
+        if now < self._build_retry_after:
+            return False
+        return any(self._is_pending(e, now) for e in emojis)
+
+    def _is_pending(self, emoji: "MaiEmoji", now: float) -> bool:
+        return (
+            bool(emoji.hash and emoji.description)
+            and not self.is_indexed(emoji)
+            and self._retry_after.get(emoji.hash, 0.0) <= now
+        )
+
+    async def add_emojis(self, emojis: list["MaiEmoji"]) -> int:
+        """为尚未索引（或描述已变化）的表情包批量生成嵌入
+
+        生成失败的批次记录重试时间，并让整体构建按指数退避暂停，
+        避免嵌入模型不可用时每次选择表情包都重新请求全部嵌入。
+
+        Returns:
+            int: 新增索引的表情包数量
+        """
+        async with self._build_lock:
+            if not self._loaded:
+                await self._load()
+            now = time.time()
+            if now < self._build_retry_after:
+                return 0
+            pending = [e for e in emojis if self._is_pending(e, now)]
+            added = 0
+            for start in range(0, len(pending), EMBEDDING_BATCH_SIZE):
+                batch = pending[start : start + EMBEDDING_BATCH_SIZE]
+                vectors = await self._embed([e.description for e in batch])
+                if vectors is None:
+                    failed_at = time.time()
+                    for emoji in batch:
+                        self._retry_after[emoji.hash] = failed_at + FAILED_RETRY_SECONDS
+                    backoff = min(BUILD_BACKOFF_BASE * 2**self._build_failures, BUILD_BACKOFF_MAX)
+                    self._build_failures += 1
+                    self._build_retry_after = failed_at + backoff
+                    logger.warning(f"表情包描述嵌入生成失败，{backoff}s 内暂停构建索引")
+                    break
+                self._build_failures = 0
+                if self._vectors and next(iter(self._vectors.values())).shape != vectors[0].shape:
+                    # 嵌入模型变化导致维度不一致，旧向量全部作废
+                    logger.info("表情包嵌入维度发生变化，重建向量索引")
+                    self._vectors.clear()
+                    self._descriptions.clear()
+                    self._query_cache.clear()
+                for emoji, vector in zip(batch, vectors):
+                    self._vectors[emoji.hash] = vector
+                    self._descriptions[emoji.hash] = emoji.description
+                    self._retry_after.pop(emoji.hash, None)
+                    added += 1
+                self._matrix = None
+                self._dirty = True
+            if self._dirty:
+                await self._save()
+            return added
+
+    def remove(self, emoji_hash: str) -> None:
+        """移除表情包的嵌入"""
+        self._retry_after.pop(emoji_hash, None)
+        if self._vectors.pop(emoji_hash, None) is not None:
+            self._descriptions.pop(emoji_hash, None)
+            self._matrix = None
+            self._dirty = True  # 下次构建索引时一并写回文件
+
+    async def _load(self) -> None:
+        """从文件加载持久化的嵌入，嵌入模型变化时丢弃"""
+        self._loaded = True
+        try:
+            loaded = await asyncio.to_thread(self._read_file, self._model_key())
+        except Exception as e:
+            logger.warning(f"加载表情包嵌入文件失败，将重新生成: {e}")
+            return
+        if not loaded:
+            return
+        for emoji_hash, description, vector in loaded:
+            self._vectors.setdefault(emoji_hash, vector)
+            self._descriptions.setdefault(emoji_hash, description)
+        self._matrix = None
+        logger.info(f"[嵌入索引] 从文件加载了 {len(loaded)} 个表情包描述嵌入")
+
+    async def _save(self) -> None:
+        """把当前全部嵌入写入文件（在线程中写入，先写临时文件再替换）"""
+        hashes = list(self._vectors.keys())
+        descriptions = [self._descriptions[h] for h in hashes]
+        vectors = [self._vectors[h] for h in hashes]
+        try:
+            await asyncio.to_thread(self._write_file, self._model_key(), hashes, descriptions, vectors)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"保存表情包嵌入文件失败: {e}")
+
+    @staticmethod
+    def _model_key() -> str:
+        """嵌入模型标识，模型变化后旧嵌入不可复用"""
+        from src.config.config import model_config
+
+        if model_config is None:
+            return ""
+        return ",".join(model_config.model_task_config.embedding.model_list)
+
+    @staticmethod
+    def _read_file(model_key: str) -> list[tuple[str, str, np.ndarray]]:
+        if not os.path.exists(EMOJI_VECTOR_FILE):
+            return []
+        with np.load(EMOJI_VECTOR_FILE, allow_pickle=False) as data:
+            if str(data["model"]) != model_key:
+                logger.info("嵌入模型已变化，忽略已保存的表情包嵌入")
+                return []
+            matrix = data["vectors"]
+            return [
+                (str(h), str(d), matrix[i].copy())
+                for i, (h, d) in enumerate(zip(data["hashes"], data["descriptions"]))
+            ]
+
+    @staticmethod
+    def _write_file(model_key: str, hashes: list[str], descriptions: list[str], vectors: list[np.ndarray]) -> None:
+        os.makedirs(os.path.dirname(EMOJI_VECTOR_FILE), exist_ok=True)
+        tmp_path = f"{EMOJI_VECTOR_FILE}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                model=np.array(model_key),
+                hashes=np.array(hashes, dtype=str),
+                descriptions=np.array(descriptions, dtype=str),
+                vectors=np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32),
+            )
+        os.replace(tmp_path, EMOJI_VECTOR_FILE)
+
+    async def search(self, text: str, emojis: list["MaiEmoji"], top_k: int) -> list[tuple["MaiEmoji", float]] | None:
+        """在给定表情包中按与 text 的余弦相似度排序，返回前 top_k 个
+
+        Returns:
+            list | None: (表情包, 相似度) 列表；无法生成查询嵌入时返回 None
+        """
+        query = await self._embed_query(text)
+        if query is None:
+            return None
+
+        matrix, row_of = self._get_matrix()
+        rows = [row_of[e.hash] for e in emojis if e.hash in row_of]
+        if not rows:
+            return []
+        if matrix.shape[1] != query.shape[0]:
+            logger.warning("情感文本嵌入与表情包嵌入维度不一致，跳过嵌入预筛")
+            return None
+
+        scores = matrix[rows] @ query
+        k = min(top_k, len(rows)) if top_k > 0 else len(rows)
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(-scores[top])]
+
+        emoji_by_hash = {e.hash: e for e in emojis}
+        return [(emoji_by_hash[self._matrix_hashes[rows[i]]], float(scores[i])) for i in top]
+
+    def _get_matrix(self) -> tuple[np.ndarray, dict[str, int]]:
+        if self._matrix is None:
+            self._matrix_hashes = list(self._vectors.keys())
+            self._matrix = (
+                np.stack([self._vectors[h] for h in self._matrix_hashes])
+                if self._matrix_hashes
+                else np.zeros((0, 0), dtype=np.float32)
+            )
+        return self._matrix, {h: i for i, h in enumerate(self._matrix_hashes)}
+
+    async def _embed_query(self, text: str) -> np.ndarray | None:
+        cached = self._query_cache.get(text)
+        if cached is not None:
+            self._query_cache.move_to_end(text)
+            return cached
+
+        vectors = await self._embed([text])
+        if vectors is None:
+            return None
+        self._query_cache[text] = vectors[0]
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return vectors[0]
+
+    async def _embed(self, texts: list[str]) -> list[np.ndarray] | None:
+        """批量生成归一化嵌入，失败时返回 None"""
+        try:
+            if self._embedding_model is None:
+                from src.config.config import model_config
+                from src.llm_models.utils_model import LLMRequest
+
+                assert model_config is not None
+                self._embedding_model = LLMRequest(
+                    model_set=model_config.model_task_config.embedding, request_type="emoji.embedding"
+                )
+
+            embeddings, _ = await self._embedding_model.get_embedding(texts)
+            array = np.asarray(embeddings, dtype=np.float32)
+            if array.ndim != 2 or array.shape[0] != len(texts):
+                logger.warning(f"表情包嵌入结果格式异常: {array.shape}")
+                return None
+
+            norms = np.linalg.norm(array, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            return list(array / norms)
+        except Exception as e:
+            logger.warning(f"生成表情包描述嵌入失败: {e}")
+            return None
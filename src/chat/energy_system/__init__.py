@@ -12,6 +12,7 @@ from .energy_manager import (
     InterestEnergyCalculator,
     RecencyEnergyCalculator,
     RelationshipEnergyCalculator,
+    RunningAggregate,
     energy_manager,
 )
 
@@ -24,5 +25,6 @@ __all__ = [
     "InterestEnergyCalculator",
     "RecencyEnergyCalculator",
     "RelationshipEnergyCalculator",
+    "RunningAggregate",
     "energy_manager",
 ]
@@ -3,12 +3,14 @@
 提供稳定、高效的聊天流能量计算和管理功能
 """
 
+import inspect
 import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import Awaitable
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, TypedDict, cast
+from typing import Any, ClassVar, TypedDict, cast
 
 from src.common.database.api.crud import CRUDBase
 from src.common.logger import get_logger
@@ -67,8 +69,54 @@ class EnergyResult(TypedDict):
     cached: bool
 
 
+class RunningAggregate:
+    """按消息键记录贡献值的运行聚合，支持增删单条消息并维护总和与最大值"""
+
+    __slots__ = ("_max", "total", "values")
+
+    def __init__(self) -> None:
+        self.values: dict[str, float] = {}
+        self.total = 0.0
+        self._max: float | None = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, key: str, value: float) -> None:
+        self.remove(key)
+        self.values[key] = value
+        self.total += value
+        if self._max is not None and value > self._max:
+            self._max = value
+
+    def remove(self, key: str) -> None:
+        value = self.values.pop(key, None)
+        if value is None:
+            return
+        if self.values:
+            self.total -= value
+        else:
+            self.total = 0.0  # 清空时归零，避免浮点误差累积
+        if self._max is not None and value >= self._max:
+            self._max = None
+
+    @property
+    def max_value(self) -> float:
+        """最大贡献值，移除当前最大值后惰性重算"""
+        if self._max is None:
+            self._max = max(self.values.values(), default=0.0)
+        return self._max
+
+
 class EnergyCalculator(ABC):
-    """能量计算器抽象基类"""
+    """能量计算器抽象基类
+
+    基于消息累计的计算器可以将 ``incremental`` 设为 True 并实现增量接口：
+    管理器为每个聊天流保存 ``create_state`` 创建的状态，只把新增、移出或内容变化的消息
+    通过 ``add_message`` / ``remove_message`` 交给计算器，再调用 ``score`` 得到能量值。
+    """
+
+    incremental: ClassVar[bool] = False
 
     @abstractmethod
     def calculate(self, context: "EnergyContext") -> float | Awaitable[float]:
@@ -80,33 +128,55 @@ class EnergyCalculator(ABC):
         """获取权重"""
         pass
 
+    def create_state(self) -> Any:
+        """创建单个聊天流的增量状态"""
+        return None
+
+    def add_message(self, state: Any, key: str, message: Any) -> None:
+        """消息进入窗口（或内容变化后重新加入）"""
+
+    def remove_message(self, state: Any, key: str) -> None:
+        """消息移出窗口（或内容变化前先移除旧贡献）"""
+
+    def score(self, state: Any, context: "EnergyContext") -> float | Awaitable[float]:
+        """根据增量状态计算能量值，默认退回全量计算"""
+        return self.calculate(context)
+
+    def _calculate_by_state(self, context: "EnergyContext") -> float:
+        """用增量接口对整个消息列表做一次全量计算"""
+        state = self.create_state()
+        for index, msg in enumerate(context.get("messages", [])):
+            self.add_message(state, str(index), msg)
+        return cast(float, self.score(state, context))
+
 
 class InterestEnergyCalculator(EnergyCalculator):
     """兴趣度能量计算器"""
 
+    incremental = True
+
     def calculate(self, context: "EnergyContext") -> float:
         """基于消息兴趣度计算能量"""
-        messages = context.get("messages", [])
-        if not messages:
-            return 0.3
+        return self._calculate_by_state(context)
+
+    def create_state(self) -> RunningAggregate:
+        return RunningAggregate()
+
+    def add_message(self, state: RunningAggregate, key: str, message: Any) -> None:
+        interest_value = getattr(message, "interest_value", None)
+        if isinstance(interest_value, int | float) and 0.0 <= interest_value <= 1.0:
+            state.add(key, float(interest_value))
+
+    def remove_message(self, state: RunningAggregate, key: str) -> None:
+        state.remove(key)
 
+    def score(self, state: RunningAggregate, context: "EnergyContext") -> float:
         # 计算平均兴趣度
-        total_interest = 0.0
-        valid_messages = 0
-
-        for msg in messages:
-            interest_value = getattr(msg, "interest_value", None)
-            if isinstance(interest_value, int | float):
-                if 0.0 <= interest_value <= 1.0:
-                    total_interest += interest_value
-                    valid_messages += 1
-
-        if valid_messages > 0:
-            avg_interest = total_interest / valid_messages
-            logger.debug(f"平均消息兴趣度: {avg_interest:.3f} (基于 {valid_messages} 条消息)")
-            return avg_interest
-        else:
+        if not state:
             return 0.3
+        avg_interest = state.total / len(state)
+        logger.debug(f"平均消息兴趣度: {avg_interest:.3f} (基于 {len(state)} 条消息)")
+        return avg_interest
 
     def get_weight(self) -> float:
         return 0.5
@@ -115,27 +185,34 @@ class InterestEnergyCalculator(EnergyCalculator):
 class ActivityEnergyCalculator(EnergyCalculator):
     """活跃度能量计算器"""
 
+    incremental = True
+
     def __init__(self):
         self.action_weights = {"reply": 0.4, "react": 0.3, "mention": 0.2, "other": 0.1}
 
     def calculate(self, context: "EnergyContext") -> float:
         """基于活跃度计算能量"""
-        messages = context.get("messages", [])
-        if not messages:
-            return 0.2
+        return self._calculate_by_state(context)
 
-        total_score = 0.0
-        max_possible_score = len(messages) * 0.4  # 最高可能分数
+    def create_state(self) -> RunningAggregate:
+        return RunningAggregate()
 
-        for msg in messages:
-            actions = getattr(msg, "actions", [])
-            if isinstance(actions, list) and actions:
-                for action in actions:
-                    weight = self.action_weights.get(action, self.action_weights["other"])
-                    total_score += weight
+    def add_message(self, state: RunningAggregate, key: str, message: Any) -> None:
+        # 没有动作的消息也计入条数（贡献为 0），用于计算最高可能分数
+        message_score = 0.0
+        actions = getattr(message, "actions", [])
+        if isinstance(actions, list) and actions:
+            for action in actions:
+                message_score += self.action_weights.get(action, self.action_weights["other"])
+        state.add(key, message_score)
 
+    def remove_message(self, state: RunningAggregate, key: str) -> None:
+        state.remove(key)
+
+    def score(self, state: RunningAggregate, context: "EnergyContext") -> float:
+        max_possible_score = len(state) * 0.4  # 最高可能分数
         if max_possible_score > 0:
-            activity_score = min(1.0, total_score / max_possible_score)
+            activity_score = min(1.0, state.total / max_possible_score)
             logger.debug(f"活跃度分数: {activity_score:.3f}")
             return activity_score
         else:
@@ -148,20 +225,27 @@ class ActivityEnergyCalculator(EnergyCalculator):
 class RecencyEnergyCalculator(EnergyCalculator):
     """最近性能量计算器"""
 
+    incremental = True
+
     def calculate(self, context: "EnergyContext") -> float:
         """基于最近性计算能量"""
-        messages = context.get("messages", [])
-        if not messages:
-            return 0.1
+        return self._calculate_by_state(context)
 
-        # 获取最新消息时间
-        latest_time = 0.0
-        for msg in messages:
-            msg_time = getattr(msg, "time", None)
-            if msg_time and msg_time > latest_time:
-                latest_time = msg_time
+    def create_state(self) -> RunningAggregate:
+        return RunningAggregate()
 
-        if latest_time == 0.0:
+    def add_message(self, state: RunningAggregate, key: str, message: Any) -> None:
+        msg_time = getattr(message, "time", None)
+        if msg_time:
+            state.add(key, float(msg_time))
+
+    def remove_message(self, state: RunningAggregate, key: str) -> None:
+        state.remove(key)
+
+    def score(self, state: RunningAggregate, context: "EnergyContext") -> float:
+        # 获取最新消息时间
+        latest_time = state.max_value
+        if latest_time <= 0.0:
             return 0.1
 
         # 计算时间衰减
@@ -193,7 +277,16 @@ class RecencyEnergyCalculator(EnergyCalculator):
 
 
 class RelationshipEnergyCalculator(EnergyCalculator):
-    """关系能量计算器 - 基于聊天流兴趣度"""
+    """关系能量计算器 - 基于聊天流兴趣度
+
+    聊天流兴趣分数变化很慢，按流缓存一段时间，避免每次计算能量都查询数据库。
+    """
+
+    SCORE_TTL: ClassVar[float] = 300.0  # 兴趣分数缓存时间（秒）
+    MAX_CACHED_STREAMS: ClassVar[int] = 1024
+
+    def __init__(self) -> None:
+        self._scores: OrderedDict[str, tuple[float, float]] = OrderedDict()  # stream_id -> (分数, 写入时间)
 
     async def calculate(self, context: "EnergyContext") -> float:
         """基于聊天流兴趣度计算能量"""
@@ -201,7 +294,24 @@ class RelationshipEnergyCalculator(EnergyCalculator):
         if not stream_id:
             return 0.3
 
-        # 从数据库获取聊天流兴趣分数
+        now = time.time()
+        cached = self._scores.get(stream_id)
+        if cached is not None and now - cached[1] < self.SCORE_TTL:
+            return cached[0]
+
+        interest_score = await self._load_score(stream_id)
+        self._scores[stream_id] = (interest_score, now)
+        self._scores.move_to_end(stream_id)
+        # 按写入时间有序，从头部淘汰过期或超量的条目
+        while self._scores:
+            _, written_at = next(iter(self._scores.values()))
+            if len(self._scores) <= self.MAX_CACHED_STREAMS and now - written_at < self.SCORE_TTL:
+                break
+            self._scores.popitem(last=False)
+        return interest_score
+
+    async def _load_score(self, stream_id: str) -> float:
+        """从数据库获取聊天流兴趣分数"""
         try:
 
             from src.common.database.core.models import ChatStreams
@@ -222,23 +332,51 @@ class RelationshipEnergyCalculator(EnergyCalculator):
             logger.warning(f"获取聊天流兴趣度失败，使用默认值: {e}")
             return 0.3  # 默认基础分
 
+    def invalidate(self, stream_id: str) -> None:
+        """失效指定流的兴趣分数缓存"""
+        self._scores.pop(stream_id, None)
+
     def get_weight(self) -> float:
         return 0.1
 
 
+@dataclass
+class _RegisteredCalculator:
+    """注册时解析好的计算器调用方式"""
+
+    calculator: EnergyCalculator
+    name: str
+    incremental: bool
+    is_async: bool
+
+
+@dataclass
+class _StreamEnergyState:
+    """单个聊天流的增量计算状态"""
+
+    fingerprints: dict[str, tuple] = field(default_factory=dict)  # 消息键 -> 消息指纹
+    calculator_states: list[Any] = field(default_factory=list)  # 与注册的计算器一一对应
+
+
 class EnergyManager:
     """能量管理器 - 统一管理所有能量计算"""
 
+    MAX_TRACKED_STREAMS = 1024  # 保留增量状态的聊天流数量上限
+
     def __init__(self) -> None:
-        self.calculators: list[EnergyCalculator] = [
+        self.calculators: list[EnergyCalculator] = []
+        self._registry: list[_RegisteredCalculator] = []
+        self._stream_states: OrderedDict[str, _StreamEnergyState] = OrderedDict()
+        for calculator in (
             InterestEnergyCalculator(),
             ActivityEnergyCalculator(),
             RecencyEnergyCalculator(),
             RelationshipEnergyCalculator(),
-        ]
+        ):
+            self._register(calculator)
 
-        # 能量缓存
-        self.energy_cache: dict[str, tuple[float, float]] = {}  # stream_id -> (energy, timestamp)
+        # 能量缓存，按写入时间排序，过期清理只需从头部弹出
+        self.energy_cache: OrderedDict[str, tuple[float, float]] = OrderedDict()  # stream_id -> (energy, timestamp)
         self.cache_ttl: int = 60  # 1分钟缓存
 
         # AFC阈值配置
@@ -289,14 +427,12 @@ class EnergyManager:
         self.stats["total_calculations"] = cast(int, self.stats["total_calculations"]) + 1
 
         # 检查缓存
-        if stream_id in self.energy_cache:
-            cached_energy, cached_time = self.energy_cache[stream_id]
-            if time.time() - cached_time < self.cache_ttl:
-                self.stats["cache_hits"] = cast(int, self.stats["cache_hits"]) + 1
-                logger.debug(f"使用缓存能量: {stream_id} = {cached_energy:.3f}")
-                return cached_energy
-        else:
-            self.stats["cache_misses"] = cast(int, self.stats["cache_misses"]) + 1
+        cached = self.energy_cache.get(stream_id)
+        if cached is not None and start_time - cached[1] < self.cache_ttl:
+            self.stats["cache_hits"] = cast(int, self.stats["cache_hits"]) + 1
+            logger.debug(f"使用缓存能量: {stream_id} = {cached[0]:.3f}")
+            return cached[0]
+        self.stats["cache_misses"] = cast(int, self.stats["cache_misses"]) + 1
 
         # 构建计算上下文
         context: EnergyContext = {
@@ -305,59 +441,57 @@ class EnergyManager:
             "user_id": user_id,
         }
 
+        # 只把新增、移出或变化的消息交给增量计算器
+        stream_state = self._sync_stream_state(stream_id, messages)
+
         # 计算各组件能量
         component_scores: dict[str, float] = {}
+        component_weights: dict[str, float] = {}
         total_weight = 0.0
 
-        for calculator in self.calculators:
+        for index, entry in enumerate(self._registry):
+            calculator = entry.calculator
             try:
-                # 支持同步和异步计算器
-                if callable(calculator.calculate):
-                    import inspect
-
-                    if inspect.iscoroutinefunction(calculator.calculate):
-                        score = await calculator.calculate(context)
-                    else:
-                        score = calculator.calculate(context)
+                if entry.incremental:
+                    result = calculator.score(stream_state.calculator_states[index], context)
                 else:
-                    score = calculator.calculate(context)
+                    result = calculator.calculate(context)
+                score = await cast(Awaitable[float], result) if entry.is_async else result
 
                 weight = calculator.get_weight()
 
                 # 确保 score 是 float 类型
                 if not isinstance(score, int | float):
-                    logger.warning(
-                        f"计算器 {calculator.__class__.__name__} 返回了非数值类型: {type(score)}，跳过此组件"
-                    )
+                    logger.warning(f"计算器 {entry.name} 返回了非数值类型: {type(score)}，跳过此组件")
                     continue
 
-                component_scores[calculator.__class__.__name__] = float(score)
+                component_scores[entry.name] = float(score)
+                component_weights[entry.name] = weight
                 total_weight += weight
 
-                logger.debug(f"{calculator.__class__.__name__} 能量: {score:.3f} (权重: {weight:.3f})")
+                logger.debug(f"{entry.name} 能量: {score:.3f} (权重: {weight:.3f})")
 
             except Exception as e:
-                logger.warning(f"计算 {calculator.__class__.__name__} 能量失败: {e}")
+                logger.warning(f"计算 {entry.name} 能量失败: {e}")
 
         # 加权计算总能量
         if total_weight > 0:
-            total_energy = 0.0
-            for calculator in self.calculators:
-                if calculator.__class__.__name__ in component_scores:
-                    score = component_scores[calculator.__class__.__name__]
-                    weight = calculator.get_weight()
-                    total_energy += score * (weight / total_weight)
+            total_energy = sum(
+                score * (component_weights[name] / total_weight) for name, score in component_scores.items()
+            )
         else:
             total_energy = 0.5
 
         # 应用阈值调整和变换
         final_energy = self._apply_threshold_adjustment(total_energy)
 
-        # 缓存结果
-        self.energy_cache[stream_id] = (final_energy, time.time())
+        # 缓存结果（移到末尾保持按时间排序）
+        now = time.time()
+        self.energy_cache[stream_id] = (final_energy, now)
+        self.energy_cache.move_to_end(stream_id)
 
         # 清理过期缓存
-        self._cleanup_cache()
+        self._cleanup_cache(now)
 
         # 更新平均计算时间
         calculation_time = time.time() - start_time
@@ -372,6 +506,63 @@ class EnergyManager:
         )
         return final_energy
 
+    @staticmethod
+    def _message_key(message: Any) -> str:
+        message_id = getattr(message, "message_id", None)
+        return str(message_id) if message_id else f"obj:{id(message)}"
+
+    @staticmethod
+    def _message_fingerprint(message: Any) -> tuple:
+        """影响能量计算的消息字段，字段变化时重新计入该消息"""
+        actions = getattr(message, "actions", None)
+        return (
+            getattr(message, "interest_value", None),
+            tuple(actions) if isinstance(actions, list) else actions,
+            getattr(message, "time", None),
+        )
+
+    def _sync_stream_state(self, stream_id: str, messages: list[Any]) -> _StreamEnergyState:
+        """将聊天流的增量状态与当前消息窗口对齐"""
+        state = self._stream_states.get(stream_id)
+        if state is None:
+            state = _StreamEnergyState(
+                calculator_states=[
+                    entry.calculator.create_state() if entry.incremental else None for entry in self._registry
+                ]
+            )
+            self._stream_states[stream_id] = state
+            while len(self._stream_states) > self.MAX_TRACKED_STREAMS:
+                self._stream_states.popitem(last=False)
+        self._stream_states.move_to_end(stream_id)
+
+        old_fingerprints = state.fingerprints
+        new_fingerprints: dict[str, tuple] = {}
+        removed: list[str] = []
+        added: list[tuple[str, Any]] = []
+        for message in messages:
+            key = self._message_key(message)
+            fingerprint = self._message_fingerprint(message)
+            new_fingerprints[key] = fingerprint
+            previous = old_fingerprints.get(key)
+            if previous is None:
+                added.append((key, message))
+            elif previous != fingerprint:
+                removed.append(key)
+                added.append((key, message))
+        removed.extend(key for key in old_fingerprints if key not in new_fingerprints)
+        state.fingerprints = new_fingerprints
+
+        if removed or added:
+            for index, entry in enumerate(self._registry):
+                if not entry.incremental:
+                    continue
+                calculator_state = state.calculator_states[index]
+                for key in removed:
+                    entry.calculator.remove_message(calculator_state, key)
+                for key, message in added:
+                    entry.calculator.add_message(calculator_state, key, message)
+        return state
+
     def _apply_threshold_adjustment(self, energy: float) -> float:
         """应用阈值调整和变换"""
         # 获取参考阈值
@@ -438,30 +629,34 @@ class EnergyManager:
 
     def invalidate_cache(self, stream_id: str) -> None:
         """失效指定流的缓存"""
+        for entry in self._registry:
+            if isinstance(entry.calculator, RelationshipEnergyCalculator):
+                entry.calculator.invalidate(stream_id)
         if stream_id in self.energy_cache:
             del self.energy_cache[stream_id]
             logger.debug(f"已清除聊天流 {stream_id} 的能量缓存")
 
-    def _cleanup_cache(self) -> None:
-        """清理过期缓存"""
-        current_time = time.time()
-        expired_keys = [
-            stream_id
-            for stream_id, (_, timestamp) in self.energy_cache.items()
-            if current_time - timestamp > self.cache_ttl
-        ]
-
-        for key in expired_keys:
-            del self.energy_cache[key]
-
-        if expired_keys:
-            logger.debug(f"清理了 {len(expired_keys)} 个过期能量缓存")
+    def _cleanup_cache(self, current_time: float | None = None) -> None:
+        """清理过期缓存（缓存按写入时间排序，从头部弹出到第一个未过期条目为止）"""
+        if current_time is None:
+            current_time = time.time()
+        expired = 0
+        while self.energy_cache:
+            _, timestamp = next(iter(self.energy_cache.values()))
+            if current_time - timestamp <= self.cache_ttl:
+                break
+            self.energy_cache.popitem(last=False)
+            expired += 1
+
+        if expired:
+            logger.debug(f"清理了 {expired} 个过期能量缓存")
 
     def get_statistics(self) -> dict[str, Any]:
         """获取统计信息"""
         return {
             "cache_size": len(self.energy_cache),
-            "calculators": [calc.__class__.__name__ for calc in self.calculators],
+            "tracked_streams": len(self._stream_states),
+            "calculators": [entry.name for entry in self._registry],
             "thresholds": self.thresholds,
             "performance_stats": self.stats.copy(),
         }
@@ -476,20 +671,39 @@ class EnergyManager:
 
         self.stats["last_threshold_update"] = time.time()
 
+    def _register(self, calculator: EnergyCalculator) -> None:
+        """注册计算器，并一次性确定其同步/异步调用方式"""
+        incremental = calculator.incremental
+        method = calculator.score if incremental else calculator.calculate
+        self._registry.append(
+            _RegisteredCalculator(
+                calculator=calculator,
+                name=calculator.__class__.__name__,
+                incremental=incremental,
+                is_async=inspect.iscoroutinefunction(method),
+            )
+        )
+        self.calculators.append(calculator)
+
     def add_calculator(self, calculator: EnergyCalculator) -> None:
         """添加计算器"""
-        self.calculators.append(calculator)
+        self._register(calculator)
+        # 已有的增量状态不含新计算器，下次计算时按完整窗口重建
+        self._stream_states.clear()
         logger.debug(f"添加能量计算器: {calculator.__class__.__name__}")
 
     def remove_calculator(self, calculator: EnergyCalculator) -> None:
         """移除计算器"""
         if calculator in self.calculators:
             self.calculators.remove(calculator)
+            self._registry = [entry for entry in self._registry if entry.calculator is not calculator]
+            self._stream_states.clear()
             logger.debug(f"移除能量计算器: {calculator.__class__.__name__}")
 
     def clear_cache(self) -> None:
         """清空缓存"""
         self.energy_cache.clear()
+        self._stream_states.clear()
         logger.debug("清空能量缓存")
 
     def get_cache_hit_rate(self) -> float:
@@ -19,6 +19,8 @@ from src.common.logger import get_logger
 from src.config.config import global_config, model_config
 from src.llm_models.utils_model import LLMRequest
 
+from .expression_pool import expression_pool, expression_to_dict
+
 # 导入 StyleLearner 管理器
 from .style_learner import style_learner_manager
 
@@ -228,6 +230,7 @@ class ExpressionLearner:
                     from src.common.database.utils.decorators import generate_cache_key
                     cache = await get_cache()
                     await cache.delete(generate_cache_key("chat_expressions", self.chat_id))
+                    expression_pool.invalidate(self.chat_id)
                 else:
                     logger.debug(f"没有发现过期的表达方式（阈值：{expiration_days} 天）")
 
@@ -453,6 +456,7 @@ class ExpressionLearner:
                     offset += BATCH_SIZE
 
             if updated_count > 0 or deleted_count > 0:
+                expression_pool.clear()
                 logger.info(f"全局衰减完成：更新了 {updated_count} 个表达方式，删除了 {deleted_count} 个表达方式")
 
         except Exception as e:
@@ -534,6 +538,7 @@ class ExpressionLearner:
 
         # 存储到数据库 Expression 表
         CRUDBase(Expression)
+        learned_styles: dict[str, list[dict[str, Any]]] = {}  # chat_id -> 写入后的全部 style 表达方式
         for chat_id, expr_list in chat_dict.items():
             async with get_db_session() as session:
                 # 🔥 优化：批量查询所有现有表达方式，避免N次数据库查询
@@ -630,6 +635,8 @@ class ExpressionLearner:
 
                 # 提交数据库更改
                 await session.commit()
+                if type == "style":
+                    learned_styles[chat_id] = [expression_to_dict(expr) for expr in exact_match_map.values()]
 
         # 🔥 优化：只在实际有更新时才清除缓存（移到外层，避免重复清除）
         if chat_dict:  # 只有当有数据更新时才清除缓存
@@ -641,6 +648,10 @@ class ExpressionLearner:
             related_chat_ids = self.get_related_chat_ids()
             for related_id in related_chat_ids:
                 await cache.delete(generate_cache_key("chat_expressions", related_id))
+                expression_pool.invalidate(related_id, keep_style_index=True)
+            # style 倒排索引按差异增量更新，无需重建
+            for learned_chat_id, learned_exprs in learned_styles.items():
+                expression_pool.update_style_index(learned_chat_id, learned_exprs)
             if len(related_chat_ids) > 1:
                 logger.debug(f"已清除共享组内 {len(related_chat_ids)} 个 chat_id 的表达方式缓存")
 
@@ -675,7 +686,7 @@ class ExpressionLearner:
 
                     # 保存模型
                     if total_samples > 0:
-                        if learner.save(style_learner_manager.model_save_path):
+                        if await learner.save_async(style_learner_manager.model_save_path):
                             logger.debug(f"StyleLearner 模型保存成功: {target_chat_id}")
                         else:
                             logger.error(f"StyleLearner 模型保存失败: {target_chat_id}")
@@ -0,0 +1,418 @@
+"""
+表达方式内存池
+按共享组（相关 chat_id 集合）缓存 style / grammar 表达方式，避免每次构建回复都全表读取。
+学习、删除等写入后按 chat_id 失效；使用次数更新直接就地修改权重。
+加权抽样使用树状数组（Fenwick tree），无放回抽取 k 个的开销为 O(k log n)。
+
+另外按 chat_id 维护 style 文本的字符 n-gram 倒排索引，模糊匹配只需对 n-gram 重叠最多的少量候选
+计算精确相似度；学习时按差异增量更新索引。
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter, OrderedDict
+from typing import Any
+
+from sqlalchemy import select
+
+from src.common.database.compatibility import get_db_session
+from src.common.database.core.models import Expression
+from src.common.logger import get_logger
+
+logger = get_logger("expression_pool")
+
+EXPRESSION_TYPES = ("style", "grammar")
+MAX_EXPRESSION_COUNT = 5.0  # 表达方式使用次数上限，与数据库更新保持一致
+
+
+def expression_to_dict(expr: Expression) -> dict[str, Any]:
+    """将 Expression 记录转换为池中使用的字典"""
+    return {
+        "situation": expr.situation,
+        "style": expr.style,
+        "count": expr.count,
+        "last_active_time": expr.last_active_time,
+        "source_id": expr.chat_id,
+        "type": expr.type,
+        "create_date": expr.create_date if expr.create_date is not None else expr.last_active_time,
+    }
+
+
+class FenwickSampler:
+    """基于树状数组的加权抽样器，支持 O(log n) 修改权重与抽样"""
+
+    def __init__(self, weights: list[float]):
+        self._n = len(weights)
+        self._weights = [max(float(w), 0.0) for w in weights]
+        # O(n) 建树
+        self._tree = [0.0] * (self._n + 1)
+        for i, weight in enumerate(self._weights, 1):
+            self._tree[i] += weight
+            parent = i + (i & -i)
+            if parent <= self._n:
+                self._tree[parent] += self._tree[i]
+        self._top_bit = 1 << (self._n.bit_length() - 1) if self._n else 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def get(self, index: int) -> float:
+        return self._weights[index]
+
+    def update(self, index: int, weight: float) -> None:
+        """修改第 index 个元素的权重"""
+        weight = max(float(weight), 0.0)
+        delta = weight - self._weights[index]
+        if delta == 0.0:
+            return
+        self._weights[index] = weight
+        i = index + 1
+        while i <= self._n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def total(self) -> float:
+        """权重总和"""
+        result = 0.0
+        i = self._n
+        while i > 0:
+            result += self._tree[i]
+            i -= i & -i
+        return result
+
+    def _find(self, target: float) -> int:
+        """找到前缀和首次超过 target 的下标"""
+        pos = 0
+        step = self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self._n and self._tree[nxt] <= target:
+                pos = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return min(pos, self._n - 1)
+
+    def sample(self, k: int, rng: random.Random | None = None) -> list[int]:
+        """
+        按权重无放回抽取 k 个下标
+
+        抽中的元素权重临时置零，抽样结束后恢复，因此不会改变抽样器状态。
+        权重全部为零（或剩余元素权重为零）时，剩余名额均匀抽取。
+        """
+        rng = rng or random
+        k = min(k, self._n)
+        if k <= 0:
+            return []
+
+        picked: list[int] = []
+        saved: list[tuple[int, float]] = []
+        try:
+            while len(picked) < k:
+                total = self.total()
+                if total <= 1e-12:
+                    break
+                index = self._find(rng.random() * total)
+                if self._weights[index] <= 0.0:
+                    # 浮点误差落在零权重元素上，重新抽取
+                    continue
+                picked.append(index)
+                saved.append((index, self._weights[index]))
+                self.update(index, 0.0)
+        finally:
+            for index, weight in saved:
+                self.update(index, weight)
+
+        if len(picked) < k:
+            chosen = set(picked)
+            rest = [i for i in range(self._n) if i not in chosen]
+            picked.extend(rng.sample(rest, k - len(picked)))
+        return picked
+
+
+class StyleNgramIndex:
+    """单个 chat_id 的 style 文本字符 n-gram 倒排索引"""
+
+    NGRAM_SIZE = 2
+
+    def __init__(self):
+        self._entries: dict[int, dict[str, Any]] = {}  # 条目ID -> 表达方式
+        self._entry_ids: dict[tuple[str, str], int] = {}  # (situation, style) -> 条目ID
+        self._postings: dict[str, set[int]] = {}  # n-gram -> 条目ID集合
+        self._exact: dict[str, set[int]] = {}  # 小写 style -> 条目ID集合
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def ngrams(cls, text: str) -> set[str]:
+        """提取字符 n-gram，文本短于 n 时使用整个文本"""
+        n = cls.NGRAM_SIZE
+        if len(text) < n:
+            return {text} if text else set()
+        return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+    def add(self, expr: dict[str, Any]) -> None:
+        """添加或替换一个表达方式"""
+        key = (expr["situation"], expr["style"])
+        if key in self._entry_ids:
+            self._entries[self._entry_ids[key]].update(expr)
+            return
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = expr
+        self._entry_ids[key] = entry_id
+        style_lower = (expr["style"] or "").lower()
+        self._exact.setdefault(style_lower, set()).add(entry_id)
+        for gram in self.ngrams(style_lower):
+            self._postings.setdefault(gram, set()).add(entry_id)
+
+    def remove(self, key: tuple[str, str]) -> None:
+        """按 (situation, style) 移除表达方式"""
+        entry_id = self._entry_ids.pop(key, None)
+        if entry_id is None:
+            return
+        expr = self._entries.pop(entry_id)
+        style_lower = (expr["style"] or "").lower()
+        for bucket, index_key in [(self._exact, style_lower)] + [
+            (self._postings, gram) for gram in self.ngrams(style_lower)
+        ]:
+            ids = bucket.get(index_key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del bucket[index_key]
+
+    def sync(self, expressions: list[dict[str, Any]]) -> None:
+        """与最新的表达方式集合同步，只增删发生变化的条目"""
+        latest = {(expr["situation"], expr["style"]): expr for expr in expressions}
+        for key in [key for key in self._entry_ids if key not in latest]:
+            self.remove(key)
+        for expr in latest.values():
+            self.add(expr)
+
+    def get(self, key: tuple[str, str]) -> dict[str, Any] | None:
+        entry_id = self._entry_ids.get(key)
+        return None if entry_id is None else self._entries[entry_id]
+
+    def candidates(self, query_lower: str, limit: int) -> list[dict[str, Any]]:
+        """返回与查询 n-gram 重叠最多的至多 limit 个表达方式（完全相同的 style 总会包含在内）"""
+        if len(query_lower) < self.NGRAM_SIZE:
+            # 查询过短，没有可用的 n-gram，退化为全部条目
+            return list(self._entries.values())
+
+        overlap: Counter[int] = Counter()
+        for gram in self.ngrams(query_lower):
+            ids = self._postings.get(gram)
+            if ids:
+                overlap.update(ids)
+
+        exact_ids = self._exact.get(query_lower, set())
+        result = [self._entries[entry_id] for entry_id in exact_ids]
+        for entry_id, _ in overlap.most_common(limit + len(exact_ids)):
+            if len(result) >= limit:
+                break
+            if entry_id not in exact_ids:
+                result.append(self._entries[entry_id])
+        return result
+
+    def all_expressions(self) -> list[dict[str, Any]]:
+        return list(self._entries.values())
+
+
+class _ExpressionGroup:
+    """一个共享组内的表达方式及其抽样器"""
+
+    def __init__(self, expressions: list[dict[str, Any]]):
+        self.loaded_at = time.monotonic()
+        self.expressions: dict[str, list[dict[str, Any]]] = {expr_type: [] for expr_type in EXPRESSION_TYPES}
+        self.positions: dict[tuple[str, str, str, str], int] = {}
+        for expr in expressions:
+            items = self.expressions.get(expr["type"])
+            if items is None:
+                continue
+            self.positions[(expr["source_id"], expr["type"], expr["situation"], expr["style"])] = len(items)
+            items.append(expr)
+        self.samplers = {
+            expr_type: FenwickSampler([expr["count"] for expr in items])
+            for expr_type, items in self.expressions.items()
+        }
+
+
+class ExpressionPool:
+    """按共享组缓存的表达方式池"""
+
+    MAX_GROUPS = 256  # 最多缓存的共享组数量（LRU）
+    MAX_STYLE_INDEXES = 512  # 最多缓存的 style 倒排索引数量（按 chat_id，LRU）
+    TTL = 600.0  # 兜底过期时间（秒），与 chat_expressions 缓存一致
+
+    def __init__(self):
+        self._groups: OrderedDict[tuple[str, ...], _ExpressionGroup] = OrderedDict()
+        self._load_locks: dict[tuple[str, ...], asyncio.Lock] = {}
+        self._style_indexes: OrderedDict[str, StyleNgramIndex] = OrderedDict()
+        # 全部 chat_id 的 style 索引（回退查询用），独立于按 chat_id 的 LRU: (加载时间, 索引列表)
+        self._all_style_indexes: tuple[float, list[StyleNgramIndex]] | None = None
+        self._generation = 0  # 每次失效递增，加载期间发生失效时不缓存加载结果
+        self.stats = {"hits": 0, "loads": 0, "invalidations": 0}
+
+    @staticmethod
+    def _group_key(chat_ids: list[str]) -> tuple[str, ...]:
+        return tuple(sorted(set(chat_ids)))
+
+    async def _get_group(self, chat_ids: list[str]) -> _ExpressionGroup:
+        key = self._group_key(chat_ids)
+        group = self._groups.get(key)
+        if group is not None and time.monotonic() - group.loaded_at < self.TTL:
+            self._groups.move_to_end(key)
+            self.stats["hits"] += 1
+            return group
+
+        lock = self._load_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # 等待期间可能已被其他协程加载
+            group = self._groups.get(key)
+            if group is not None and time.monotonic() - group.loaded_at < self.TTL:
+                return group
+
+            generation = self._generation
+            async with get_db_session(read_only=True) as session:
+                result = await session.execute(
+                    select(Expression).where(
+                        (Expression.chat_id.in_(key)) & (Expression.type.in_(EXPRESSION_TYPES))
+                    )
+                )
+                group = _ExpressionGroup([expression_to_dict(expr) for expr in result.scalars()])
+            self.stats["loads"] += 1
+
+            if generation == self._generation:
+                self._groups[key] = group
+                self._groups.move_to_end(key)
+                while len(self._groups) > self.MAX_GROUPS:
+                    self._groups.popitem(last=False)
+        return group
+
+    async def get_expressions(self, chat_ids: list[str], expr_type: str) -> list[dict[str, Any]]:
+        """获取共享组内某一类型的全部表达方式（返回副本）"""
+        group = await self._get_group(chat_ids)
+        return [dict(expr) for expr in group.expressions.get(expr_type, [])]
+
+    async def sample(self, chat_ids: list[str], expr_type: str, k: int) -> list[dict[str, Any]]:
+        """按使用次数加权，从共享组内无放回抽取 k 个表达方式（返回副本）"""
+        if k <= 0:
+            return []
+        group = await self._get_group(chat_ids)
+        items = group.expressions.get(expr_type, [])
+        if len(items) <= k:
+            return [dict(expr) for expr in items]
+        return [dict(items[i]) for i in group.samplers[expr_type].sample(k)]
+
+    async def get_style_indexes(self, chat_ids: list[str]) -> list[StyleNgramIndex]:
+        """获取各 chat_id 的 style 倒排索引，缺失的索引一次性从数据库加载"""
+        missing = [chat_id for chat_id in dict.fromkeys(chat_ids) if chat_id not in self._style_indexes]
+        if missing:
+            generation = self._generation
+            loaded = {chat_id: StyleNgramIndex() for chat_id in missing}
+            async with get_db_session(read_only=True) as session:
+                result = await session.execute(
+                    select(Expression).where((Expression.chat_id.in_(missing)) & (Expression.type == "style"))
+                )
+                for expr in result.scalars():
+                    loaded[expr.chat_id].add(expression_to_dict(expr))
+
+            if generation == self._generation:
+                for chat_id, index in loaded.items():
+                    self._style_indexes.setdefault(chat_id, index)
+            else:
+                # 加载期间发生了失效，本次结果只用于当前查询
+                return [self._style_indexes.get(chat_id) or loaded[chat_id] for chat_id in chat_ids]
+
+        indexes = []
+        for chat_id in chat_ids:
+            self._style_indexes.move_to_end(chat_id)
+            indexes.append(self._style_indexes[chat_id])
+        while len(self._style_indexes) > self.MAX_STYLE_INDEXES:
+            self._style_indexes.popitem(last=False)
+        return indexes
+
+    async def get_all_style_indexes(self) -> list[StyleNgramIndex]:
+        """获取所有有 style 表达方式的 chat_id 的倒排索引（相关 chat_id 没有数据时的回退）
+
+        单独构建并整体缓存，不经过按 chat_id 的 LRU，避免回退查询把活跃聊天的索引挤出缓存；
+        任何失效或超过 TTL 后重新加载。
+        """
+        cached = self._all_style_indexes
+        if cached is not None and time.monotonic() - cached[0] < self.TTL:
+            return cached[1]
+
+        generation = self._generation
+        indexes: dict[str, StyleNgramIndex] = {}
+        async with get_db_session(read_only=True) as session:
+            result = await session.execute(select(Expression).where(Expression.type == "style"))
+            for expr in result.scalars():
+                indexes.setdefault(expr.chat_id, StyleNgramIndex()).add(expression_to_dict(expr))
+
+        all_indexes = list(indexes.values())
+        if generation == self._generation:
+            self._all_style_indexes = (time.monotonic(), all_indexes)
+        return all_indexes
+
+    def update_style_index(self, chat_id: str, expressions: list[dict[str, Any]]) -> None:
+        """学习写入后，用该 chat_id 最新的全部 style 表达方式增量更新其倒排索引（索引未加载时忽略）"""
+        index = self._style_indexes.get(chat_id)
+        if index is not None:
+            index.sync(expressions)
+
+    def apply_count_updates(self, keys: list[tuple[str, str, str, str]], increment: float, now: float) -> None:
+        """
+        将使用次数更新同步到已缓存的共享组，不触发重新加载
+
+        Args:
+            keys: (chat_id, type, situation, style) 列表
+            increment: 增加的次数
+            now: 最后活跃时间
+        """
+        for group in self._groups.values():
+            for key in keys:
+                index = group.positions.get(key)
+                if index is None:
+                    continue
+                expr = group.expressions[key[1]][index]
+                expr["count"] = min(expr["count"] + increment, MAX_EXPRESSION_COUNT)
+                expr["last_active_time"] = now
+                group.samplers[key[1]].update(index, expr["count"])
+
+        for chat_id, expr_type, situation, style in keys:
+            style_index = self._style_indexes.get(chat_id) if expr_type == "style" else None
+            expr = style_index.get((situation, style)) if style_index is not None else None
+            if expr is not None:
+                expr["count"] = min(expr["count"] + increment, MAX_EXPRESSION_COUNT)
+                expr["last_active_time"] = now
+
+    def invalidate(self, chat_id: str, keep_style_index: bool = False) -> None:
+        """
+        chat_id 的表达方式发生增删改后调用，移除包含它的共享组
+
+        Args:
+            chat_id: 聊天ID
+            keep_style_index: 是否保留 style 倒排索引（调用方随后会通过 update_style_index 增量更新）
+        """
+        self._generation += 1
+        self.stats["invalidations"] += 1
+        self._all_style_indexes = None
+        for key in [key for key in self._groups if chat_id in key]:
+            del self._groups[key]
+        if not keep_style_index:
+            self._style_indexes.pop(chat_id, None)
+
+    def clear(self) -> None:
+        """清空所有缓存（例如全局衰减之后）"""
+        self._generation += 1
+        self._groups.clear()
+        self._style_indexes.clear()
+        self._all_style_indexes = None
+
+
+# 全局单例
+expression_pool = ExpressionPool()
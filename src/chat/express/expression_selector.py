@@ -3,11 +3,12 @@ import hashlib
 import math
 import random
 import time
+from difflib import SequenceMatcher
 from typing import Any
 
 import orjson
 from json_repair import repair_json
-from sqlalchemy import select
+from sqlalchemy import case, tuple_, update
 
 from src.chat.utils.prompt import Prompt, global_prompt_manager
 from src.common.database.compatibility import get_db_session
@@ -16,12 +17,16 @@ from src.common.logger import get_logger
 from src.config.config import global_config, model_config
 from src.llm_models.utils_model import LLMRequest
 
+from .expression_pool import MAX_EXPRESSION_COUNT, FenwickSampler, expression_pool
+
 # 导入StyleLearner管理器和情境提取器
 from .situation_extractor import situation_extractor
 from .style_learner import style_learner_manager
 
 logger = get_logger("expression_selector")
 
+UPDATE_KEYS_PER_STATEMENT = 200  # 单条 UPDATE 的键数量上限（每个键 4 个参数，避免超出 SQLite 参数上限）
+
 
 def init_prompt():
     expression_evaluation_prompt = """
@@ -52,31 +57,29 @@ def init_prompt():
 
 
 def weighted_sample(population: list[dict], weights: list[float], k: int) -> list[dict]:
-    """按权重随机抽样"""
+    """按权重无放回随机抽样（树状数组，O(n + k log n)）"""
     if not population or not weights or k <= 0:
         return []
 
     if len(population) <= k:
         return population.copy()
 
-    # 使用累积权重的方法进行加权抽样
-    selected = []
-    population_copy = population.copy()
-    weights_copy = weights.copy()
+    return [population[i] for i in FenwickSampler(weights).sample(k)]
 
-    for _ in range(k):
-        if not population_copy:
-            break
 
-        # 选择一个元素
-        chosen_idx = random.choices(range(len(population_copy)), weights=weights_copy)[0]
-        selected.append(population_copy.pop(chosen_idx))
-        weights_copy.pop(chosen_idx)
-
-    return selected
+class ExpressionSelector:
+    FUZZY_CANDIDATES_PER_STYLE = 32  # 每个预测 style 计算精确相似度的候选数量
 
+    @staticmethod
+    def _style_similarity(predicted_style_lower: str, db_style_lower: str) -> float:
+        """预测 style 与已学习 style 的相似度：完全匹配 1.0，子串匹配 0.7，否则为 SequenceMatcher 比值"""
+        if predicted_style_lower == db_style_lower:
+            return 1.0
+        if len(predicted_style_lower) >= 2 and len(db_style_lower) >= 2:
+            if predicted_style_lower in db_style_lower or db_style_lower in predicted_style_lower:
+                return 0.7
+        return SequenceMatcher(None, predicted_style_lower, db_style_lower).ratio()
 
-class ExpressionSelector:
     @staticmethod
     def _sample_with_temperature(
         candidates: list[tuple[Any, float, float, str]],
@@ -197,46 +200,13 @@ class ExpressionSelector:
         # 支持多chat_id合并抽选
         related_chat_ids = self.get_related_chat_ids(chat_id)
 
-        # 使用CRUD查询（由于需要IN条件，使用session）
-        async with get_db_session() as session:
-            # 优化：一次性查询所有相关chat_id的表达方式
-            style_query = await session.execute(
-                select(Expression).where((Expression.chat_id.in_(related_chat_ids)) & (Expression.type == "style"))
-            )
-            grammar_query = await session.execute(
-                select(Expression).where((Expression.chat_id.in_(related_chat_ids)) & (Expression.type == "grammar"))
-            )
-
-            # 🔥 优化：提前定义转换函数，避免重复代码
-            def expr_to_dict(expr, expr_type: str) -> dict[str, Any]:
-                return {
-                    "situation": expr.situation,
-                    "style": expr.style,
-                    "count": expr.count,
-                    "last_active_time": expr.last_active_time,
-                    "source_id": expr.chat_id,
-                    "type": expr_type,
-                    "create_date": expr.create_date if expr.create_date is not None else expr.last_active_time,
-                }
-
-            style_exprs = [expr_to_dict(expr, "style") for expr in style_query.scalars()]
-            grammar_exprs = [expr_to_dict(expr, "grammar") for expr in grammar_query.scalars()]
-
-            style_num = int(total_num * style_percentage)
-            grammar_num = int(total_num * grammar_percentage)
-            # 按权重抽样（使用count作为权重）
-            if style_exprs:
-                style_weights = [expr.get("count", 1) for expr in style_exprs]
-                selected_style = weighted_sample(style_exprs, style_weights, style_num)
-            else:
-                selected_style = []
-            if grammar_exprs:
-                grammar_weights = [expr.get("count", 1) for expr in grammar_exprs]
-                selected_grammar = weighted_sample(grammar_exprs, grammar_weights, grammar_num)
-            else:
-                selected_grammar = []
+        # 从内存池按权重抽样（使用count作为权重），池未命中时一次性加载所有相关chat_id的表达方式
+        style_num = int(total_num * style_percentage)
+        grammar_num = int(total_num * grammar_percentage)
+        selected_style = await expression_pool.sample(related_chat_ids, "style", style_num)
+        selected_grammar = await expression_pool.sample(related_chat_ids, "grammar", grammar_num)
 
-            return selected_style, selected_grammar
+        return selected_style, selected_grammar
 
     @staticmethod
     async def update_expressions_count_batch(expressions_to_update: list[dict[str, Any]], increment: float = 0.1):
@@ -266,34 +236,38 @@ class ExpressionSelector:
         if not updates_by_key:
             return
 
-        # 🔥 优化：使用单个 session 批量处理所有更新
+        # 🔥 优化：按 (chat_id, type, situation, style) 元组 IN 条件批量 UPDATE，不再逐条 SELECT
         current_time = time.time()
+        new_count = Expression.count + increment
+        keys = list(updates_by_key)
         async with get_db_session() as session:
             updated_count = 0
-            for chat_id, expr_type, situation, style in updates_by_key:
-                query_result = await session.execute(
-                    select(Expression).where(
-                        (Expression.chat_id == chat_id)
-                        & (Expression.type == expr_type)
-                        & (Expression.situation == situation)
-                        & (Expression.style == style)
+            for start in range(0, len(keys), UPDATE_KEYS_PER_STATEMENT):
+                result = await session.execute(
+                    update(Expression)
+                    .where(
+                        tuple_(Expression.chat_id, Expression.type, Expression.situation, Expression.style).in_(
+                            keys[start : start + UPDATE_KEYS_PER_STATEMENT]
+                        )
                     )
+                    .values(
+                        count=case((new_count > MAX_EXPRESSION_COUNT, MAX_EXPRESSION_COUNT), else_=new_count),
+                        last_active_time=current_time,
+                    )
+                    .execution_options(synchronize_session=False)
                 )
-                expr_obj = query_result.scalar()
-                if expr_obj:
-                    current_count = expr_obj.count
-                    new_count = min(current_count + increment, 5.0)
-                    expr_obj.count = new_count
-                    expr_obj.last_active_time = current_time
-                    updated_count += 1
+                updated_count += result.rowcount or 0
 
             # 批量提交所有更改
             if updated_count > 0:
                 await session.commit()
                 logger.debug(f"批量更新了 {updated_count} 个表达方式的count值")
 
-        # 清除所有受影响的chat_id的缓存
-        if affected_chat_ids:
+        # 同步更新内存池中的权重
+        expression_pool.apply_count_updates(list(updates_by_key), increment, current_time)
+
+        # 清除所有受影响的chat_id的缓存（每个chat_id只清除一次）
+        if affected_chat_ids and updated_count > 0:
             from src.common.database.optimization.cache_manager import get_cache
             from src.common.database.utils.decorators import generate_cache_key
             cache = await get_cache()
@@ -485,122 +459,84 @@ class ExpressionSelector:
         related_chat_ids = self.get_related_chat_ids(chat_id)
         logger.debug(f"查询相关的chat_ids: {len(related_chat_ids)}个")
 
-        async with get_db_session() as session:
-            # 🔍 先检查数据库中实际有哪些 chat_id 的数据
-            db_chat_ids_result = await session.execute(
-                select(Expression.chat_id)
-                .where(Expression.type == "style")
-                .distinct()
-            )
-            db_chat_ids = list(db_chat_ids_result.scalars())
-            logger.debug(f"数据库中有表达方式的chat_ids: {len(db_chat_ids)}个")
-
-            # 获取所有相关 chat_id 的表达方式（用于模糊匹配）
-            all_expressions_result = await session.execute(
-                select(Expression)
-                .where(Expression.chat_id.in_(related_chat_ids))
-                .where(Expression.type == "style")
-            )
-            all_expressions = list(all_expressions_result.scalars())
-
-            logger.debug(f"配置的相关chat_id的表达方式数量: {len(all_expressions)}")
-
-            # 🔥 智能回退：如果相关 chat_id 没有数据，尝试查询所有 chat_id
-            if not all_expressions:
-                logger.debug("相关chat_id没有数据，尝试从所有chat_id查询")
-                all_expressions_result = await session.execute(
-                    select(Expression)
-                    .where(Expression.type == "style")
-                )
-                all_expressions = list(all_expressions_result.scalars())
-                logger.debug(f"数据库中所有表达方式数量: {len(all_expressions)}")
+        # 使用 style 的 n-gram 倒排索引（按 chat_id 缓存，学习时增量更新）生成候选
+        style_indexes = await expression_pool.get_style_indexes(related_chat_ids)
+        total_expressions = sum(len(index) for index in style_indexes)
+        logger.debug(f"配置的相关chat_id的表达方式数量: {total_expressions}")
 
-            if not all_expressions:
-                logger.warning("数据库中完全没有任何表达方式，需要先学习")
-                return []
+        # 🔥 智能回退：如果相关 chat_id 没有数据，尝试查询所有 chat_id
+        if not total_expressions:
+            logger.debug("相关chat_id没有数据，尝试从所有chat_id查询")
+            style_indexes = await expression_pool.get_all_style_indexes()
+            total_expressions = sum(len(index) for index in style_indexes)
+            logger.debug(f"数据库中所有表达方式数量: {total_expressions}")
 
-            # 🔥 优化：使用更高效的模糊匹配算法
-            from difflib import SequenceMatcher
-
-            # 预处理：提前计算所有预测 style 的小写版本，避免重复计算
-            predicted_styles_lower = [(s.lower(), score) for s, score in predicted_styles[:20]]
-
-            matched_expressions = []
-            for expr in all_expressions:
-                db_style = expr.style or ""
-                db_style_lower = db_style.lower()
-                max_similarity = 0.0
-                best_predicted = ""
-
-                # 与每个预测的style计算相似度
-                for predicted_style_lower, pred_score in predicted_styles_lower:
-                    # 快速检查：完全匹配
-                    if predicted_style_lower == db_style_lower:
-                        max_similarity = 1.0
-                        best_predicted = predicted_style_lower
-                        break
-
-                    # 快速检查：子串匹配
-                    if len(predicted_style_lower) >= 2 and len(db_style_lower) >= 2:
-                        if predicted_style_lower in db_style_lower or db_style_lower in predicted_style_lower:
-                            similarity = 0.7
-                            if similarity > max_similarity:
-                                max_similarity = similarity
-                                best_predicted = predicted_style_lower
-                            continue
-
-                    # 计算字符串相似度（较慢，只在必要时使用）
-                    similarity = SequenceMatcher(None, predicted_style_lower, db_style_lower).ratio()
-                    if similarity > max_similarity:
-                        max_similarity = similarity
-                        best_predicted = predicted_style_lower
-
-                # 🔥 降低阈值到30%，因为StyleLearner预测质量较差
-                if max_similarity >= 0.3:  # 30%相似度阈值
-                    matched_expressions.append((expr, max_similarity, expr.count, best_predicted))
-
-            if not matched_expressions:
-                # 收集数据库中的style样例用于调试
-                all_styles = [e.style for e in all_expressions[:10]]
-                logger.warning(
-                    f"数据库中没有找到匹配的表达方式（相似度阈值30%）:\n"
-                    f"  预测的style (前3个): {style_names}\n"
-                    f"  数据库中存在的style样例: {all_styles}\n"
-                    f"  提示: StyleLearner预测质量差，建议重新训练或使用classic模式"
-                )
-                return []
+        if not total_expressions:
+            logger.warning("数据库中完全没有任何表达方式，需要先学习")
+            return []
 
-            # 按照相似度*count排序，并根据温度采样，避免过度集中
-            matched_expressions.sort(key=lambda x: x[1] * (x[2] ** 0.5), reverse=True)
-            temperature = getattr(global_config.expression, "model_temperature", 0.0)
-            sampled_matches = self._sample_with_temperature(
-                candidates=matched_expressions,
-                max_num=max_num,
-                temperature=temperature,
+        # 预处理：提前计算所有预测 style 的小写版本，避免重复计算
+        predicted_styles_lower = [(s.lower(), score) for s, score in predicted_styles[:20]]
+
+        # 只对每个预测 style 的 n-gram 重叠最多的少量候选计算精确相似度
+        best_matches: dict[int, tuple[dict[str, Any], float, str]] = {}  # id(expr) -> (expr, 相似度, 最佳预测)
+        for predicted_style_lower, _ in predicted_styles_lower:
+            for index in style_indexes:
+                for expr in index.candidates(predicted_style_lower, self.FUZZY_CANDIDATES_PER_STYLE):
+                    similarity = self._style_similarity(predicted_style_lower, (expr["style"] or "").lower())
+                    previous = best_matches.get(id(expr))
+                    if previous is None or similarity > previous[1]:
+                        best_matches[id(expr)] = (expr, similarity, predicted_style_lower)
+
+        # 🔥 降低阈值到30%，因为StyleLearner预测质量较差
+        matched_expressions = [
+            (expr, similarity, expr["count"], best_predicted)
+            for expr, similarity, best_predicted in best_matches.values()
+            if similarity >= 0.3  # 30%相似度阈值
+        ]
+
+        if not matched_expressions:
+            # 收集数据库中的style样例用于调试
+            all_styles = [e["style"] for index in style_indexes[:3] for e in index.all_expressions()[:10]][:10]
+            logger.warning(
+                f"数据库中没有找到匹配的表达方式（相似度阈值30%）:\n"
+                f"  预测的style (前3个): {style_names}\n"
+                f"  数据库中存在的style样例: {all_styles}\n"
+                f"  提示: StyleLearner预测质量差，建议重新训练或使用classic模式"
             )
-            expressions_objs = [e[0] for e in sampled_matches]
+            return []
 
-            # 显示最佳匹配的详细信息
-            logger.debug(
-                f"模糊匹配成功: 找到 {len(expressions_objs)} 个表达方式 "
-                f"(候选 {len(matched_expressions)}，temperature={temperature})"
-            )
+        # 按照相似度*count排序，并根据温度采样，避免过度集中
+        matched_expressions.sort(key=lambda x: x[1] * (x[2] ** 0.5), reverse=True)
+        temperature = getattr(global_config.expression, "model_temperature", 0.0)
+        sampled_matches = self._sample_with_temperature(
+            candidates=matched_expressions,
+            max_num=max_num,
+            temperature=temperature,
+        )
+        expressions_objs = [e[0] for e in sampled_matches]
+
+        # 显示最佳匹配的详细信息
+        logger.debug(
+            f"模糊匹配成功: 找到 {len(expressions_objs)} 个表达方式 "
+            f"(候选 {len(matched_expressions)}，temperature={temperature})"
+        )
 
-            # 🔥 优化：使用列表推导式和预定义函数减少开销
-            expressions = [
-                {
-                    "situation": expr.situation or "",
-                    "style": expr.style or "",
-                    "type": expr.type or "style",
-                    "count": float(expr.count) if expr.count else 0.0,
-                    "last_active_time": expr.last_active_time or 0.0,
-                    "source_id": expr.chat_id  # 添加 source_id 以便后续更新
-                }
-                for expr in expressions_objs
-            ]
-
-            logger.debug(f"从数据库获取了 {len(expressions)} 个表达方式")
-            return expressions
+        # 🔥 优化：使用列表推导式和预定义函数减少开销
+        expressions = [
+            {
+                "situation": expr["situation"] or "",
+                "style": expr["style"] or "",
+                "type": expr["type"] or "style",
+                "count": float(expr["count"]) if expr["count"] else 0.0,
+                "last_active_time": expr["last_active_time"] or 0.0,
+                "source_id": expr["source_id"]  # 添加 source_id 以便后续更新
+            }
+            for expr in expressions_objs
+        ]
+
+        logger.debug(f"从表达方式索引获取了 {len(expressions)} 个表达方式")
+        return expressions
 
     async def select_suitable_expressions_llm(
         self,
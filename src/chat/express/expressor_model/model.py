@@ -4,6 +4,8 @@
 """
 import os
 import pickle
+import sys
+from array import array
 from collections import Counter, defaultdict
 
 from src.common.logger import get_logger
@@ -13,6 +15,8 @@ from .tokenizer import Tokenizer
 
 logger = get_logger("expressor.model")
 
+COMPACT_FORMAT_VERSION = 1  # 紧凑格式版本号
+
 
 class ExpressorModel:
     """直接使用朴素贝叶斯精排（可在线学习）"""
@@ -56,10 +60,7 @@ class ExpressorModel:
             self._situations[cid] = situation
 
         # 确保在nb模型中初始化该候选的计数
-        if cid not in self.nb.cls_counts:
-            self.nb.cls_counts[cid] = 0.0
-        if cid not in self.nb.token_counts:
-            self.nb.token_counts[cid] = defaultdict(float)
+        self.nb.add_class(cid)
 
     def remove_candidate(self, cid: str) -> bool:
         """
@@ -81,11 +82,7 @@ class ExpressorModel:
             del self._situations[cid]
 
         # 从nb模型中删除
-        if cid in self.nb.cls_counts:
-            del self.nb.cls_counts[cid]
-
-        if cid in self.nb.token_counts:
-            del self.nb.token_counts[cid]
+        self.nb.remove_class(cid)
 
         return removed
 
@@ -176,32 +173,111 @@ class ExpressorModel:
             result[cid] = (style, situation)
         return result
 
+    def snapshot(self) -> dict:
+        """
+        获取模型状态的快照（仅做浅拷贝，开销很小，需在修改模型的线程中调用）
+
+        快照可交给 encode_snapshot 在工作线程中编码，之后对模型的修改不会影响快照。
+        """
+        return {
+            "candidates": dict(self._candidates),
+            "situations": dict(self._situations),
+            "cls_counts": dict(self.nb.cls_counts),
+            "token_counts": {cid: dict(tc) for cid, tc in self.nb.token_counts.items()},
+            "alpha": self.nb.alpha,
+            "beta": self.nb.beta,
+            "gamma": self.nb.gamma,
+            "V": self.nb.V,
+            "scale": self.nb.scale,
+        }
+
+    @staticmethod
+    def encode_snapshot(snapshot: dict) -> dict:
+        """
+        将快照编码为紧凑格式
+
+        词项只在词表中出现一次，各类别的计数以 (词项下标 uint32 数组, 计数 float32 数组) 的字节串保存，
+        相比逐类别嵌套字典的 pickle 体积小得多，加载时也无需逐个反序列化浮点对象。
+        """
+        vocab: dict[str, int] = {}
+        classes = list(snapshot["token_counts"].keys())
+        rows: list[tuple[bytes, bytes]] = []
+        for cid in classes:
+            tc = snapshot["token_counts"][cid]
+            indices = array("I", (vocab.setdefault(term, len(vocab)) for term in tc))
+            counts = array("f", tc.values())
+            rows.append((indices.tobytes(), counts.tobytes()))
+
+        cls_ids = list(snapshot["cls_counts"].keys())
+        return {
+            "format": COMPACT_FORMAT_VERSION,
+            "candidates": snapshot["candidates"],
+            "situations": snapshot["situations"],
+            "nb_alpha": snapshot["alpha"],
+            "nb_beta": snapshot["beta"],
+            "nb_gamma": snapshot["gamma"],
+            "nb_V": snapshot["V"],
+            "nb_scale": snapshot["scale"],
+            "cls_ids": cls_ids,
+            "cls_counts": array("f", (snapshot["cls_counts"][cid] for cid in cls_ids)).tobytes(),
+            "vocab": list(vocab),
+            "classes": classes,
+            "rows": rows,
+        }
+
+    def restore(self, data: dict):
+        """
+        从紧凑格式或旧版 pickle 字典恢复模型
+
+        Args:
+            data: encode_snapshot 的结果，或旧版 save 写出的字典
+        """
+        self._candidates = data["candidates"]
+        self._situations = data["situations"]
+
+        # 恢复nb模型的参数
+        self.nb.alpha = data["nb_alpha"]
+        self.nb.beta = data["nb_beta"]
+        self.nb.gamma = data["nb_gamma"]
+        self.nb.V = data["nb_V"]
+
+        # 恢复统计数据
+        self.nb.token_counts = defaultdict(lambda: defaultdict(float))
+        if data.get("format") == COMPACT_FORMAT_VERSION:
+            cls_counts = array("f")
+            cls_counts.frombytes(data["cls_counts"])
+            self.nb.cls_counts = defaultdict(float, zip(data["cls_ids"], cls_counts.tolist()))
+
+            # 词项字符串驻留，各类别共享同一份字符串对象
+            vocab = [sys.intern(term) for term in data["vocab"]]
+            for cid, (index_bytes, count_bytes) in zip(data["classes"], data["rows"]):
+                indices = array("I")
+                indices.frombytes(index_bytes)
+                counts = array("f")
+                counts.frombytes(count_bytes)
+                self.nb.token_counts[cid] = defaultdict(float, zip(map(vocab.__getitem__, indices), counts.tolist()))
+        else:
+            self.nb.cls_counts = defaultdict(float, data["nb_cls_counts"])
+            for cid, tc in data["nb_token_counts"].items():
+                self.nb.token_counts[cid] = defaultdict(float, tc)
+        self.nb.scale = data.get("nb_scale", 1.0)  # 旧模型文件没有缩放因子
+        self.nb.clear_cache()
+
     def save(self, path: str):
         """
-        保存模型到文件
+        以紧凑格式保存模型到文件
 
         Args:
             path: 保存路径
         """
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        data = {
-            "candidates": self._candidates,
-            "situations": self._situations,
-            "nb_cls_counts": dict(self.nb.cls_counts),
-            "nb_token_counts": {k: dict(v) for k, v in self.nb.token_counts.items()},
-            "nb_alpha": self.nb.alpha,
-            "nb_beta": self.nb.beta,
-            "nb_gamma": self.nb.gamma,
-            "nb_V": self.nb.V,
-        }
-
         with open(path, "wb") as f:
-            pickle.dump(data, f)
+            pickle.dump(self.encode_snapshot(self.snapshot()), f, protocol=pickle.HIGHEST_PROTOCOL)
 
     def load(self, path: str):
         """
-        从文件加载模型
+        从文件加载模型（兼容旧版 pickle 格式）
 
         Args:
             path: 加载路径
@@ -213,21 +289,7 @@ class ExpressorModel:
         with open(path, "rb") as f:
             data = pickle.load(f)
 
-        self._candidates = data["candidates"]
-        self._situations = data["situations"]
-
-        # 恢复nb模型的参数
-        self.nb.alpha = data["nb_alpha"]
-        self.nb.beta = data["nb_beta"]
-        self.nb.gamma = data["nb_gamma"]
-        self.nb.V = data["nb_V"]
-
-        # 恢复统计数据
-        self.nb.cls_counts = defaultdict(float, data["nb_cls_counts"])
-        self.nb.token_counts = defaultdict(lambda: defaultdict(float))
-        for cid, tc in data["nb_token_counts"].items():
-            self.nb.token_counts[cid] = defaultdict(float, tc)
-
+        self.restore(data)
         logger.debug(f"模型已从 {path} 加载")
 
     def get_stats(self) -> dict:
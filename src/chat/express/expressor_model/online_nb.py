@@ -1,40 +1,81 @@
 """
 在线朴素贝叶斯分类器
 支持增量学习和知识衰减
+
+衰减采用全局缩放因子：实际计数 = 存储计数 × scale。衰减只需把 scale 乘以衰减因子（O(1)），
+新增计数时按 1/scale 折算后写入，计分时再乘回 scale。scale 低于阈值时才把它折算进全部计数。
+
+候选较多时使用矩阵计分：字典形式的计数（用于增量更新）定期压缩为“类别 × 词项”的 CSR 矩阵，
+所有候选的似然项由一次稀疏矩阵-向量乘积得到。压缩后被更新过的类别仍按字典逐项计分。
 """
 import math
 from collections import Counter, defaultdict
 
 from src.common.logger import get_logger
 
+# numpy/scipy 不可用时退回纯字典计分
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    SPARSE_AVAILABLE = True
+except ImportError:
+    np = None
+    csr_matrix = None
+    SPARSE_AVAILABLE = False
+
 logger = get_logger("expressor.online_nb")
 
 
 class OnlineNaiveBayes:
     """在线朴素贝叶斯分类器"""
 
-    def __init__(self, alpha: float = 0.5, beta: float = 0.5, gamma: float = 1.0, vocab_size: int = 200000):
+    RENORMALIZE_THRESHOLD = 1e-6  # scale 低于该值时把它折算进全部计数，避免存储计数无限增大
+    MIN_MATRIX_CANDIDATES = 32  # 候选数达到该值时使用矩阵计分
+    MIN_COMPACT_DIRTY = 8  # 压缩后被更新的类别超过 max(该值, 矩阵行数 × COMPACT_DIRTY_RATIO) 时重新压缩
+    COMPACT_DIRTY_RATIO = 0.25
+
+    def __init__(
+        self,
+        alpha: float = 0.5,
+        beta: float = 0.5,
+        gamma: float = 1.0,
+        vocab_size: int = 200000,
+        use_matrix: bool = True,
+    ):
         """
         Args:
             alpha: 词频平滑参数
             beta: 类别先验平滑参数
             gamma: 衰减因子 (0-1之间，1表示不衰减)
             vocab_size: 词汇表大小
+            use_matrix: 候选较多时是否使用稀疏矩阵计分（需要 numpy 与 scipy）
         """
         self.alpha = alpha
         self.beta = beta
         self.gamma = gamma
         self.V = vocab_size
+        self.use_matrix = use_matrix and SPARSE_AVAILABLE
 
-        # 类别统计
+        # 类别统计（存储计数，实际计数需乘以 scale）
         self.cls_counts: dict[str, float] = defaultdict(float)  # cid -> total token count
         self.token_counts: dict[str, dict[str, float]] = defaultdict(
             lambda: defaultdict(float)
         )  # cid -> term -> count
+        self.scale: float = 1.0  # 全局衰减缩放因子
 
         # 缓存
         self._logZ: dict[str, float] = {}  # cache log(∑counts + Vα)
 
+        # 矩阵形式（压缩快照）
+        self._term_index: dict[str, int] = {}  # term -> 列号
+        self._row_index: dict[str, int] = {}  # cid -> 行号
+        self._count_matrix = None  # 存储计数的 CSR 矩阵（类别 × 词项）
+        self._row_cls_counts = None  # 各行压缩时的类别存储计数
+        self._log_matrix = None  # log1p(计数 × scale / α)，随 scale 变化重算
+        self._log_matrix_scale: float | None = None
+        self._dirty_cids: set[str] = set()  # 压缩后被更新或增删的类别
+
     def score_batch(self, tf: Counter, cids: list[str]) -> dict[str, float]:
         """
         批量计算候选的贝叶斯分数
@@ -46,14 +87,21 @@ class OnlineNaiveBayes:
         Returns:
             每个候选的分数字典
         """
-        total_cls = sum(self.cls_counts.values())
+        total_cls = sum(self.cls_counts.values()) * self.scale
         n_cls = max(1, len(self.cls_counts))
         denom_prior = math.log(total_cls + self.beta * n_cls)
 
+        if self.use_matrix and len(cids) >= self.MIN_MATRIX_CANDIDATES:
+            return self._score_matrix(tf, cids, denom_prior)
+        return self._score_dict(tf, cids, denom_prior)
+
+    def _score_dict(self, tf: Counter, cids: list[str], denom_prior: float) -> dict[str, float]:
+        """按字典形式的计数逐项计分"""
+        scale = self.scale
         out: dict[str, float] = {}
         for cid in cids:
             # 计算先验概率 log P(c)
-            prior = math.log(self.cls_counts[cid] + self.beta) - denom_prior
+            prior = math.log(self.cls_counts[cid] * scale + self.beta) - denom_prior
             s = prior
 
             # 计算似然概率 log P(w|c)
@@ -61,12 +109,108 @@ class OnlineNaiveBayes:
             tc = self.token_counts[cid]
 
             for term, qtf in tf.items():
-                num = tc.get(term, 0.0) + self.alpha
+                num = tc.get(term, 0.0) * scale + self.alpha
                 s += qtf * (math.log(num) - logZ)
 
             out[cid] = s
         return out
 
+    def _score_matrix(self, tf: Counter, cids: list[str], denom_prior: float) -> dict[str, float]:
+        """矩阵计分，利用 log(n·scale + α) = log α + log1p(n·scale/α) 只对非零计数求和"""
+        if self._count_matrix is None or len(self._dirty_cids) > max(
+            self.MIN_COMPACT_DIRTY, len(self._row_index) * self.COMPACT_DIRTY_RATIO
+        ):
+            self.compact()
+
+        rows: list[int] = []
+        matrix_cids: list[str] = []
+        dict_cids: list[str] = []
+        for cid in cids:
+            row = self._row_index.get(cid)
+            if row is None or cid in self._dirty_cids:
+                dict_cids.append(cid)
+            else:
+                rows.append(row)
+                matrix_cids.append(cid)
+
+        out: dict[str, float] = {}
+        if rows:
+            # 查询向量只包含词表中的词项，其余词项在所有类别中计数为 0，只贡献 qtf·log α
+            query = np.zeros(self._count_matrix.shape[1], dtype=np.float64)
+            for term, qtf in tf.items():
+                col = self._term_index.get(term)
+                if col is not None:
+                    query[col] += qtf
+            q_total = float(sum(tf.values()))
+
+            row_array = np.asarray(rows, dtype=np.intp)
+            cls = self._row_cls_counts[row_array] * self.scale
+            log_z = np.log(np.maximum(cls + self.V * self.alpha, 1e-12))
+            likelihood = (self._get_log_matrix() @ query)[row_array] + q_total * (math.log(self.alpha) - log_z)
+            scores = np.log(cls + self.beta) - denom_prior + likelihood
+            out = dict(zip(matrix_cids, scores.tolist()))
+
+        if dict_cids:
+            out.update(self._score_dict(tf, dict_cids, denom_prior))
+            out = {cid: out[cid] for cid in cids}
+        return out
+
+    def compact(self):
+        """把字典形式的计数压缩为 CSR 矩阵"""
+        if not SPARSE_AVAILABLE:
+            return
+
+        term_index: dict[str, int] = {}
+        indptr = [0]
+        indices: list[int] = []
+        data: list[float] = []
+        cids = list(self.cls_counts.keys())
+        for cid in cids:
+            tc = self.token_counts.get(cid)
+            if tc:
+                for term, count in tc.items():
+                    if count > 0:
+                        col = term_index.get(term)
+                        if col is None:
+                            col = term_index[term] = len(term_index)
+                        indices.append(col)
+                        data.append(count)
+            indptr.append(len(indices))
+
+        self._count_matrix = csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(cids), max(1, len(term_index))),
+        )
+        self._row_cls_counts = np.asarray([self.cls_counts[cid] for cid in cids], dtype=np.float64)
+        self._term_index = term_index
+        self._row_index = {cid: row for row, cid in enumerate(cids)}
+        self._log_matrix = None
+        self._dirty_cids.clear()
+
+    def _get_log_matrix(self):
+        """获取与当前 scale 对应的 log1p 矩阵"""
+        if self._log_matrix is None or self._log_matrix_scale != self.scale:
+            log_matrix = self._count_matrix.copy()
+            log_matrix.data = np.log1p(log_matrix.data * (self.scale / self.alpha))
+            self._log_matrix = log_matrix
+            self._log_matrix_scale = self.scale
+        return self._log_matrix
+
+    def add_class(self, cid: str):
+        """确保类别存在（新类别计数为 0）"""
+        if cid not in self.cls_counts:
+            self.cls_counts[cid] = 0.0
+            self._dirty_cids.add(cid)
+        if cid not in self.token_counts:
+            self.token_counts[cid] = defaultdict(float)
+
+    def remove_class(self, cid: str):
+        """删除类别及其计数"""
+        self.cls_counts.pop(cid, None)
+        self.token_counts.pop(cid, None)
+        self._invalidate(cid)
+        self._dirty_cids.add(cid)
+
     def update_positive(self, tf: Counter, cid: str):
         """
         正反馈更新
@@ -77,15 +221,18 @@ class OnlineNaiveBayes:
         """
         inc = 0.0
         tc = self.token_counts[cid]
+        inv_scale = 1.0 / self.scale
 
-        # 更新词频统计
+        # 更新词频统计（折算为存储计数）
         for term, c in tf.items():
-            tc[term] += float(c)
-            inc += float(c)
+            stored = float(c) * inv_scale
+            tc[term] += stored
+            inc += stored
 
         # 更新类别统计
         self.cls_counts[cid] += inc
         self._invalidate(cid)
+        self._dirty_cids.add(cid)
 
     def decay(self, factor: float | None = None):
         """
@@ -98,15 +245,44 @@ class OnlineNaiveBayes:
         if g >= 1.0:
             return
 
-        # 对所有统计进行衰减
-        for cid in list(self.cls_counts.keys()):
-            self.cls_counts[cid] *= g
-            for term in list(self.token_counts[cid].keys()):
-                self.token_counts[cid][term] *= g
-            self._invalidate(cid)
+        # 只缩放全局因子，计分时再作用到各计数上
+        self.scale *= g
+        self._logZ.clear()
+        if self.scale < self.RENORMALIZE_THRESHOLD:
+            self.renormalize()
 
         logger.debug(f"应用知识衰减，衰减因子: {g}")
 
+    def renormalize(self):
+        """把全局缩放因子折算进全部计数，并将 scale 重置为 1"""
+        scale = self.scale
+        if scale == 1.0:
+            return
+
+        for cid in list(self.cls_counts.keys()):
+            self.cls_counts[cid] *= scale
+        for tc in self.token_counts.values():
+            for term in tc:
+                tc[term] *= scale
+        if self._count_matrix is not None:
+            self._count_matrix.data *= scale
+            self._row_cls_counts *= scale
+        self.scale = 1.0
+        self._logZ.clear()
+        # 计数已改变，scale 恢复为 1 后对数矩阵可能误判为仍然有效
+        self._log_matrix = None
+        logger.debug(f"衰减缩放因子已折算进计数: {scale:.3g}")
+
+    def clear_cache(self):
+        """清空全部归一化因子缓存与矩阵快照（直接替换计数或缩放因子后调用）"""
+        self._logZ.clear()
+        self._count_matrix = None
+        self._row_cls_counts = None
+        self._log_matrix = None
+        self._term_index = {}
+        self._row_index = {}
+        self._dirty_cids.clear()
+
     def _logZ_c(self, cid: str) -> float:
         """
         计算归一化因子logZ
@@ -118,7 +294,7 @@ class OnlineNaiveBayes:
             log(Z_c)
         """
         if cid not in self._logZ:
-            Z = self.cls_counts[cid] + self.V * self.alpha
+            Z = self.cls_counts[cid] * self.scale + self.V * self.alpha
             self._logZ[cid] = math.log(max(Z, 1e-12))
         return self._logZ[cid]
 
@@ -137,5 +313,5 @@ class OnlineNaiveBayes:
         return {
             "n_classes": len(self.cls_counts),
             "n_tokens": sum(len(tc) for tc in self.token_counts.values()),
-            "total_counts": sum(self.cls_counts.values()),
+            "total_counts": sum(self.cls_counts.values()) * self.scale,
         }
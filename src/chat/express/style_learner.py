@@ -3,6 +3,7 @@
 基于ExpressorModel实现的表达风格学习和预测系统
 支持多聊天室独立建模和在线学习
 """
+import asyncio
 import os
 import pickle
 import time
@@ -13,6 +14,10 @@ from .expressor_model import ExpressorModel
 
 logger = get_logger("expressor.style_learner")
 
+STYLE_MODEL_FILE = "style_model.bin"  # 紧凑格式：映射、统计与模型合并为一个文件
+LEGACY_MODEL_FILE = "expressor_model.pkl"  # 旧版模型文件
+LEGACY_META_FILE = "meta.pkl"  # 旧版映射与统计文件
+
 
 class StyleLearner:
     """单个聊天室的表达风格学习器"""
@@ -56,6 +61,10 @@ class StyleLearner:
             "last_update": time.time(),
         }
 
+        # 持久化状态：只有被修改过的学习器才需要保存
+        self._dirty = False
+        self._save_lock = asyncio.Lock()
+
     def add_style(self, style: str, situation: str | None = None) -> bool:
         """
         动态添加一个新的风格
@@ -100,6 +109,7 @@ class StyleLearner:
             self.learning_stats.setdefault("style_counts", {})[style_id] = 0
             self.learning_stats.setdefault("style_last_used", {})
 
+            self._dirty = True
             logger.debug(f"添加风格成功: {style_id} -> {style}")
             return True
 
@@ -169,6 +179,7 @@ class StyleLearner:
                 self.expressor.remove_candidate(style_id)
 
                 deleted_styles.append((style_text[:30], usage, f"{days:.1f}天"))
+                self._dirty = True
 
             logger.info(
                 f"风格清理完成: 删除了 {len(deleted_styles)}/{len(style_scores)} 个风格，"
@@ -212,6 +223,7 @@ class StyleLearner:
             self.learning_stats["style_counts"][style_id] = self.learning_stats["style_counts"].get(style_id, 0) + 1
             self.learning_stats["style_last_used"][style_id] = current_time  # 更新最后使用时间
             self.learning_stats["last_update"] = current_time
+            self._dirty = True
 
             logger.debug(f"学习映射成功: {up_content[:20]}... -> {style}")
             return True
@@ -265,6 +277,7 @@ class StyleLearner:
             # 更新最后使用时间（仅针对最佳风格）
             if best_style_id:
                 self.learning_stats["style_last_used"][best_style_id] = time.time()
+                self._dirty = True
 
             logger.debug(
                 f"预测成功: up_content={up_content[:30]}..., "
@@ -335,61 +348,107 @@ class StyleLearner:
             factor: 衰减因子
         """
         self.expressor.decay(factor)
+        self._dirty = True
         logger.debug(f"应用知识衰减: chat_id={self.chat_id}")
 
-    def save(self, base_path: str) -> bool:
-        """
-        保存学习器到文件
+    @property
+    def dirty(self) -> bool:
+        """自上次保存（或加载）以来是否被修改过"""
+        return self._dirty
 
-        Args:
-            base_path: 基础保存路径
+    def snapshot(self) -> dict:
+        """
+        获取学习器状态的快照（浅拷贝，开销很小），之后的修改不会影响快照
 
         Returns:
-            是否保存成功
+            可交给 _write_snapshot 在工作线程中写入的快照
         """
-        try:
-            # 创建保存目录
-            save_dir = os.path.join(base_path, self.chat_id)
-            os.makedirs(save_dir, exist_ok=True)
-
-            # 保存expressor模型
-            model_path = os.path.join(save_dir, "expressor_model.pkl")
-            tmp_model_path = f"{model_path}.tmp"
-            self.expressor.save(tmp_model_path)
-            os.replace(tmp_model_path, model_path)
+        stats = dict(self.learning_stats)
+        stats["style_counts"] = dict(stats.get("style_counts", {}))
+        stats["style_last_used"] = dict(stats.get("style_last_used", {}))
+        return {
+            "meta": {
+                "style_to_id": dict(self.style_to_id),
+                "id_to_style": dict(self.id_to_style),
+                "id_to_situation": dict(self.id_to_situation),
+                "next_style_id": self.next_style_id,
+                "learning_stats": stats,
+            },
+            "model": self.expressor.snapshot(),
+        }
 
-            # 保存映射关系和统计信息（原子写）
-            meta_path = os.path.join(save_dir, "meta.pkl")
+    @staticmethod
+    def _write_snapshot(save_dir: str, snapshot: dict) -> None:
+        """编码快照并原子写入文件（阻塞操作，应在工作线程中执行）"""
+        os.makedirs(save_dir, exist_ok=True)
+        data = {"meta": snapshot["meta"], "model": ExpressorModel.encode_snapshot(snapshot["model"])}
 
-            # 确保 learning_stats 包含所有必要字段
-            if "style_last_used" not in self.learning_stats:
-                self.learning_stats["style_last_used"] = {}
+        model_path = os.path.join(save_dir, STYLE_MODEL_FILE)
+        tmp_model_path = f"{model_path}.tmp"
+        with open(tmp_model_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_model_path, model_path)
 
-            meta_data = {
-                "style_to_id": self.style_to_id,
-                "id_to_style": self.id_to_style,
-                "id_to_situation": self.id_to_situation,
-                "next_style_id": self.next_style_id,
-                "learning_stats": self.learning_stats,
-            }
+        # 已迁移到紧凑格式，删除旧版文件
+        for legacy_file in (LEGACY_MODEL_FILE, LEGACY_META_FILE):
+            legacy_path = os.path.join(save_dir, legacy_file)
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
 
-            tmp_meta_path = f"{meta_path}.tmp"
-            with open(tmp_meta_path, "wb") as f:
-                pickle.dump(meta_data, f, protocol=pickle.HIGHEST_PROTOCOL)
-                f.flush()
-                os.fsync(f.fileno())
+    def save(self, base_path: str, force: bool = False) -> bool:
+        """
+        同步保存学习器到文件（会阻塞当前线程，事件循环中请使用 save_async）
 
-            os.replace(tmp_meta_path, meta_path)
+        Args:
+            base_path: 基础保存路径
+            force: 未修改时是否也保存
 
+        Returns:
+            是否保存成功
+        """
+        if not self._dirty and not force:
+            return True
+        try:
+            self._write_snapshot(os.path.join(base_path, self.chat_id), self.snapshot())
+            self._dirty = False
             return True
 
         except Exception as e:
             logger.error(f"保存StyleLearner失败: {e}")
             return False
 
+    async def save_async(self, base_path: str, force: bool = False) -> bool:
+        """
+        保存学习器到文件：在事件循环中获取快照，编码与写盘在工作线程中执行
+
+        Args:
+            base_path: 基础保存路径
+            force: 未修改时是否也保存
+
+        Returns:
+            是否保存成功
+        """
+        async with self._save_lock:
+            if not self._dirty and not force:
+                return True
+
+            snapshot = self.snapshot()
+            # 先清除标记，写盘期间的新修改会重新标记
+            self._dirty = False
+            try:
+                await asyncio.to_thread(self._write_snapshot, os.path.join(base_path, self.chat_id), snapshot)
+                return True
+
+            except Exception as e:
+                self._dirty = True
+                logger.error(f"保存StyleLearner失败: {e}")
+                return False
+
     def load(self, base_path: str) -> bool:
         """
-        从文件加载学习器
+        从文件加载学习器（兼容旧版 pickle 格式）
 
         Args:
             base_path: 基础加载路径
@@ -405,17 +464,26 @@ class StyleLearner:
                 logger.debug(f"StyleLearner保存目录不存在: {save_dir}")
                 return False
 
-            # 加载expressor模型
-            model_path = os.path.join(save_dir, "expressor_model.pkl")
+            model_path = os.path.join(save_dir, STYLE_MODEL_FILE)
             if os.path.exists(model_path):
-                self.expressor.load(model_path)
-
-            # 加载映射关系和统计信息
-            meta_path = os.path.join(save_dir, "meta.pkl")
-            if os.path.exists(meta_path):
-                with open(meta_path, "rb") as f:
-                    meta_data = pickle.load(f)
-
+                with open(model_path, "rb") as f:
+                    data = pickle.load(f)
+                self.expressor.restore(data["model"])
+                meta_data = data["meta"]
+            else:
+                # 旧版格式：模型与映射分别保存，加载后标记为已修改，下次保存时迁移
+                legacy_model_path = os.path.join(save_dir, LEGACY_MODEL_FILE)
+                if os.path.exists(legacy_model_path):
+                    self.expressor.load(legacy_model_path)
+
+                meta_data = None
+                meta_path = os.path.join(save_dir, LEGACY_META_FILE)
+                if os.path.exists(meta_path):
+                    with open(meta_path, "rb") as f:
+                        meta_data = pickle.load(f)
+                self._dirty = True
+
+            if meta_data is not None:
                 self.style_to_id = meta_data["style_to_id"]
                 self.id_to_style = meta_data["id_to_style"]
                 self.id_to_situation = meta_data["id_to_situation"]
@@ -461,6 +529,9 @@ class StyleLearnerManager:
         """
         self.learners: dict[str, StyleLearner] = {}
         self.learner_last_used: dict[str, float] = {}  # 🔧 记录最后使用时间
+        self._pending_evictions: dict[str, StyleLearner] = {}  # 已淘汰但仍在后台保存的学习器
+        self._pending_saves: dict[str, asyncio.Task] = {}  # chat_id -> 最近一次后台保存任务
+        self._background_saves: set[asyncio.Task] = set()
         self.model_save_path = model_save_path
         self.resource_limit_enabled = resource_limit_enabled
 
@@ -470,7 +541,10 @@ class StyleLearnerManager:
         logger.debug(f"StyleLearnerManager初始化成功, 模型保存路径: {model_save_path}")
 
     def _evict_if_needed(self) -> None:
-        """🔧 内存优化：如果超过最大数量，淘汰最久未使用的 learner"""
+        """🔧 内存优化：如果超过最大数量，淘汰最久未使用的 learner
+
+        有修改的学习器在工作线程中后台保存，保存完成前仍可被 get_learner 直接取回。
+        """
         if len(self.learners) < self.MAX_ACTIVE_LEARNERS:
             return
 
@@ -481,21 +555,54 @@ class StyleLearnerManager:
             key=lambda x: x[1]
         )
 
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
         evicted = []
         for chat_id, last_used in sorted_by_time[:evict_count]:
             if chat_id in self.learners:
-                # 先保存再淘汰
-                try:
-                    self.learners[chat_id].save(self.model_save_path)
-                except Exception as e:
-                    logger.error(f"LRU淘汰时保存学习器失败: chat_id={chat_id}, error={e}")
-                del self.learners[chat_id]
+                learner = self.learners.pop(chat_id)
                 del self.learner_last_used[chat_id]
                 evicted.append(chat_id)
 
+                if not learner.dirty:
+                    if chat_id in self._pending_saves:
+                        # 上一次淘汰的保存仍在进行，保留到保存完成，避免从未写完的文件重新加载
+                        self._pending_evictions[chat_id] = learner
+                    continue
+                if loop is None:
+                    # 没有运行中的事件循环时同步保存
+                    if not learner.save(self.model_save_path):
+                        logger.error(f"LRU淘汰时保存学习器失败: chat_id={chat_id}")
+                    continue
+
+                self._pending_evictions[chat_id] = learner
+                task = loop.create_task(self._save_evicted(chat_id, learner, self._pending_saves.get(chat_id)))
+                self._pending_saves[chat_id] = task
+                self._background_saves.add(task)
+                task.add_done_callback(self._background_saves.discard)
+
         if evicted:
             logger.info(f"StyleLearner LRU淘汰: 释放了 {len(evicted)} 个不活跃的学习器")
 
+    async def _save_evicted(self, chat_id: str, learner: StyleLearner, previous: asyncio.Task | None) -> None:
+        """后台保存被淘汰的学习器，该 chat_id 的最后一次保存完成后释放
+
+        保存期间学习器可能被取回后再次淘汰，此时新的保存排在上一次之后执行，
+        只有最后一次保存完成后才移除待保存记录，否则 get_learner 可能读到尚未写完的文件。
+        """
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            if not await learner.save_async(self.model_save_path):
+                logger.error(f"LRU淘汰时保存学习器失败: chat_id={chat_id}")
+        finally:
+            if self._pending_saves.get(chat_id) is asyncio.current_task():
+                del self._pending_saves[chat_id]
+                self._pending_evictions.pop(chat_id, None)
+
     def get_learner(self, chat_id: str, model_config: dict | None = None) -> StyleLearner:
         """
         获取或创建指定chat_id的学习器
@@ -514,15 +621,18 @@ class StyleLearnerManager:
             # 🔧 检查是否需要淘汰
             self._evict_if_needed()
 
-            # 创建新的学习器
-            learner = StyleLearner(
-                chat_id,
-                model_config,
-                resource_limit_enabled=self.resource_limit_enabled,
-            )
+            # 仍在后台保存的学习器直接取回，避免读到尚未写完的文件
+            learner = self._pending_evictions.pop(chat_id, None)
+            if learner is None:
+                # 创建新的学习器
+                learner = StyleLearner(
+                    chat_id,
+                    model_config,
+                    resource_limit_enabled=self.resource_limit_enabled,
+                )
 
-            # 尝试加载已保存的模型
-            learner.load(self.model_save_path)
+                # 尝试加载已保存的模型
+                learner.load(self.model_save_path)
 
             self.learners[chat_id] = learner
 
@@ -564,19 +674,25 @@ class StyleLearnerManager:
         learner = self.get_learner(chat_id)
         return learner.predict_style(up_content, top_k)
 
-    def save_all(self) -> bool:
+    async def save_all(self) -> bool:
         """
-        保存所有学习器
+        保存所有有修改的学习器（编码与写盘在工作线程中执行），并等待后台淘汰保存完成
 
         Returns:
             是否全部保存成功
         """
-        success = True
-        for learner in self.learners.values():
-            if not learner.save(self.model_save_path):
-                success = False
+        dirty_learners = [learner for learner in self.learners.values() if learner.dirty]
+        results = await asyncio.gather(
+            *(learner.save_async(self.model_save_path) for learner in dirty_learners),
+            *self._background_saves,
+            return_exceptions=True,
+        )
+        success = all(result is True for result in results[: len(dirty_learners)])
 
-        logger.debug(f"保存所有StyleLearner {'成功' if success else '部分失败'}")
+        logger.debug(
+            f"保存所有StyleLearner {'成功' if success else '部分失败'}: "
+            f"保存 {len(dirty_learners)} 个, 跳过 {len(self.learners) - len(dirty_learners)} 个未修改的学习器"
+        )
         return success
 
     def cleanup_all_old_styles(self, ratio: float | None = None) -> dict[str, int]:
@@ -43,10 +43,15 @@ class InterestManager:
             self._result_cache: OrderedDict[str, InterestCalculationResult] = OrderedDict()  # LRU缓存
             self._cache_max_size = 1000  # 最大缓存数量
             self._cache_ttl = 300  # 缓存TTL（秒）
-            self._batch_queue: asyncio.Queue = asyncio.Queue(maxsize=100)  # 批处理队列
+            self._batch_queue: asyncio.Queue[tuple["DatabaseMessages", asyncio.Future]] = asyncio.Queue(
+                maxsize=100
+            )  # 批处理队列
             self._batch_size = 10  # 批处理大小
-            self._batch_timeout = 0.1  # 批处理超时（秒）
+            self._batch_timeout = 0.02  # 收到首条消息后等待更多消息合并的时间（秒）
+            self._max_concurrent_batches = 4  # 同时进行的批次数，批次全部占用时新消息在队列中累积
+            self._batch_semaphore = asyncio.Semaphore(self._max_concurrent_batches)
             self._batch_task = None
+            self._running_batches: set[asyncio.Task] = set()
             self._is_warmed_up = False  # 预热状态标记
 
             # 性能统计
@@ -59,10 +64,16 @@ class InterestManager:
 
     async def initialize(self):
         """初始化管理器"""
-        # 启动批处理工作线程
+        self._ensure_batch_worker()
+
+    def _ensure_batch_worker(self) -> bool:
+        """确保批处理工作线程在运行，返回是否可用"""
+        if self._shutdown_event.is_set():
+            return False
         if self._batch_task is None or self._batch_task.done():
             self._batch_task = asyncio.create_task(self._batch_processing_worker())
             logger.info("批处理工作线程已启动")
+        return True
 
     async def shutdown(self):
         """关闭管理器"""
@@ -76,6 +87,16 @@ class InterestManager:
             except asyncio.CancelledError:
                 pass
 
+        for task in list(self._running_batches):
+            task.cancel()
+        if self._running_batches:
+            await asyncio.gather(*self._running_batches, return_exceptions=True)
+
+        # 队列中尚未处理的消息直接返回失败结果，避免调用方一直等待
+        while not self._batch_queue.empty():
+            message, future = self._batch_queue.get_nowait()
+            self._resolve_failed(future, message, "兴趣值管理器已关闭")
+
         if self._current_calculator:
             await self._current_calculator.cleanup()
             self._current_calculator = None
@@ -154,15 +175,16 @@ class InterestManager:
                 return cached_result
             self._cache_misses += 1
 
-        # 使用 create_task 异步执行计算
-        task = asyncio.create_task(self._async_calculate(message))
+        # 交给批处理队列与同一时段的其他消息合并计算，队列不可用时单独计算
+        future = self._submit_to_batch(message)
+        task = future if future is not None else asyncio.create_task(self._async_calculate(message))
 
         if timeout is None:
             result = await task
         else:
             try:
-                # 等待计算结果，但有超时限制
-                result = await asyncio.wait_for(task, timeout=timeout)
+                # 等待计算结果，但有超时限制（shield 保证超时后计算仍在后台继续）
+                result = await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
             except asyncio.TimeoutError:
                 # 超时返回默认结果，但计算仍在后台继续
                 logger.warning(f"兴趣值计算超时 ({timeout}s)，消息 {message_id} 使用默认兴趣值 0.5")
@@ -190,6 +212,29 @@ class InterestManager:
 
         return result
 
+    def _submit_to_batch(self, message: "DatabaseMessages") -> asyncio.Future | None:
+        """将消息放入批处理队列，返回结果 future；队列已满或管理器已关闭时返回 None"""
+        if not self._ensure_batch_worker():
+            return None
+        future: asyncio.Future[InterestCalculationResult] = asyncio.get_running_loop().create_future()
+        try:
+            self._batch_queue.put_nowait((message, future))
+        except asyncio.QueueFull:
+            return None
+        return future
+
+    @staticmethod
+    def _resolve_failed(future: asyncio.Future, message: "DatabaseMessages", error_message: str) -> None:
+        if not future.done():
+            future.set_result(
+                InterestCalculationResult(
+                    success=False,
+                    message_id=getattr(message, "message_id", ""),
+                    interest_value=0.3,
+                    error_message=error_message,
+                )
+            )
+
     async def _async_calculate(self, message: "DatabaseMessages") -> InterestCalculationResult:
         """异步执行兴趣值计算"""
         start_time = time.time()
@@ -280,7 +325,7 @@ class InterestManager:
             self._result_cache.popitem(last=False)
 
     async def calculate_interest_batch(self, messages: list["DatabaseMessages"], timeout: float | None = None) -> list[InterestCalculationResult]:
-        """批量计算消息兴趣值（并发优化）
+        """批量计算消息兴趣值（经批处理队列合并后交给计算组件的 calculate_batch）
         
         Args:
             messages: 消息列表
@@ -310,42 +355,100 @@ class InterestManager:
             else:
                 final_results.append(result)
 
-        self._batch_calculations += 1
         return final_results
 
     async def _batch_processing_worker(self):
-        """批处理工作线程"""
+        """批处理工作线程：收到首条消息后合并同一时段到达的消息，交给计算组件批量计算"""
         while not self._shutdown_event.is_set():
-            batch = []
-            deadline = time.time() + self._batch_timeout
-
             try:
-                # 收集批次
-                while len(batch) < self._batch_size and time.time() < deadline:
-                    remaining_time = deadline - time.time()
-                    if remaining_time <= 0:
-                        break
-
-                    try:
-                        item = await asyncio.wait_for(self._batch_queue.get(), timeout=remaining_time)
-                        batch.append(item)
-                    except asyncio.TimeoutError:
-                        break
-
-                # 处理批次
-                if batch:
-                    await self._process_batch(batch)
+                # 所有批次槽位都被占用时不取消息，让新消息在队列中累积成更大的批次
+                await self._batch_semaphore.acquire()
+                try:
+                    batch = [await self._batch_queue.get()]
+                    deadline = time.time() + self._batch_timeout
+
+                    # 收集批次
+                    while len(batch) < self._batch_size:
+                        if not self._batch_queue.empty():
+                            batch.append(self._batch_queue.get_nowait())
+                            continue
+                        remaining_time = deadline - time.time()
+                        if remaining_time <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self._batch_queue.get(), timeout=remaining_time))
+                        except asyncio.TimeoutError:
+                            break
+                except BaseException:
+                    self._batch_semaphore.release()
+                    raise
+
+                task = asyncio.create_task(self._process_batch(batch))
+                self._running_batches.add(task)
+                task.add_done_callback(self._on_batch_done)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"批处理工作线程异常: {e}")
 
-    async def _process_batch(self, batch: list):
-        """处理批次消息"""
-        # 这里可以实现具体的批处理逻辑
-        # 当前版本只是占位，实际的批处理逻辑可以根据具体需求实现
-        pass
+    def _on_batch_done(self, task: asyncio.Task) -> None:
+        self._running_batches.discard(task)
+        self._batch_semaphore.release()
+
+    async def _process_batch(self, batch: list[tuple["DatabaseMessages", asyncio.Future]]):
+        """处理批次消息，结果按消息写回各自的 future"""
+        try:
+            calculator = self._current_calculator
+            if calculator is None:
+                for message, future in batch:
+                    self._resolve_failed(future, message, "没有可用的兴趣值计算组件")
+                return
+
+            # 同一条消息在批次中只计算一次
+            futures_by_id: dict[str, list[asyncio.Future]] = {}
+            messages: list[DatabaseMessages] = []
+            for message, future in batch:
+                key = str(getattr(message, "message_id", "") or id(message))
+                if key not in futures_by_id:
+                    futures_by_id[key] = []
+                    messages.append(message)
+                futures_by_id[key].append(future)
+
+            start_time = time.time()
+            self._total_calculations += len(messages)
+            self._batch_calculations += 1
+            try:
+                results = await calculator._safe_execute_batch(messages)
+            except Exception as e:
+                logger.error(f"批量兴趣值计算异常: {e}")
+                results = [
+                    InterestCalculationResult(
+                        success=False,
+                        message_id=getattr(message, "message_id", ""),
+                        interest_value=0.0,
+                        error_message=f"计算异常: {e!s}",
+                        calculation_time=time.time() - start_time,
+                    )
+                    for message in messages
+                ]
+
+            for message, result in zip(messages, results):
+                self._total_calculation_time += result.calculation_time
+                if result.success:
+                    self._last_calculation_time = time.time()
+                else:
+                    self._failed_calculations += 1
+                    logger.warning(f"兴趣值计算失败: {result.error_message}")
+                key = str(getattr(message, "message_id", "") or id(message))
+                for future in futures_by_id[key]:
+                    if not future.done():
+                        future.set_result(result)
+
+            logger.debug(f"批量兴趣值计算完成: {len(messages)} 条消息 (耗时: {time.time() - start_time:.3f}s)")
+        finally:
+            for message, future in batch:
+                self._resolve_failed(future, message, "批量计算未完成")
 
     async def warmup(self, sample_messages: list["DatabaseMessages"] | None = None):
         """预热兴趣计算器
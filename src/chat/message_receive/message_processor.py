@@ -13,7 +13,6 @@ from mofox_wire.types import GroupInfoPayload, MessageInfoPayload, SegPayload, U
 
 from src.chat.utils.self_voice_cache import consume_self_voice_text
 from src.chat.utils.utils_image import get_image_manager
-from src.chat.utils.utils_video import get_video_analyzer, is_video_analysis_available
 from src.chat.utils.utils_voice import get_voice_text
 from src.common.data_models.database_data_model import DatabaseMessages
 from src.common.logger import get_logger
@@ -303,12 +302,15 @@ async def _process_single_segment(
             state["is_video"] = True
             logger.info(f"接收到视频消息，数据类型: {type(seg_data)}")
 
-            # 检查视频分析功能是否可用
-            if not is_video_analysis_available():
-                logger.warning("⚠️ Rust视频处理模块不可用，跳过视频分析")
-                return "[视频]"
-
             if global_config and global_config.video_analysis.enable:
+                # 视频分析模块依赖 Rust 扩展，仅在启用时导入
+                from src.chat.utils.utils_video import get_video_analyzer, is_video_analysis_available
+
+                # 检查视频分析功能是否可用
+                if not is_video_analysis_available():
+                    logger.warning("⚠️ Rust视频处理模块不可用，跳过视频分析")
+                    return "[视频]"
+
                 logger.info("已启用视频识别,开始识别")
                 if isinstance(seg_data, dict):
                     try:
@@ -305,6 +305,8 @@ class DefaultReplyer:
         from_plugin: bool = True,
         stream_id: str | None = None,
         reply_message: DatabaseMessages | None = None,
+        prebuilt_prompt: str | None = None,
+        prebuilt_llm_response: dict[str, Any] | None = None,
     ) -> tuple[bool, dict[str, Any] | None, str | None]:
         # sourcery skip: merge-nested-ifs
         """
@@ -316,6 +318,8 @@ class DefaultReplyer:
             available_actions: 可用的动作信息字典
             enable_tool: 是否启用工具调用
             from_plugin: 是否来自插件
+            prebuilt_prompt: 预先构建好的prompt（如投机回复），提供时跳过prompt构建
+            prebuilt_llm_response: 预先生成的LLM回复，仅在提供prebuilt_prompt时生效，提供时跳过LLM调用
 
         Returns:
             Tuple[bool, Optional[Dict[str, Any]], Optional[str]]: (是否成功, 生成的回复, 使用的prompt)
@@ -377,15 +381,19 @@ class DefaultReplyer:
                     prompt_mode_value = mode
 
             # 构建 Prompt
-            with Timer("构建Prompt", {}):  # 内部计时器，可选保留
-                prompt = await self.build_prompt_reply_context(
-                    reply_to=reply_to,
-                    extra_info=extra_info,
-                    available_actions=available_actions,
-                    enable_tool=enable_tool,
-                    reply_message=reply_message,
-                    prompt_mode=prompt_mode_value,  # 传递prompt_mode
-                )
+            if prebuilt_prompt:
+                prompt = prebuilt_prompt
+            else:
+                prebuilt_llm_response = None  # 没有对应的prompt时，预生成的回复没有意义
+                with Timer("构建Prompt", {}):  # 内部计时器，可选保留
+                    prompt = await self.build_prompt_reply_context(
+                        reply_to=reply_to,
+                        extra_info=extra_info,
+                        available_actions=available_actions,
+                        enable_tool=enable_tool,
+                        reply_message=reply_message,
+                        prompt_mode=prompt_mode_value,  # 传递prompt_mode
+                    )
 
             if not prompt:
                 logger.warning("构建prompt失败，跳过回复生成")
@@ -408,14 +416,18 @@ class DefaultReplyer:
             try:
                 # 设置正在回复的状态
                 self.chat_stream.context.is_replying = True
-                content, reasoning_content, model_name, tool_call = await self.llm_generate_content(prompt)
-                logger.debug(f"replyer生成内容: {content}")
-                llm_response = {
-                    "content": content,
-                    "reasoning": reasoning_content,
-                    "model": model_name,
-                    "tool_calls": tool_call,
-                }
+                if prebuilt_llm_response is not None:
+                    llm_response = prebuilt_llm_response
+                    logger.debug(f"replyer使用预生成内容: {llm_response.get('content')}")
+                else:
+                    content, reasoning_content, model_name, tool_call = await self.llm_generate_content(prompt)
+                    logger.debug(f"replyer生成内容: {content}")
+                    llm_response = {
+                        "content": content,
+                        "reasoning": reasoning_content,
+                        "model": model_name,
+                        "tool_calls": tool_call,
+                    }
             except UserWarning as e:
                 raise e
             except Exception as llm_e:
@@ -1783,20 +1795,19 @@ class DefaultReplyer:
 
         return prompt_text
 
-    async def llm_generate_content(self, prompt: str):
+    async def llm_generate_content(self, prompt: str, llm_request: LLMRequest | None = None):
         assert global_config is not None
+        # 默认使用已初始化的模型实例，调用方可以传入独立的实例以便单独统计用量
+        express_model = llm_request or self.express_model
         with Timer("LLM生成", {}):  # 内部计时器，可选保留
-            # 直接使用已初始化的模型实例
-            logger.info(f"使用模型集生成回复: {self.express_model.model_for_task}")
+            logger.info(f"使用模型集生成回复: {express_model.model_for_task}")
 
             if global_config.debug.show_prompt:
                 logger.info(f"\n{prompt}\n")
             else:
                 logger.debug(f"\n{prompt}\n")
 
-            content, (reasoning_content, model_name, tool_calls) = await self.express_model.generate_response_async(
-                prompt
-            )
+            content, (reasoning_content, model_name, tool_calls) = await express_model.generate_response_async(prompt)
 
             if content:
                 if not global_config.response_splitter.enable or global_config.response_splitter.split_mode != "llm":
@@ -1815,7 +1826,6 @@ class DefaultReplyer:
         assert model_config is not None
         related_info = ""
         start_time = time.time()
-        from src.plugins.built_in.knowledge.lpmm_get_knowledge import SearchKnowledgeFromLPMMTool
 
         logger.debug(f"获取知识库内容，元消息：{message[:30]}...，消息长度: {len(message)}")
         # 从LPMM知识库获取知识
@@ -1824,6 +1834,9 @@ class DefaultReplyer:
             if not global_config.lpmm_knowledge.enable:
                 logger.debug("LPMM知识库未启用，跳过获取知识库内容")
                 return ""
+            # 知识库模块依赖较重，仅在启用时导入
+            from src.plugins.built_in.knowledge.lpmm_get_knowledge import SearchKnowledgeFromLPMMTool
+
             time_now = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
             bot_name = global_config.bot.nickname
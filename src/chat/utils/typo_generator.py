@@ -4,11 +4,14 @@
 内存优化：使用单例模式，避免重复创建拼音字典（约20992个汉字映射）
 """
 
+import bisect
+import itertools
 import math
 import os
 import random
 import time
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 from threading import Lock
 
@@ -25,6 +28,11 @@ _typo_generator_singleton: "ChineseTypoGenerator | None" = None
 _singleton_lock = Lock()
 _shared_pinyin_dict: dict | None = None
 _shared_char_frequency: dict | None = None
+_shared_char_to_pinyin: dict[str, str] | None = None
+# 词典数据较大且只在整词替换时使用，首次需要时才加载
+_shared_word_frequency: dict[str, float] | None = None
+_shared_word_pinyin_index: dict[str, list[str]] | None = None
+_word_index_lock = Lock()
 
 
 def get_typo_generator(
@@ -105,6 +113,19 @@ class ChineseTypoGenerator:
             logger.debug("字频数据已加载并缓存")
         self.char_frequency = _shared_char_frequency
 
+        # 单字替换候选表：(原字, 拼音, 错误声调拼音或None) -> (按概率排序的候选字, 累积概率)
+        # 依赖 min_freq 和 max_freq_diff，这两个参数变化时清空
+        self._candidate_tables: dict[tuple[str, str, str | None], tuple[list[str], list[float]]] = {}
+
+    def _get_char_to_pinyin(self) -> dict[str, str]:
+        """汉字 -> 默认拼音（拼音字典的反转，全局只构建一次）"""
+        global _shared_char_to_pinyin
+
+        if _shared_char_to_pinyin is None:
+            # 拼音字典中每个汉字只出现在其默认读音下
+            _shared_char_to_pinyin = {char: py for py, chars in self.pinyin_dict.items() for char in chars}
+        return _shared_char_to_pinyin
+
     def _load_or_create_char_frequency(self):
         """
         加载或创建汉字频率字典
@@ -118,12 +139,9 @@ class ChineseTypoGenerator:
 
         # 使用内置的词频文件
         char_freq = defaultdict(int)
-        # 从当前文件向上返回三级目录到项目根目录，然后拼接路径
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        dict_path = os.path.join(base_dir, "depends-data", "dict.txt")
 
         # 读取rjieba的词典文件
-        with open(dict_path, encoding="utf-8") as f:
+        with open(self._get_dict_path(), encoding="utf-8") as f:
             for line in f:
                 word, freq = line.strip().split()[:2]
                 # 对词中的每个字进行频率累加
@@ -141,6 +159,61 @@ class ChineseTypoGenerator:
 
         return normalized_freq
 
+    @staticmethod
+    def _get_dict_path() -> str:
+        """rjieba 词典文件路径"""
+        # 从当前文件向上返回三级目录到项目根目录，然后拼接路径
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+        return os.path.join(base_dir, "depends-data", "dict.txt")
+
+    def _ensure_word_index(self) -> tuple[dict[str, float], dict[str, list[str]]]:
+        """
+        确保词频表和拼音序列索引已加载（全局只加载一次）
+
+        索引的键是词中每个字的默认拼音以空格连接的字符串，值是拼音序列相同的多字词列表。
+        这与“按每个音节的同音字做笛卡尔积、再在词典中查找”得到的候选集合完全一致，
+        但只需一次字典查找。
+        """
+        global _shared_word_frequency, _shared_word_pinyin_index
+
+        if _shared_word_frequency is not None and _shared_word_pinyin_index is not None:
+            return _shared_word_frequency, _shared_word_pinyin_index
+
+        with _word_index_lock:
+            if _shared_word_frequency is None or _shared_word_pinyin_index is None:
+                _shared_word_frequency, _shared_word_pinyin_index = self._build_word_index()
+        return _shared_word_frequency, _shared_word_pinyin_index
+
+    def _build_word_index(self) -> tuple[dict[str, float], dict[str, list[str]]]:
+        """读取词典，构建多字词的词频表和拼音序列索引"""
+        start_time = time.time()
+
+        char_to_pinyin = self._get_char_to_pinyin()
+
+        word_frequency: dict[str, float] = {}
+        word_pinyin_index: dict[str, list[str]] = defaultdict(list)
+        try:
+            with open(self._get_dict_path(), encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 2 or len(parts[0]) < 2:
+                        continue
+                    word_text = parts[0]
+                    try:
+                        pinyins = [char_to_pinyin[char] for char in word_text]
+                    except KeyError:
+                        continue  # 含有非汉字或无拼音的字，不可能成为同音词候选
+                    word_frequency[word_text] = float(parts[1])
+                    word_pinyin_index[" ".join(pinyins)].append(word_text)
+        except FileNotFoundError:
+            logger.warning("未找到词典文件 depends-data/dict.txt，整词同音替换将不可用")
+
+        logger.debug(
+            f"词频索引构建完成: {len(word_frequency)} 个词, {len(word_pinyin_index)} 个拼音序列, "
+            f"耗时 {time.time() - start_time:.2f}s"
+        )
+        return word_frequency, dict(word_pinyin_index)
+
     def _load_or_create_pinyin_dict(self):
         """
         加载或创建拼音到汉字映射字典（磁盘缓存加速冷启动）
@@ -261,58 +334,71 @@ class ChineseTypoGenerator:
         # 频率差为0时概率为1，频率差为max_freq_diff时概率接近0
         return math.exp(-3 * freq_diff / self.max_freq_diff)
 
-    def _get_similar_frequency_chars(self, char, py, num_candidates=5):
-        """
-        获取与给定字频率相近的同音字，可能包含声调错误
+    def _build_candidate_table(
+        self, char: str, py: str, wrong_tone_py: str | None, num_candidates: int = 5
+    ) -> tuple[list[str], list[float]]:
         """
-        homophones = []
-
-        # 有一定概率使用错误声调
-        if random.random() < self.tone_error_rate:
-            wrong_tone_py = self._get_similar_tone_pinyin(py)
-            homophones.extend(self.pinyin_dict[wrong_tone_py])
-
-        # 添加正确声调的同音字
-        homophones.extend(self.pinyin_dict[py])
+        构建单字的替换候选表
 
+        候选为频率相近的同音字（wrong_tone_py 不为空时包含该错误声调的同音字），
+        取替换概率最高的几个。每个候选的权重为“被等概率选中 × 通过替换概率检验”，
+        即 prob / 候选数，累积后总和不超过1，剩余部分表示不替换。
+        """
+        homophones = list(self.pinyin_dict.get(wrong_tone_py, ())) if wrong_tone_py else []
+        homophones.extend(self.pinyin_dict.get(py, ()))
         if not homophones:
-            return None
+            return [], []
 
         # 获取原字的频率
         orig_freq = self.char_frequency.get(char, 0)
 
-        # 计算所有同音字与原字的频率差，并过滤掉低频字
-        freq_diff = [
-            (h, self.char_frequency.get(h, 0))
-            for h in homophones
-            if h != char and self.char_frequency.get(h, 0) >= self.min_freq
-        ]
-
-        if not freq_diff:
-            return None
-
-        # 计算每个候选字的替换概率
+        # 计算每个候选字的替换概率，过滤掉低频字和无效概率的字
         candidates_with_prob = []
-        for h, freq in freq_diff:
+        for h in homophones:
+            freq = self.char_frequency.get(h, 0)
+            if h == char or freq < self.min_freq:
+                continue
             prob = self._calculate_replacement_probability(orig_freq, freq)
-            if prob > 0:  # 只保留有效概率的候选字
+            if prob > 0:
                 candidates_with_prob.append((h, prob))
 
         if not candidates_with_prob:
-            return None
+            return [], []
 
-        # 根据概率排序
+        # 根据概率排序，保留概率最高的几个字
         candidates_with_prob.sort(key=lambda x: x[1], reverse=True)
+        top_candidates = candidates_with_prob[:num_candidates]
+
+        weights = [prob / len(top_candidates) for _, prob in top_candidates]
+        return [h for h, _ in top_candidates], list(itertools.accumulate(weights))
+
+    def _sample_typo_char(self, char: str, py: str) -> str | None:
+        """
+        按预计算的候选表抽取一个错别字，返回 None 表示不替换
 
-        # 返回概率最高的几个字
-        return [char for char, _ in candidates_with_prob[:num_candidates]]
+        等价于“从候选中等概率选一个字，再按替换概率决定是否采用”，但只需一次查表和二分查找。
+        """
+        # 有一定概率使用错误声调
+        wrong_tone_py = self._get_similar_tone_pinyin(py) if random.random() < self.tone_error_rate else None
+
+        key = (char, py, wrong_tone_py)
+        table = self._candidate_tables.get(key)
+        if table is None:
+            table = self._candidate_tables[key] = self._build_candidate_table(char, py, wrong_tone_py)
+
+        candidates, cumulative = table
+        if not candidates:
+            return None
+        index = bisect.bisect_right(cumulative, random.random())
+        return candidates[index] if index < len(candidates) else None
 
     @staticmethod
+    @lru_cache(maxsize=8192)
     def _get_word_pinyin(word):
         """
-        获取词语的拼音列表
+        获取词语的拼音列表（按词缓存，常用词不必重复调用 pypinyin）
         """
-        return [py[0] for py in pinyin(word, style=Style.TONE3)]
+        return tuple(py[0] for py in pinyin(word, style=Style.TONE3))
 
     @staticmethod
     def _segment_sentence(sentence):
@@ -328,52 +414,31 @@ class ChineseTypoGenerator:
         if len(word) == 1:
             return []
 
-        # 获取词的拼音
-        word_pinyin = self._get_word_pinyin(word)
-
-        # 遍历所有可能的同音字组合
-        candidates = []
-        for py in word_pinyin:
-            chars = self.pinyin_dict.get(py, [])
-            if not chars:
-                return []
-            candidates.append(chars)
-
-        # 生成所有可能的组合
-        import itertools
+        word_frequency, word_pinyin_index = self._ensure_word_index()
 
-        all_combinations = itertools.product(*candidates)
-
-        # 获取rjieba词典和词频信息
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        dict_path = os.path.join(base_dir, "depends-data", "dict.txt")
-        valid_words = {}  # 改用字典存储词语及其频率
-        with open(dict_path, encoding="utf-8") as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) >= 2:
-                    word_text = parts[0]
-                    word_freq = float(parts[1])  # 获取词频
-                    valid_words[word_text] = word_freq
+        # 拼音序列相同的词典词即为全部候选
+        candidates = word_pinyin_index.get(" ".join(self._get_word_pinyin(word)))
+        if not candidates:
+            return []
 
         # 获取原词的词频作为参考
-        original_word_freq = valid_words.get(word, 0)
+        original_word_freq = word_frequency.get(word, 0)
         min_word_freq = original_word_freq * 0.1  # 设置最小词频为原词频的10%
 
         # 过滤和计算频率
         homophones = []
-        for combo in all_combinations:
-            new_word = "".join(combo)
-            if new_word != word and new_word in valid_words:
-                new_word_freq = valid_words[new_word]
-                # 只保留词频达到阈值的词
-                if new_word_freq >= min_word_freq:
-                    # 计算词的平均字频（考虑字频和词频）
-                    char_avg_freq = sum(self.char_frequency.get(c, 0) for c in new_word) / len(new_word)
-                    # 综合评分：结合词频和字频
-                    combined_score = new_word_freq * 0.7 + char_avg_freq * 0.3
-                    if combined_score >= self.min_freq:
-                        homophones.append((new_word, combined_score))
+        for new_word in candidates:
+            if new_word == word:
+                continue
+            new_word_freq = word_frequency[new_word]
+            # 只保留词频达到阈值的词
+            if new_word_freq >= min_word_freq:
+                # 计算词的平均字频（考虑字频和词频）
+                char_avg_freq = sum(self.char_frequency.get(c, 0) for c in new_word) / len(new_word)
+                # 综合评分：结合词频和字频
+                combined_score = new_word_freq * 0.7 + char_avg_freq * 0.3
+                if combined_score >= self.min_freq:
+                    homophones.append((new_word, combined_score))
 
         # 按综合分数排序并限制返回数量
         sorted_homophones = sorted(homophones, key=lambda x: x[1], reverse=True)
@@ -395,6 +460,7 @@ class ChineseTypoGenerator:
         word_typos = []  # 记录词语错误对(错词,正确词)
         char_typos = []  # 记录单字错误对(错字,正确字)
         current_pos = 0
+        char_to_pinyin = self._get_char_to_pinyin()
 
         # 分词
         words = self._segment_sentence(sentence)
@@ -425,7 +491,7 @@ class ChineseTypoGenerator:
                             word,
                             typo_word,
                             " ".join(word_pinyin),
-                            " ".join(self._get_word_pinyin(typo_word)),
+                            " ".join(char_to_pinyin.get(c, "") for c in typo_word),
                             orig_freq,
                             typo_freq,
                         )
@@ -439,41 +505,33 @@ class ChineseTypoGenerator:
                 char = word
                 py = word_pinyin[0]
                 if random.random() < self.error_rate:
-                    similar_chars = self._get_similar_frequency_chars(char, py)
-                    if similar_chars:
-                        typo_char = random.choice(similar_chars)
+                    typo_char = self._sample_typo_char(char, py)
+                    if typo_char:
+                        result.append(typo_char)
+                        typo_py = char_to_pinyin.get(typo_char, "")
                         typo_freq = self.char_frequency.get(typo_char, 0)
                         orig_freq = self.char_frequency.get(char, 0)
-                        replace_prob = self._calculate_replacement_probability(orig_freq, typo_freq)
-                        if random.random() < replace_prob:
-                            result.append(typo_char)
-                            typo_py = pinyin(typo_char, style=Style.TONE3)[0][0]
-                            typo_info.append((char, typo_char, py, typo_py, orig_freq, typo_freq))
-                            char_typos.append((typo_char, char))  # 记录(错字,正确字)对
-                            current_pos += 1
-                            continue
+                        typo_info.append((char, typo_char, py, typo_py, orig_freq, typo_freq))
+                        char_typos.append((typo_char, char))  # 记录(错字,正确字)对
+                        current_pos += 1
+                        continue
                 result.append(char)
                 current_pos += 1
             else:
-                # 处理多字词的单字替换
+                # 处理多字词的单字替换，词中的字替换概率降低
+                word_error_rate = self.error_rate * (0.7 ** (len(word) - 1))
                 word_result = []
-                for _, (char, py) in enumerate(zip(word, word_pinyin, strict=False)):
-                    # 词中的字替换概率降低
-                    word_error_rate = self.error_rate * (0.7 ** (len(word) - 1))
-
+                for char, py in zip(word, word_pinyin, strict=False):
                     if random.random() < word_error_rate:
-                        similar_chars = self._get_similar_frequency_chars(char, py)
-                        if similar_chars:
-                            typo_char = random.choice(similar_chars)
+                        typo_char = self._sample_typo_char(char, py)
+                        if typo_char:
+                            word_result.append(typo_char)
+                            typo_py = char_to_pinyin.get(typo_char, "")
                             typo_freq = self.char_frequency.get(typo_char, 0)
                             orig_freq = self.char_frequency.get(char, 0)
-                            replace_prob = self._calculate_replacement_probability(orig_freq, typo_freq)
-                            if random.random() < replace_prob:
-                                word_result.append(typo_char)
-                                typo_py = pinyin(typo_char, style=Style.TONE3)[0][0]
-                                typo_info.append((char, typo_char, py, typo_py, orig_freq, typo_freq))
-                                char_typos.append((typo_char, char))  # 记录(错字,正确字)对
-                                continue
+                            typo_info.append((char, typo_char, py, typo_py, orig_freq, typo_freq))
+                            char_typos.append((typo_char, char))  # 记录(错字,正确字)对
+                            continue
                     word_result.append(char)
                 result.append("".join(word_result))
                 current_pos += len(word)
@@ -533,10 +591,17 @@ class ChineseTypoGenerator:
             word_replace_rate: 整词替换概率
             max_freq_diff: 最大允许的频率差异
         """
+        table_params_changed = False
         for key, value in kwargs.items():
             if hasattr(self, key):
+                if key in ("min_freq", "max_freq_diff") and getattr(self, key) != value:
+                    table_params_changed = True
                 setattr(self, key, value)
 
+        # 候选表依赖这两个参数，变化时需要重新构建
+        if table_params_changed:
+            self._candidate_tables.clear()
+
 
 def main():
     # 创建错别字生成器实例
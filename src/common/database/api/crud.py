@@ -151,7 +151,7 @@ class CRUDBase(Generic[T]):
                 return _dict_to_model(self.model, cached_dict)
 
         # 从数据库查询
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(self.model).where(self.model.id == id)
             result = await session.execute(stmt)
             instance = result.scalar_one_or_none()
@@ -195,7 +195,7 @@ class CRUDBase(Generic[T]):
                 return _dict_to_model(self.model, cached_dict)
 
         # 从数据库查询
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(self.model)
             for key, value in filters.items():
                 if hasattr(self.model, key):
@@ -247,7 +247,7 @@ class CRUDBase(Generic[T]):
                 return [_dict_to_model(self.model, d) for d in cached_dicts]  # type: ignore
 
         # 从数据库查询
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(self.model)
 
             # 应用过滤条件
@@ -438,7 +438,7 @@ class CRUDBase(Generic[T]):
         Returns:
             记录数量
         """
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(func.count(self.model.id))
 
             # 应用过滤条件
@@ -213,7 +213,7 @@ class QueryBuilder(Generic[T]):
             # 构建带分页的查询
             paginated_stmt = self._stmt.offset(offset).limit(batch_size)
 
-            async with get_db_session() as session:
+            async with get_db_session(read_only=True) as session:
                 result = await session.execute(paginated_stmt)
                 instances = result.scalars().all()
 
@@ -283,7 +283,7 @@ class QueryBuilder(Generic[T]):
                 return [_dict_to_model(self.model, row) for row in dict_rows]
 
         # 从数据库查询
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             result = await session.execute(self._stmt)
             instances = list(result.scalars().all())
 
@@ -321,7 +321,7 @@ class QueryBuilder(Generic[T]):
                 return _dict_to_model(self.model, row)
 
         # 从数据库查询
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             result = await session.execute(self._stmt)
             instance = result.scalars().first()
 
@@ -358,7 +358,7 @@ class QueryBuilder(Generic[T]):
 
         # 构建count查询
         # 从数据库查询
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             result = await session.execute(count_stmt)
             count = result.scalar() or 0
 
@@ -450,7 +450,7 @@ class AggregateQuery:
         if not hasattr(self.model, field):
             raise ValueError(f"字段 {field} 不存在")
 
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(func.sum(getattr(self.model, field)))
 
             if self._conditions:
@@ -471,7 +471,7 @@ class AggregateQuery:
         if not hasattr(self.model, field):
             raise ValueError(f"字段 {field} 不存在")
 
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(func.avg(getattr(self.model, field)))
 
             if self._conditions:
@@ -492,7 +492,7 @@ class AggregateQuery:
         if not hasattr(self.model, field):
             raise ValueError(f"字段 {field} 不存在")
 
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(func.max(getattr(self.model, field)))
 
             if self._conditions:
@@ -513,7 +513,7 @@ class AggregateQuery:
         if not hasattr(self.model, field):
             raise ValueError(f"字段 {field} 不存在")
 
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(func.min(getattr(self.model, field)))
 
             if self._conditions:
@@ -546,7 +546,7 @@ class AggregateQuery:
         if not group_columns:
             return []
 
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             stmt = select(*group_columns, func.count(self.model.id))
 
             if self._conditions:
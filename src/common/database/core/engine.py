@@ -3,7 +3,8 @@
 单一职责：创建和管理SQLAlchemy异步引擎
 
 支持的数据库类型：
-- SQLite: 轻量级本地数据库，使用 aiosqlite 驱动
+- SQLite: 轻量级本地数据库，使用 aiosqlite 驱动。
+  写操作通过唯一的写连接排队执行，只读查询使用单独的 query_only 连接池（WAL 模式下读不会被写阻塞）
 - PostgreSQL: 功能丰富的开源数据库，使用 asyncpg 驱动
 """
 
@@ -11,8 +12,9 @@ import asyncio
 import os
 from urllib.parse import quote_plus
 
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from src.common.logger import get_logger
 
@@ -21,9 +23,41 @@ from .dialect_adapter import DialectAdapter
 
 logger = get_logger("database.engine")
 
-# 全局引擎实例
+# SQLite 的这些 PRAGMA 只对当前连接生效，在每个物理连接建立时执行一次
+SQLITE_CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout = 60000",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -10000",  # 10MB
+    "PRAGMA temp_store = MEMORY",
+)
+
+# SQLite 写会话排队等待写连接的最长时间（秒）
+SQLITE_WRITE_QUEUE_TIMEOUT = 60
+
+# PostgreSQL 会话级参数，随连接启动包发送，不产生额外的往返
+POSTGRESQL_SERVER_SETTINGS = {
+    # 排序/哈希内存，注意这是“每个排序操作”的上限，不要乱调太大
+    "work_mem": "64MB",
+    # 单条语句超时（1 分钟）
+    "statement_timeout": "60000",
+    # 提交同步级别：'local' 性能好一些，崩溃时可能丢几 ms 的数据
+    "synchronous_commit": "local",
+    # 对大量短小查询，通常关掉 JIT 更省 CPU
+    "jit": "off",
+    # 事务空闲超时，避免长时间占用锁
+    "idle_in_transaction_session_timeout": "60000",
+    # 等锁超过 5s 就报错，避免全部堆死
+    "lock_timeout": "5000",
+}
+
+# 全局引擎实例（SQLite 下只持有一个写连接）
 _engine: AsyncEngine | None = None
 _engine_lock: asyncio.Lock | None = None
+# 只读查询使用的引擎：SQLite 为 query_only 连接池，PostgreSQL 与 _engine 相同
+_read_engine: AsyncEngine | None = None
+# SQLite 嵌套写会话使用的临时连接（外层会话已占用写连接时）
+_overflow_engine: AsyncEngine | None = None
 
 
 async def get_engine() -> AsyncEngine:
@@ -35,7 +69,7 @@ async def get_engine() -> AsyncEngine:
     Raises:
         DatabaseInitializationError: 引擎初始化失败
     """
-    global _engine, _engine_lock
+    global _engine, _engine_lock, _read_engine
 
     # 快速路径：引擎已初始化
     if _engine is not None:
@@ -75,9 +109,11 @@ async def get_engine() -> AsyncEngine:
 
             # 数据库特定优化
             if db_type == "sqlite":
+                _register_sqlite_connection_settings(_engine)
                 await _enable_sqlite_optimizations(_engine)
-            elif db_type == "postgresql":
-                await _enable_postgresql_optimizations(_engine)
+                _read_engine = _create_sqlite_read_engine(url, engine_kwargs, config.connection_pool_size)
+            else:
+                _read_engine = _engine
 
             logger.info(f"{db_type.upper()} 数据库引擎初始化成功")
             return _engine
@@ -107,9 +143,13 @@ def _build_sqlite_config(config) -> tuple[str, dict]:
 
     url = f"sqlite+aiosqlite:///{db_path}"
 
+    # 写引擎只保留一个连接，会话在首次写入时才在连接池队列中依次取得连接，不再互相争抢数据库锁
     engine_kwargs = {
         "echo": False,
         "future": True,
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": SQLITE_WRITE_QUEUE_TIMEOUT,
         "connect_args": {
             "check_same_thread": False,
             "timeout": 60,
@@ -120,6 +160,26 @@ def _build_sqlite_config(config) -> tuple[str, dict]:
     return url, engine_kwargs
 
 
+def _create_sqlite_read_engine(url: str, write_kwargs: dict, pool_size: int) -> AsyncEngine:
+    """创建 SQLite 只读连接池，连接以 query_only 打开
+
+    Args:
+        url: 数据库URL
+        write_kwargs: 写引擎参数（复用 connect_args 等）
+        pool_size: 只读连接数量
+    """
+    engine = create_async_engine(
+        url,
+        echo=write_kwargs.get("echo", False),
+        future=True,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        connect_args=dict(write_kwargs.get("connect_args", {})),
+    )
+    _register_sqlite_connection_settings(engine, query_only=True)
+    return engine
+
+
 def _build_postgresql_config(config) -> tuple[str, dict]:
     """构建 PostgreSQL 配置
 
@@ -150,9 +210,11 @@ def _build_postgresql_config(config) -> tuple[str, dict]:
             ssl_config["ssl_key"] = config.postgresql_ssl_key
         connect_args.update(ssl_config)
 
-    # 设置 schema（如果不是 public）
+    # 会话级参数与 schema（如果不是 public）在建立连接时一并设置
+    server_settings = dict(POSTGRESQL_SERVER_SETTINGS)
     if config.postgresql_schema and config.postgresql_schema != "public":
-        connect_args["server_settings"] = {"search_path": config.postgresql_schema}
+        server_settings["search_path"] = config.postgresql_schema
+    connect_args["server_settings"] = server_settings
 
     engine_kwargs = {
         "echo": False,
@@ -173,92 +235,92 @@ def _build_postgresql_config(config) -> tuple[str, dict]:
     return url, engine_kwargs
 
 
+async def get_read_engine() -> AsyncEngine:
+    """获取只读查询使用的引擎
+
+    SQLite 返回 query_only 只读连接池，其他数据库返回全局引擎。
+    """
+    engine = await get_engine()
+    return _read_engine or engine
+
+
+async def get_overflow_engine() -> AsyncEngine:
+    """获取嵌套写会话使用的引擎
+
+    SQLite 的写连接只有一个，外层写会话尚未结束时，内层写会话若继续排队会互相等待，
+    因此改用按需建立的临时连接（由 busy_timeout 处理锁竞争）。其他数据库返回全局引擎。
+    """
+    global _overflow_engine
+
+    engine = await get_engine()
+    if _read_engine is engine:
+        return engine
+    if _overflow_engine is None:
+        _overflow_engine = create_async_engine(
+            engine.url,
+            echo=False,
+            future=True,
+            poolclass=NullPool,
+            connect_args={"check_same_thread": False, "timeout": 60},
+        )
+        _register_sqlite_connection_settings(_overflow_engine)
+    return _overflow_engine
+
+
 async def close_engine():
     """关闭数据库引擎
 
     释放所有连接池资源
     """
-    global _engine
+    global _engine, _read_engine, _overflow_engine
 
     if _engine is not None:
         logger.info("正在关闭数据库引擎...")
+        for engine in (_overflow_engine, _read_engine):
+            if engine is not None and engine is not _engine:
+                await engine.dispose()
         await _engine.dispose()
         _engine = None
+        _read_engine = None
+        _overflow_engine = None
         logger.info("数据库引擎已关闭")
 
 
-async def _enable_sqlite_optimizations(engine: AsyncEngine):
-    """启用SQLite性能优化
-
-    优化项：
-    - WAL模式：提高并发性能
-    - NORMAL同步：平衡性能和安全性
-    - 启用外键约束
-    - 设置busy_timeout：避免锁定错误
+def _register_sqlite_connection_settings(engine: AsyncEngine, query_only: bool = False) -> None:
+    """注册连接池 connect 事件，每个物理连接建立时执行一次连接级 PRAGMA
 
     Args:
         engine: SQLAlchemy异步引擎
+        query_only: 连接是否只允许查询
     """
-    try:
-        async with engine.begin() as conn:
-            # 启用WAL模式
-            await conn.execute(text("PRAGMA journal_mode = WAL"))
-            # 设置适中的同步级别
-            await conn.execute(text("PRAGMA synchronous = NORMAL"))
-            # 启用外键约束
-            await conn.execute(text("PRAGMA foreign_keys = ON"))
-            # 设置busy_timeout，避免锁定错误
-            await conn.execute(text("PRAGMA busy_timeout = 10000"))
-            # 设置缓存大小（10MB）
-            await conn.execute(text("PRAGMA cache_size = -10000"))
-            # 临时存储使用内存
-            await conn.execute(text("PRAGMA temp_store = MEMORY"))
+    pragmas = (*SQLITE_CONNECTION_PRAGMAS, "PRAGMA query_only = ON") if query_only else SQLITE_CONNECTION_PRAGMAS
 
-    except Exception as e:
-        logger.warning(f"⚠️ SQLite性能优化失败: {e}，将使用默认配置")
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
 
 
-async def _enable_postgresql_optimizations(engine: AsyncEngine) -> None:
-    """启用 PostgreSQL 会话级性能优化。
+async def _enable_sqlite_optimizations(engine: AsyncEngine):
+    """启用SQLite性能优化
+
+    WAL 模式写入数据库文件，持久生效，只需设置一次；
+    同步级别、外键约束、busy_timeout 等连接级设置见 SQLITE_CONNECTION_PRAGMAS。
 
-    包含：
-    - work_mem：单次排序/哈希可用内存
-    - statement_timeout：单条语句超时
-    - synchronous_commit：提交同步级别
-    - jit：是否启用 JIT
-    - idle_in_transaction_session_timeout：事务空闲超时
-    - lock_timeout：等待锁超时
+    Args:
+        engine: SQLAlchemy异步引擎
     """
     try:
         async with engine.begin() as conn:
-            # 排序/哈希内存，注意这是“每个排序操作”的上限，不要乱调太大
-            await conn.execute(text("SET work_mem = '64MB'"))
-
-            # 单条语句超时（1 分钟）
-            await conn.execute(text("SET statement_timeout = '60000'"))
-
-            # 提交同步级别：'local' 性能好一些，崩溃时可能丢几 ms 的数据
-            await conn.execute(text("SET synchronous_commit = 'local'"))
-
-            # 对大量短小查询，通常关掉 JIT 更省 CPU
-            await conn.execute(text("SET jit = 'off'"))
-
-            # 事务空闲超时，避免长时间占用锁
-            await conn.execute(
-                text("SET idle_in_transaction_session_timeout = '60000'")
-            )
-
-            # 等锁超过 5s 就报错，避免全部堆死
-            await conn.execute(text("SET lock_timeout = '5000'"))
-
-            # 可选：根据你预估的缓存情况设置
-            # await conn.execute(text("SET random_page_cost = 1.1"))
-            # await conn.execute(text("SET effective_cache_size = '2GB'"))
+            # 启用WAL模式：提高并发性能
+            await conn.execute(text("PRAGMA journal_mode = WAL"))
 
     except Exception as e:
-        logger.warning(
-            f"⚠️ PostgreSQL 会话级性能优化失败: {e}，将使用默认配置"
-        )
+        logger.warning(f"⚠️ SQLite性能优化失败: {e}，将使用默认配置")
 
 
 async def get_engine_info() -> dict:
@@ -279,6 +341,11 @@ async def get_engine_info() -> dict:
             "pool_overflow": getattr(engine.pool, "overflow", lambda: 0)(),
         }
 
+        read_engine = await get_read_engine()
+        if read_engine is not engine:
+            info["read_pool_size"] = getattr(read_engine.pool, "size", lambda: None)()
+            info["read_pool_checked_out"] = getattr(read_engine.pool, "checked_out", lambda: 0)()
+
         return info
 
     except Exception as e:
@@ -2,40 +2,89 @@
 
 单一职责：提供数据库会话工厂和上下文管理器
 
-支持的数据库类型：
-- SQLite: 设置 PRAGMA 参数优化并发
-- PostgreSQL: 可选设置 schema 搜索路径
+连接级设置（SQLite PRAGMA、PostgreSQL 会话参数与 schema 搜索路径）
+由引擎在建立物理连接时设置一次，会话检出时不再重复执行。
+
+会话按用途路由到不同引擎：
+- 默认会话：SQLite 下查询使用只读连接池，首次写入（flush、INSERT/UPDATE/DELETE 或原生 SQL）时
+  才在唯一的写连接上排队，此后该会话的全部语句都在写连接上执行，保证读到自己的未提交写入
+- 只读会话：SQLite 下使用 query_only 只读连接池，不会被写事务阻塞
+- 嵌套写会话：同一任务中外层默认会话未结束时，SQLite 改用临时连接，避免与外层互相等待
 """
 
 import asyncio
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+from contextvars import ContextVar
 
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import CompoundSelect, Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
 
 from src.common.logger import get_logger
 
-from .engine import get_engine
+from .engine import get_engine, get_overflow_engine, get_read_engine
 
 logger = get_logger("database.session")
 
-# 全局会话工厂
-_session_factory: async_sessionmaker | None = None
+# 会话用途 -> 获取对应引擎的函数
+_ENGINE_GETTERS: dict[str, Callable[[], Awaitable[AsyncEngine]]] = {
+    "write": get_engine,
+    "read": get_read_engine,
+    "overflow": get_overflow_engine,
+}
+
+# 全局会话工厂（按用途）
+_session_factories: dict[str, async_sessionmaker] = {}
 _factory_lock: asyncio.Lock | None = None
 
+# 打开了当前默认会话的任务；在会话内创建的子任务会继承上下文，需比对任务本身判断是否嵌套
+_write_session_task: ContextVar["asyncio.Task | None"] = ContextVar("db_write_session_task", default=None)
+
+
+def _is_plain_query(clause) -> bool:
+    """语句是否为不加锁的查询（可以在只读连接上执行）"""
+    if isinstance(clause, CompoundSelect):
+        return True
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+def _create_routing_session_class(write_engine: AsyncEngine, read_engine: AsyncEngine) -> type[Session]:
+    """创建按语句路由连接的会话类（SQLite 默认会话使用）
+
+    查询在只读连接池上执行；一旦会话开始写入，后续全部语句改在写连接上执行。
+    只读连接与写连接各自处于独立的事务中，因此写入前读到的数据不受写连接上的锁保护。
+    """
+
+    class _RoutingSession(Session):
+        def get_bind(self, mapper=None, clause=None, **kwargs):
+            if self.info.get("uses_write_connection") or self._flushing or not _is_plain_query(clause):
+                self.info["uses_write_connection"] = True
+                return write_engine.sync_engine
+            return read_engine.sync_engine
 
-async def get_session_factory() -> async_sessionmaker:
+    return _RoutingSession
+
+
+async def get_session_factory(read_only: bool = False) -> async_sessionmaker:
     """获取会话工厂（单例模式）
 
+    Args:
+        read_only: 是否获取只读会话工厂
+
     Returns:
         async_sessionmaker: SQLAlchemy异步会话工厂
     """
-    global _session_factory, _factory_lock
+    return await _get_session_factory("read" if read_only else "write")
+
+
+async def _get_session_factory(kind: str) -> async_sessionmaker:
+    global _factory_lock
 
     # 快速路径
-    if _session_factory is not None:
-        return _session_factory
+    factory = _session_factories.get(kind)
+    if factory is not None:
+        return factory
 
     # 延迟创建锁
     if _factory_lock is None:
@@ -43,70 +92,69 @@ async def get_session_factory() -> async_sessionmaker:
 
     async with _factory_lock:
         # 双重检查
-        if _session_factory is not None:
-            return _session_factory
-
-        engine = await get_engine()
-        _session_factory = async_sessionmaker(
-            bind=engine,
-            class_=AsyncSession,
-            expire_on_commit=False,  # 避免在commit后访问属性时重新查询
-        )
-
-        logger.debug("会话工厂已创建")
-        return _session_factory
-
-
-async def _apply_session_settings(session: AsyncSession, db_type: str) -> None:
-    """应用数据库特定的会话设置
-
-    Args:
-        session: 数据库会话
-        db_type: 数据库类型
-    """
-    try:
-        if db_type == "sqlite":
-            # SQLite 特定的 PRAGMA 设置
-            await session.execute(text("PRAGMA busy_timeout = 60000"))
-            await session.execute(text("PRAGMA foreign_keys = ON"))
-        elif db_type == "postgresql":
-            # PostgreSQL 特定设置（如果需要）
-            # 可以设置 schema 搜索路径等
-            from src.config.config import global_config
-
-            assert global_config is not None
-            schema = global_config.database.postgresql_schema
-            if schema and schema != "public":
-                await session.execute(text(f"SET search_path TO {schema}"))
-    except Exception:
-        # 复用连接时设置可能已存在，忽略错误
-        pass
+        factory = _session_factories.get(kind)
+        if factory is not None:
+            return factory
+
+        engine = await _ENGINE_GETTERS[kind]()
+        read_engine = await get_read_engine() if kind == "write" else engine
+        if read_engine is not engine:
+            # SQLite 默认会话：只有真正写入时才占用唯一的写连接
+            factory = async_sessionmaker(
+                class_=AsyncSession,
+                sync_session_class=_create_routing_session_class(engine, read_engine),
+                expire_on_commit=False,
+            )
+        else:
+            factory = async_sessionmaker(
+                bind=engine,
+                class_=AsyncSession,
+                expire_on_commit=False,  # 避免在commit后访问属性时重新查询
+            )
+        _session_factories[kind] = factory
+
+        logger.debug(f"会话工厂已创建: {kind}")
+        return factory
 
 
 @asynccontextmanager
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_db_session(read_only: bool = False) -> AsyncGenerator[AsyncSession, None]:
     """获取数据库会话上下文管理器
 
     这是数据库操作的主要入口点，直接从会话工厂获取独立会话。
 
     支持的数据库：
-    - SQLite: 自动设置 busy_timeout 和外键约束
+    - SQLite: busy_timeout 和外键约束已在连接建立时设置
     - PostgreSQL: 支持自定义 schema
 
     使用示例:
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             result = await session.execute(select(User))
             users = result.scalars().all()
 
+    Args:
+        read_only: 会话只执行查询，退出时不提交事务
+
     Yields:
         AsyncSession: SQLAlchemy异步会话对象
     """
-    async with get_db_session_direct() as session:
+    async with get_db_session_direct(read_only=read_only) as session:
         yield session
 
 
+async def _begin_read_only(session: AsyncSession) -> None:
+    """开启只读事务
+
+    PostgreSQL 通过 asyncpg 以 BEGIN READ ONLY 开启事务，不产生额外语句；
+    SQLite 没有只读事务的概念，查询结束后直接释放连接即可。
+    """
+    bind = session.get_bind()
+    if bind.dialect.name == "postgresql":
+        await session.connection(execution_options={"postgresql_readonly": True})
+
+
 @asynccontextmanager
-async def get_db_session_direct() -> AsyncGenerator[AsyncSession, None]:
+async def get_db_session_direct(read_only: bool = False) -> AsyncGenerator[AsyncSession, None]:
     """获取数据库会话（直接模式，不使用连接池）
 
     用于特殊场景，如需要完全独立的连接时。
@@ -114,40 +162,56 @@ async def get_db_session_direct() -> AsyncGenerator[AsyncSession, None]:
 
     事务管理说明：
     - 正常退出时自动提交事务
+    - 只读会话正常退出时不提交，关闭会话后由连接池回滚结束事务
+    - SQLite 下默认会话的查询使用只读连接池，写入时才经唯一的写连接依次执行；只读会话只使用只读连接池
     - 发生异常时自动回滚事务
     - 如果用户代码已手动调用 commit/rollback，再次调用是安全的
     - 适用于所有数据库类型（SQLite, PostgreSQL）
 
+    Args:
+        read_only: 会话只执行查询，退出时不提交事务
+
     Yields:
         AsyncSession: SQLAlchemy异步会话对象
     """
-    session_factory = await get_session_factory()
+    current_task = asyncio.current_task()
+    if read_only:
+        kind = "read"
+    elif current_task is not None and _write_session_task.get() is current_task:
+        kind = "overflow"
+    else:
+        kind = "write"
+    session_factory = await _get_session_factory(kind)
 
     async with session_factory() as session:
+        token = _write_session_task.set(current_task) if kind == "write" else None
         try:
-            # 应用数据库特定设置
-            from src.config.config import global_config
-
-            assert global_config is not None
-            await _apply_session_settings(session, global_config.database.database_type)
+            if read_only:
+                await _begin_read_only(session)
 
             yield session
 
-            # 正常退出时提交事务
-            # 这对所有数据库都很重要，因为 SQLAlchemy 默认不是 autocommit 模式
-            # 检查事务是否活动，避免在已回滚的事务上提交
-            if session.is_active:
-                await session.commit()
+            if not read_only:
+                # 正常退出时提交事务
+                # 这对所有数据库都很重要，因为 SQLAlchemy 默认不是 autocommit 模式
+                # 检查事务是否活动，避免在已回滚的事务上提交
+                if session.is_active:
+                    await session.commit()
+            elif session.new or session.dirty or session.deleted:
+                # 只读会话不提交；关闭会话不会让已加载的对象过期，调用方仍可访问其属性
+                logger.warning("只读数据库会话中存在未提交的修改，这些修改将被丢弃")
         except Exception:
             # 检查是否需要回滚（事务是否活动）
             if session.is_active:
                 await session.rollback()
             raise
         finally:
+            if token is not None:
+                with suppress(ValueError):  # 上下文管理器在其他上下文中退出时无法还原
+                    _write_session_task.reset(token)
             await session.close()
 
 
 async def reset_session_factory():
     """重置会话工厂（用于测试）"""
-    global _session_factory
-    _session_factory = None
+    _session_factories.clear()
@@ -2,6 +2,7 @@
 
 职责：
 - 批量调度
+- 后台批量写库
 - 多级缓存（内存缓存 + Redis缓存）
 """
 
@@ -13,6 +14,7 @@ from .batch_scheduler import (
     close_batch_scheduler,
     get_batch_scheduler,
 )
+from .batched_writer import BatchedWriter
 from .cache_backend import CacheBackend
 from .cache_backend import CacheStats as BaseCacheStats
 from .cache_manager import (
@@ -32,6 +34,7 @@ __all__ = [
     "BaseCacheStats",
     "BatchOperation",
     "BatchStats",
+    "BatchedWriter",
     # Cache Backend (Abstract)
     "CacheBackend",
     "CacheEntry",
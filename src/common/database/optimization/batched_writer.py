@@ -0,0 +1,127 @@
+"""后台批量写库的通用骨架
+
+写入方先把数据放进内存缓冲，由单个后台任务按时间间隔（或被 schedule(flush_now=True) 提前唤醒）批量写库。
+子类负责缓冲本身：实现 has_pending() 与 _flush_pending()，并保证 _flush_pending()
+在写库失败或被取消时把已取出的数据放回缓冲。
+"""
+
+import asyncio
+
+from src.common.logger import get_logger
+
+logger = get_logger("batched_writer")
+
+
+class BatchedWriter:
+    """
+    单写入任务的后台批量写库器
+
+    - 写入任务在首次有数据时于当前事件循环中懒启动
+    - stop() 不取消写入任务，而是通知其退出，等待进行中的写库完成后再刷新剩余数据
+    - stop() 之后仍有写入时（例如其他关闭任务仍在运行），由一次性的刷新任务写库
+    """
+
+    def __init__(self, name: str, flush_interval: float):
+        """
+        Args:
+            name: 写入任务名称（用于任务名与日志）
+            flush_interval: 最长写库间隔（秒）
+        """
+        self.name = name
+        self.flush_interval = flush_interval
+
+        self._wakeup_event: asyncio.Event | None = None
+        self._writer_task: asyncio.Task | None = None
+        self._late_flush_task: asyncio.Task | None = None
+        self._late_writes = False  # 停止后是否有尚未由刷新任务处理的写入
+        self._flush_lock: asyncio.Lock | None = None
+        self._stopping = False
+
+    def has_pending(self) -> bool:
+        """缓冲中是否有待写入的数据"""
+        raise NotImplementedError
+
+    async def _flush_pending(self) -> None:
+        """把缓冲写入数据库（持有刷新锁时调用）"""
+        raise NotImplementedError
+
+    async def flush(self) -> None:
+        """立即把缓冲中的全部数据写入数据库"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            if self.has_pending():
+                await self._flush_pending()
+
+    def schedule(self, flush_now: bool = False) -> None:
+        """有新数据写入后调用：确保写入任务运行
+
+        Args:
+            flush_now: 是否唤醒写入任务立即写库（例如缓冲已达到批量大小）
+        """
+        self._ensure_writer()
+        if flush_now and self._wakeup_event is not None:
+            self._wakeup_event.set()
+
+    async def stop(self) -> None:
+        """通知写入任务退出并刷新剩余数据"""
+        self._stopping = True
+        task = self._writer_task
+        if task is not None and not task.done():
+            if self._wakeup_event is not None:
+                self._wakeup_event.set()
+            try:
+                await task
+            except Exception as e:
+                logger.error(f"{self.name} 写入任务异常退出: {e}")
+        self._writer_task = None
+
+        await self.flush()
+        if self._late_flush_task is not None:
+            await asyncio.gather(self._late_flush_task, return_exceptions=True)
+
+    def _ensure_writer(self) -> None:
+        """在当前事件循环中启动后台写入任务（如尚未运行）；停止后改为调度一次性刷新"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        if self._stopping:
+            self._late_writes = True
+            if self._late_flush_task is None or self._late_flush_task.done():
+                self._late_flush_task = asyncio.create_task(self._late_flush(), name=f"{self.name}_late_flush")
+            return
+        if self._writer_task is not None and not self._writer_task.done():
+            return
+
+        self._wakeup_event = asyncio.Event()
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        self._writer_task = asyncio.create_task(self._writer_loop(), name=self.name)
+
+    async def _late_flush(self) -> None:
+        """停止后的写入：逐次刷新，直到刷新期间不再有新的写入"""
+        while self._late_writes:
+            self._late_writes = False
+            await self.flush()
+
+    async def _writer_loop(self) -> None:
+        """后台写入循环：被唤醒或等待超时后写库，stop() 时自然退出"""
+        assert self._wakeup_event is not None
+        while not self._stopping:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup_event.clear()
+                if self._stopping:
+                    break
+                if self.has_pending():
+                    await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name} 写入循环出错: {e}")
@@ -0,0 +1,192 @@
+"""
+延迟导入工具
+
+- ``import_if_enabled``: 按配置开关延迟导入可选子系统。功能关闭时完全不导入对应模块，
+  也就不会连带加载 numpy、faiss、jieba 等重量级依赖。
+- ``ImportTimeProfiler``: 类似 ``python -X importtime`` 的模块导入耗时统计，
+  由 ``[debug] enable_import_profiler`` 开启，启动完成后输出报告。
+"""
+
+import importlib
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import Any
+
+from src.common.logger import get_logger
+
+logger = get_logger("lazy_import")
+
+
+def is_feature_enabled(flag_path: str) -> bool:
+    """按点分路径读取 global_config 中的开关，例如 ``"lpmm_knowledge.enable"``"""
+    from src.config.config import global_config
+
+    value: Any = global_config
+    for part in flag_path.split("."):
+        value = getattr(value, part, None)
+        if value is None:
+            return False
+    return bool(value)
+
+
+def import_if_enabled(flag_path: str, module_name: str, attr: str | None = None) -> Any | None:
+    """配置开关开启时导入模块（或模块中的属性），关闭时返回 None 且不触发导入
+
+    Args:
+        flag_path: global_config 中开关的点分路径
+        module_name: 模块名
+        attr: 需要取出的模块属性，为 None 时返回模块本身
+    """
+    if not is_feature_enabled(flag_path):
+        logger.debug(f"{flag_path} 未启用，跳过导入 {module_name}")
+        return None
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+class _TimedLoader:
+    """包装原加载器以统计模块执行耗时，执行结束后把模块上的加载器恢复为原对象"""
+
+    def __init__(self, loader: Any, profiler: "ImportTimeProfiler", fullname: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._fullname = fullname
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        # 扩展模块的初始化发生在 create_module 中，同样计入耗时
+        return self._profiler._timed(self._fullname, self._loader.create_module, spec)
+
+    def exec_module(self, module) -> None:
+        try:
+            self._profiler._timed(self._fullname, self._loader.exec_module, module)
+        finally:
+            spec = getattr(module, "__spec__", None)
+            if spec is not None and spec.loader is self:
+                spec.loader = self._loader
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self._loader
+
+
+class ImportTimeProfiler(MetaPathFinder):
+    """模块导入耗时统计
+
+    安装后位于 sys.meta_path 首位，把其余查找器返回的 spec 的加载器替换为计时包装。
+    每个模块记录累计耗时（含其导入的子模块）与自身耗时，嵌套关系按线程分别维护。
+    """
+
+    def __init__(self):
+        self._records: dict[str, list[float]] = {}  # 模块名 -> [累计耗时, 自身耗时]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_at = 0.0
+        self._elapsed = 0.0
+
+    @property
+    def installed(self) -> bool:
+        return self in sys.meta_path
+
+    def install(self) -> None:
+        """开始统计"""
+        if self.installed:
+            return
+        self._records.clear()
+        self._started_at = time.perf_counter()
+        sys.meta_path.insert(0, self)
+        logger.info("模块导入耗时统计已开启")
+
+    def uninstall(self) -> None:
+        """停止统计（已记录的数据保留，可继续输出报告）"""
+        if not self.installed:
+            return
+        sys.meta_path.remove(self)
+        self._elapsed = time.perf_counter() - self._started_at
+
+    def find_spec(self, fullname, path, target=None):
+        local = self._local
+        if getattr(local, "finding", False):
+            return None
+
+        local.finding = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            local.finding = False
+
+        if spec is None:
+            return None
+        loader = spec.loader
+        if loader is not None and spec.origin is not None and hasattr(loader, "exec_module"):
+            spec.loader = _TimedLoader(loader, self, fullname)
+        return spec
+
+    def _timed(self, fullname: str, func, *args):
+        stack: list[float] | None = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        stack.append(0.0)  # 当前模块中子模块导入的耗时
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                record = self._records.setdefault(fullname, [0.0, 0.0])
+                record[0] += elapsed
+                record[1] += elapsed - children
+
+    def get_records(self) -> dict[str, tuple[float, float]]:
+        """获取统计结果: 模块名 -> (累计耗时, 自身耗时)，单位为秒"""
+        with self._lock:
+            return {name: (record[0], record[1]) for name, record in self._records.items()}
+
+    def format_report(self, top_n: int = 30) -> str:
+        """生成导入耗时报告：按累计耗时排序的模块，以及按顶层包汇总的自身耗时"""
+        records = self.get_records()
+        if not records:
+            return "没有记录到模块导入"
+
+        total_self = sum(self_time for _, self_time in records.values())
+        elapsed = self._elapsed if not self.installed else time.perf_counter() - self._started_at
+        lines = [
+            f"模块导入耗时统计: 共 {len(records)} 个模块, 导入耗时合计 {total_self:.2f}s (统计区间 {elapsed:.2f}s)",
+            f"{'累计(ms)':>10} {'自身(ms)':>10}  模块",
+        ]
+        ranked = sorted(records.items(), key=lambda item: item[1][0], reverse=True)
+        lines.extend(
+            f"{cumulative * 1000:>10.1f} {self_time * 1000:>10.1f}  {name}"
+            for name, (cumulative, self_time) in ranked[:top_n]
+        )
+
+        packages: dict[str, float] = {}
+        for name, (_, self_time) in records.items():
+            package = name.split(".", 1)[0]
+            packages[package] = packages.get(package, 0.0) + self_time
+        lines.append("按顶层包汇总:")
+        lines.extend(
+            f"{self_time * 1000:>10.1f}ms  {package}"
+            for package, self_time in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        )
+        return "\n".join(lines)
+
+    def log_report(self, top_n: int = 30) -> None:
+        """输出导入耗时报告"""
+        logger.info(self.format_report(top_n))
+
+
+# 全局导入耗时统计实例
+import_profiler = ImportTimeProfiler()
@@ -58,7 +58,7 @@ async def find_messages(
     """
     try:
         assert global_config is not None
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             query = select(Messages)
 
             # 应用过滤器
@@ -190,7 +190,7 @@ async def count_messages(message_filter: dict[str, Any]) -> int:
         符合条件的消息数量，如果出错则返回 0。
     """
     try:
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             query = select(func.count(Messages.id))
 
             # 应用过滤器
@@ -247,7 +247,7 @@ async def count_and_length_messages(message_filter: dict[str, Any]) -> tuple[int
         (消息数量, 文本总长度)，出错时返回 (0, 0)
     """
     try:
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             count_expr = func.count(Messages.id)
             length_expr = func.coalesce(func.sum(func.length(Messages.processed_plain_text)), 0)
             query = select(count_expr, length_expr)
@@ -323,7 +323,7 @@ async def get_user_messages_from_streams(
         return {}
 
     try:
-        async with get_db_session() as session:
+        async with get_db_session(read_only=True) as session:
             # 使用 CTE 和 row_number() 来为每个聊天流中的用户消息进行排序和编号
             ranked_messages_cte = (
                 select(
@@ -75,6 +75,7 @@ class ModelInfo(ValidatedConfigBase):
         default="light", description="扰动强度（light/medium/heavy）"
     )
     enable_semantic_variants: bool = Field(default=False, description="是否启用语义变体作为扰动策略")
+    max_concurrency: int = Field(default=0, ge=0, description="该模型同时在途的最大请求数（进程内所有任务共享），0表示不限制")
     @classmethod
     def validate_prices(cls, v):
         """验证价格必须为非负数"""
@@ -107,6 +108,9 @@ class TaskConfig(ValidatedConfigBase):
     max_tokens: int = Field(default=800, description="任务最大输出token数")
     temperature: float = Field(default=0.7, description="模型温度")
     concurrency_count: int = Field(default=1, description="并发请求数量")
+    hedge_requests: bool = Field(
+        default=False, description="是否启用对冲请求：主请求超过其p95延迟仍未返回时，向另一个模型发起备用请求，取先返回者"
+    )
     embedding_dimension: int | None = Field(
         default=None,
         description="嵌入模型输出向量维度，仅在嵌入任务中使用",
@@ -40,7 +40,7 @@ class DatabaseConfig(ValidatedConfigBase):
     postgresql_ssl_key: str = Field(default="", description="PostgreSQL SSL密钥路径")
 
     # 通用连接池配置
-    connection_pool_size: int = Field(default=10, ge=1, description="连接池大小")
+    connection_pool_size: int = Field(default=10, ge=1, description="连接池大小（PostgreSQL 连接池 / SQLite 只读连接池）")
     connection_timeout: int = Field(default=10, ge=1, description="连接超时时间")
 
     # 批量动作记录存储配置
@@ -339,6 +339,16 @@ class EmojiConfig(ValidatedConfigBase):
     enable_emotion_analysis: bool = Field(default=True, description="启用情感分析")
     emoji_selection_mode: Literal["emotion", "description"] = Field(default="emotion", description="表情选择模式")
     max_context_emojis: int = Field(default=30, description="每次随机传递给LLM的表情包最大数量，0为全部")
+    enable_embedding_prefilter: bool = Field(
+        default=False, description="使用描述嵌入预筛候选表情包，嵌入模型不可用时回退为随机抽取"
+    )
+    embedding_candidate_count: int = Field(default=8, ge=1, description="嵌入预筛后传递给LLM的候选表情包数量")
+    embedding_direct_pick_similarity: float = Field(
+        default=0.6, ge=0.0, le=1.0, description="最佳候选的相似度不低于该值时才可能跳过LLM直接选择"
+    )
+    embedding_direct_pick_margin: float = Field(
+        default=0.08, ge=0.0, description="最佳候选领先第二名的相似度差值不低于该值时跳过LLM直接选择"
+    )
 
 
 class MemoryConfig(ValidatedConfigBase):
@@ -618,6 +628,10 @@ class DebugConfig(ValidatedConfigBase):
     """调试配置类"""
 
     show_prompt: bool = Field(default=False, description="显示提示")
+    enable_import_profiler: bool = Field(
+        default=False, description="启动时统计模块导入耗时（类似 python -X importtime），初始化完成后输出报告"
+    )
+    import_profiler_top_n: int = Field(default=30, ge=1, description="导入耗时报告中列出的模块数量")
 
 
 class ExperimentalConfig(ValidatedConfigBase):
@@ -854,6 +868,17 @@ class AffinityFlowConfig(ValidatedConfigBase):
     weak_mention_interest_score: float = Field(default=1.5, description="弱提及的兴趣分（文本匹配bot名字或别名）")
     base_relationship_score: float = Field(default=0.5, description="基础人物关系分")
 
+    # 投机回复（规划与回复上下文构建并行）
+    enable_speculative_reply: bool = Field(
+        default=False, description="是否在高兴趣度时与规划器并行预先构建回复上下文"
+    )
+    speculative_interest_threshold: float = Field(
+        default=0.9, description="触发投机回复的最低兴趣度，只有高置信度时才值得提前构建"
+    )
+    speculative_draft_reply: bool = Field(
+        default=False, description="是否在投机阶段直接生成回复草稿（命中时延迟最低，未命中会浪费一次回复模型调用）"
+    )
+
 class ProactiveThinkingConfig(ValidatedConfigBase):
     """主动思考（主动发起对话）功能配置"""
 
@@ -1051,6 +1076,10 @@ class KokoroFlowChatterConfig(ValidatedConfigBase):
         default=True,
         description="是否在等待期间启用心理活动更新"
     )
+    max_concurrent_thinking: int = Field(
+        default=4, ge=1, le=32,
+        description="主动思考器同时处理的Session数量上限（等待思考、超时决策与主动发起共用）"
+    )
 
     # --- 自定义决策提示词 ---
     custom_decision_prompt: str = Field(
@@ -0,0 +1,205 @@
+"""
+@desc: 进程级模型健康度注册表。
+
+所有 LLMRequest 实例共享同一份按模型名称索引的健康数据，包括：
+
+- **EWMA 延迟**: 指数加权移动平均，近期变慢的模型会很快体现出来，而不是被历史均值掩盖。
+- **延迟分位数**: 基于最近一段窗口计算 p95，用于对冲请求（hedged request）的发起延迟。
+- **EWMA 错误率**: 近期失败比例，参与模型选择打分。
+- **熔断器**: 连续失败达到阈值后短暂熔断，冷却后放行一个探测请求（半开状态）。
+- **并发上限**: 按模型配置的 `max_concurrency` 限制同时在途的请求数量。
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+
+from src.common.logger import get_logger
+from src.config.api_ada_configs import ModelInfo
+
+logger = get_logger("model_health")
+
+
+class CircuitState(Enum):
+    """熔断器状态"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class ModelHealth:
+    """单个模型的健康数据"""
+
+    ewma_latency: float = 0.0
+    ewma_error_rate: float = 0.0
+    sample_count: int = 0
+    consecutive_failures: int = 0
+    in_flight: int = 0
+    circuit_state: CircuitState = CircuitState.CLOSED
+    open_until: float = 0.0
+    open_duration: float = 0.0
+    probe_in_flight: bool = False
+    recent_latencies: deque = field(default_factory=lambda: deque(maxlen=ModelHealthRegistry.LATENCY_WINDOW))
+
+
+class ModelHealthRegistry:
+    """按模型名称维护健康数据的进程级注册表"""
+
+    EWMA_ALPHA = 0.2  # EWMA 平滑系数，越大越偏向最近的样本
+    LATENCY_WINDOW = 100  # 计算分位数使用的最近样本数量
+    MIN_SAMPLES_FOR_PERCENTILE = 10  # 样本不足时不计算分位数
+
+    FAILURE_THRESHOLD = 5  # 连续失败多少次后熔断
+    ERROR_RATE_THRESHOLD = 0.5  # EWMA 错误率超过该值且样本足够时熔断
+    BASE_OPEN_DURATION = 30.0  # 首次熔断时长（秒）
+    MAX_OPEN_DURATION = 300.0  # 熔断时长上限（秒），半开探测失败时时长翻倍
+
+    def __init__(self):
+        self._health: dict[str, ModelHealth] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def get(self, model_name: str) -> ModelHealth:
+        """获取模型的健康数据（不存在时创建）"""
+        health = self._health.get(model_name)
+        if health is None:
+            health = self._health[model_name] = ModelHealth()
+        return health
+
+    # ------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------
+
+    def record_success(self, model_name: str, latency: float) -> None:
+        """记录一次成功请求及其延迟"""
+        health = self.get(model_name)
+        if health.sample_count == 0:
+            health.ewma_latency = latency
+        else:
+            health.ewma_latency += self.EWMA_ALPHA * (latency - health.ewma_latency)
+        health.ewma_error_rate *= 1 - self.EWMA_ALPHA
+        health.sample_count += 1
+        health.consecutive_failures = 0
+        health.recent_latencies.append(latency)
+
+        if health.circuit_state != CircuitState.CLOSED:
+            logger.info(f"模型 '{model_name}' 探测请求成功，熔断器关闭")
+        health.circuit_state = CircuitState.CLOSED
+        health.open_duration = 0.0
+        health.probe_in_flight = False
+
+    def record_failure(self, model_name: str) -> None:
+        """记录一次失败请求，必要时打开熔断器"""
+        health = self.get(model_name)
+        health.ewma_error_rate += self.EWMA_ALPHA * (1.0 - health.ewma_error_rate)
+        health.sample_count += 1
+        health.consecutive_failures += 1
+
+        if health.circuit_state == CircuitState.HALF_OPEN:
+            self._open_circuit(model_name, health, min(health.open_duration * 2, self.MAX_OPEN_DURATION))
+        elif health.circuit_state == CircuitState.CLOSED and (
+            health.consecutive_failures >= self.FAILURE_THRESHOLD
+            or (
+                health.sample_count >= self.MIN_SAMPLES_FOR_PERCENTILE
+                and health.ewma_error_rate >= self.ERROR_RATE_THRESHOLD
+            )
+        ):
+            self._open_circuit(model_name, health, self.BASE_OPEN_DURATION)
+
+    def release_probe(self, model_name: str) -> None:
+        """请求被取消（既非成功也非失败）时释放半开探测名额"""
+        self.get(model_name).probe_in_flight = False
+
+    def _open_circuit(self, model_name: str, health: ModelHealth, duration: float) -> None:
+        health.circuit_state = CircuitState.OPEN
+        health.open_duration = duration
+        health.open_until = time.monotonic() + duration
+        health.probe_in_flight = False
+        logger.warning(
+            f"模型 '{model_name}' 熔断 {duration:.0f} 秒 (连续失败 {health.consecutive_failures} 次, "
+            f"错误率 {health.ewma_error_rate:.2f})"
+        )
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def is_available(self, model_name: str) -> bool:
+        """模型当前是否允许接收请求（不改变状态）"""
+        health = self.get(model_name)
+        if health.circuit_state == CircuitState.CLOSED:
+            return True
+        if health.circuit_state == CircuitState.OPEN:
+            return time.monotonic() >= health.open_until
+        return not health.probe_in_flight
+
+    def acquire_request(self, model_name: str) -> None:
+        """模型被选中发起请求时调用，冷却结束的熔断器进入半开状态并占用探测名额"""
+        health = self.get(model_name)
+        if health.circuit_state == CircuitState.OPEN and time.monotonic() >= health.open_until:
+            health.circuit_state = CircuitState.HALF_OPEN
+        if health.circuit_state == CircuitState.HALF_OPEN:
+            health.probe_in_flight = True
+
+    def latency_percentile(self, model_name: str, percentile: float) -> float | None:
+        """最近窗口内的延迟分位数，样本不足时返回 None"""
+        latencies = self.get(model_name).recent_latencies
+        if len(latencies) < self.MIN_SAMPLES_FOR_PERCENTILE:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile))
+        return ordered[index]
+
+    def get_snapshot(self) -> dict[str, dict]:
+        """获取所有模型健康数据的快照（用于统计和调试）"""
+        return {
+            name: {
+                "ewma_latency": round(health.ewma_latency, 3),
+                "p95_latency": self.latency_percentile(name, 0.95),
+                "ewma_error_rate": round(health.ewma_error_rate, 3),
+                "consecutive_failures": health.consecutive_failures,
+                "in_flight": health.in_flight,
+                "circuit_state": health.circuit_state.value,
+            }
+            for name, health in self._health.items()
+        }
+
+    # ------------------------------------------------------------------
+    # 并发控制
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, model_info: ModelInfo):
+        """占用一个模型并发名额，未配置 max_concurrency 时不限制"""
+        semaphore = self._get_semaphore(model_info)
+        health = self.get(model_info.name)
+        if semaphore is None:
+            health.in_flight += 1
+            try:
+                yield
+            finally:
+                health.in_flight -= 1
+            return
+
+        async with semaphore:
+            health.in_flight += 1
+            try:
+                yield
+            finally:
+                health.in_flight -= 1
+
+    def _get_semaphore(self, model_info: ModelInfo) -> asyncio.Semaphore | None:
+        limit = getattr(model_info, "max_concurrency", 0) or 0
+        if limit <= 0:
+            return None
+        semaphore = self._semaphores.get(model_info.name)
+        if semaphore is None:
+            semaphore = self._semaphores[model_info.name] = asyncio.Semaphore(limit)
+        return semaphore
+
+
+model_health_registry = ModelHealthRegistry()
@@ -1,11 +1,15 @@
 import base64
 import io
+from collections import deque
 from datetime import datetime
+from typing import Any
 
 from PIL import Image
+from sqlalchemy import insert
 
 from src.common.database.core import get_db_session
 from src.common.database.core.models import LLMUsage
+from src.common.database.optimization.batched_writer import BatchedWriter
 from src.common.logger import get_logger
 from src.config.api_ada_configs import ModelInfo
 
@@ -142,12 +146,32 @@ def compress_messages(messages: list[Message], img_target_size: int = 1 * 1024 *
     return compressed_messages
 
 
-class LLMUsageRecorder:
+class LLMUsageRecorder(BatchedWriter):
     """
     LLM使用情况记录器（SQLAlchemy版本）
+
+    用量记录先进入有界的内存队列，由单个后台写入任务按条数或时间批量写入数据库，
+    避免每次请求都单独开启会话并提交一行。关闭时调用 stop() 刷新剩余记录。
     """
 
-    async def record_usage_to_database(
+    DB_CHUNK_SIZE = 200  # 单条 INSERT 语句包含的最大行数
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 2.0, max_queue_size: int = 5000):
+        """
+        Args:
+            batch_size: 队列中累积多少条记录时立即写库
+            flush_interval: 最长写库间隔（秒）
+            max_queue_size: 队列上限，超出时丢弃最旧的记录
+        """
+        super().__init__("llm_usage_writer", flush_interval)
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+
+        self._queue: deque[dict[str, Any]] = deque()
+
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "batches": 0, "failed_batches": 0}
+
+    def enqueue_usage(
         self,
         model_info: ModelInfo,
         model_usage: UsageRecord,
@@ -155,42 +179,111 @@ class LLMUsageRecorder:
         request_type: str,
         endpoint: str,
         time_cost: float = 0.0,
-    ):
+    ) -> None:
+        """将一次用量记录放入写入队列（不等待写库）"""
         input_cost = (model_usage.prompt_tokens / 1000000) * model_info.price_in
         output_cost = (model_usage.completion_tokens / 1000000) * model_info.price_out
         total_cost = round(input_cost + output_cost, 6)
 
-        session = None
+        self._append(
+            {
+                "model_name": model_info.model_identifier,
+                "model_assign_name": model_info.name,
+                "model_api_provider": model_info.api_provider,
+                "user_id": user_id,
+                "request_type": request_type,
+                "endpoint": endpoint,
+                "prompt_tokens": model_usage.prompt_tokens or 0,
+                "completion_tokens": model_usage.completion_tokens or 0,
+                "total_tokens": model_usage.total_tokens or 0,
+                "cost": total_cost,
+                "time_cost": round(time_cost or 0.0, 3),
+                "status": "success",
+                "timestamp": datetime.now(),
+            }
+        )
+        self.stats["recorded"] += 1
+
+        logger.debug(
+            f"Token使用情况 - 模型: {model_usage.model_name}, "
+            f"用户: {user_id}, 类型: {request_type}, "
+            f"提示词: {model_usage.prompt_tokens}, 完成: {model_usage.completion_tokens}, "
+            f"总计: {model_usage.total_tokens}"
+        )
+
+        self.schedule(flush_now=len(self._queue) >= self.batch_size)
+
+    async def record_usage_to_database(
+        self,
+        model_info: ModelInfo,
+        model_usage: UsageRecord,
+        user_id: str,
+        request_type: str,
+        endpoint: str,
+        time_cost: float = 0.0,
+    ):
+        """兼容旧接口：放入写入队列，由后台任务批量写库"""
+        self.enqueue_usage(model_info, model_usage, user_id, request_type, endpoint, time_cost)
+
+    def has_pending(self) -> bool:
+        return bool(self._queue)
+
+    async def _flush_pending(self) -> None:
+        """将队列中的全部记录写入数据库，失败或被取消时放回队首"""
+        while self._queue:
+            batch = list(self._queue)
+            self._queue.clear()
+            written = False
+            try:
+                written = await self._write_batch(batch)
+            finally:
+                if not written:
+                    # 写入失败（或被取消），放回队首等待下次重试
+                    for row in reversed(batch):
+                        self._append(row, front=True)
+            if not written:
+                break
+
+    async def stop(self) -> None:
+        """停止后台写入任务并刷新剩余记录"""
+        await super().stop()
+        if self._queue:
+            logger.warning(f"LLM使用记录器关闭时仍有 {len(self._queue)} 条记录未能写入数据库")
+        logger.info(
+            f"LLM使用记录器已停止 (记录 {self.stats['recorded']} 条, 写入 {self.stats['written']} 条, "
+            f"丢弃 {self.stats['dropped']} 条, 批次 {self.stats['batches']})"
+        )
+
+    def _append(self, row: dict[str, Any], front: bool = False) -> None:
+        if len(self._queue) >= self.max_queue_size:
+            if front:
+                self.stats["dropped"] += 1
+                return
+            self._queue.popleft()
+            self.stats["dropped"] += 1
+            if self.stats["dropped"] % 100 == 1:
+                logger.warning(f"LLM使用记录队列已满({self.max_queue_size})，丢弃最旧的记录 (累计 {self.stats['dropped']} 条)")
+        if front:
+            self._queue.appendleft(row)
+        else:
+            self._queue.append(row)
+
+    async def _write_batch(self, batch: list[dict[str, Any]]) -> bool:
+        """使用多行 INSERT 写入一批记录"""
+        if not batch:
+            return True
         try:
-            # 使用 SQLAlchemy 会话创建记录
             async with get_db_session() as session:
-                usage_record = LLMUsage(
-                    model_name=model_info.model_identifier,
-                    model_assign_name=model_info.name,
-                    model_api_provider=model_info.api_provider,
-                    user_id=user_id,
-                    request_type=request_type,
-                    endpoint=endpoint,
-                    prompt_tokens=model_usage.prompt_tokens or 0,
-                    completion_tokens=model_usage.completion_tokens or 0,
-                    total_tokens=model_usage.total_tokens or 0,
-                    cost=total_cost,
-                    time_cost=round(time_cost or 0.0, 3),
-                    status="success",
-                    timestamp=datetime.now(),  # SQLAlchemy 会处理 DateTime 字段
-                )
-
-                session.add(usage_record)
+                for start in range(0, len(batch), self.DB_CHUNK_SIZE):
+                    await session.execute(insert(LLMUsage), batch[start : start + self.DB_CHUNK_SIZE])
                 await session.commit()
-
-            logger.debug(
-                f"Token使用情况 - 模型: {model_usage.model_name}, "
-                f"用户: {user_id}, 类型: {request_type}, "
-                f"提示词: {model_usage.prompt_tokens}, 完成: {model_usage.completion_tokens}, "
-                f"总计: {model_usage.total_tokens}"
-            )
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+            return True
         except Exception as e:
-            logger.error(f"记录token使用情况失败: {e!s}")
+            self.stats["failed_batches"] += 1
+            logger.error(f"批量记录token使用情况失败 ({len(batch)} 条): {e!s}")
+            return False
 
 
 llm_usage_recorder = LLMUsageRecorder()
@@ -4,6 +4,7 @@
 
 - **模型选择器 (_ModelSelector)**:
   实现了基于负载均衡和失败惩罚的动态模型选择策略，确保在高并发或部分模型失效时系统的稳定性。
+  延迟、错误率和熔断状态来自进程级共享的 `model_health_registry`。
 
 - **提示处理器 (_PromptProcessor)**:
   负责对输入模型的提示词进行预处理（如内容混淆、反截断指令注入）和对模型输出进行后处理（如提取思考过程、检查截断）。
@@ -12,7 +13,8 @@
   封装了底层的API请求逻辑，包括自动重试、异常分类处理和消息体压缩等功能。
 
 - **请求策略 (_RequestStrategy)**:
-  实现了高阶请求策略，如模型间的故障转移（Failover），确保单个模型的失败不会导致整个请求失败。
+  实现了高阶请求策略，如模型间的故障转移（Failover）和对冲请求（Hedging），
+  确保单个模型的失败或变慢不会拖垮整个请求。
 
 - **LLMRequest (主接口)**:
   作为模块的统一入口（Facade），为上层业务逻辑提供了简洁的接口来发起文本、图像、语音等不同类型的LLM请求。
@@ -37,6 +39,7 @@ from src.config.config import model_config
 
 from .exceptions import NetworkConnectionError, ReqAbortException, RespNotOkException, RespParseException
 from .model_client.base_client import APIResponse, BaseClient, UsageRecord, client_registry
+from .model_health import model_health_registry
 from .payload_content.message import Message, MessageBuilder, RoleType
 from .payload_content.system_prompt import SYSTEM_PROMPT
 from .payload_content.tool_option import ToolCall, ToolOption, ToolOptionBuilder
@@ -89,7 +92,7 @@ async def execute_concurrently(
     **kwargs,
 ) -> Any:
     """
-    执行并发请求并从成功的结果中随机选择一个。
+    执行并发请求，返回最先成功的结果并取消其余仍在进行的请求。
 
     Args:
         coro_callable (Callable): 要并发执行的协程函数。
@@ -98,29 +101,32 @@ async def execute_concurrently(
         **kwargs: 传递给协程函数的关键字参数。
 
     Returns:
-        Any: 其中一个成功执行的结果。
+        Any: 最先成功执行的结果。
 
     Raises:
         RuntimeError: 如果所有并发请求都失败。
     """
     logger.info(f"启用并发请求模式，并发数: {concurrency_count}")
-    tasks = [coro_callable(*args, **kwargs) for _ in range(concurrency_count)]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    successful_results = [res for res in results if not isinstance(res, Exception)]
-
-    if successful_results:
-        selected = random.choice(successful_results)
-        logger.info(f"并发请求完成，从{len(successful_results)}个成功结果中选择了一个")
-        return selected
-
-    # 如果所有请求都失败了，记录所有异常并抛出第一个
-    for i, res in enumerate(results):
-        if isinstance(res, Exception):
-            logger.error(f"并发任务 {i + 1}/{concurrency_count} 失败: {res}")
-
-    first_exception = next((res for res in results if isinstance(res, Exception)), None)
-    if first_exception:
-        raise first_exception
+    tasks = [asyncio.create_task(coro_callable(*args, **kwargs)) for _ in range(concurrency_count)]
+    exceptions: list[BaseException] = []
+
+    try:
+        for finished in asyncio.as_completed(tasks):
+            try:
+                result = await finished
+            except Exception as e:
+                exceptions.append(e)
+                logger.error(f"并发任务失败 ({len(exceptions)}/{concurrency_count}): {e}")
+                continue
+            logger.info(f"并发请求完成，采用最先成功的结果（已失败 {len(exceptions)} 个）")
+            return result
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    if exceptions:
+        raise exceptions[0]
     raise RuntimeError(f"所有 {concurrency_count} 个并发请求都失败了，但没有具体的异常信息")
 
 
@@ -148,6 +154,7 @@ class _ModelSelector:
     CRITICAL_PENALTY_MULTIPLIER = 5  # 严重错误惩罚乘数
     DEFAULT_PENALTY_INCREMENT = 1  # 默认惩罚增量
     LATENCY_WEIGHT = 200  # 延迟权重
+    ERROR_RATE_WEIGHT = 2000  # 近期错误率权重
 
     def __init__(self, model_list: list[str], model_usage: dict[str, ModelUsageStats]):
         """
@@ -183,20 +190,37 @@ class _ModelSelector:
             logger.warning("没有可用的模型供当前请求选择。")
             return None
 
+        # 排除处于熔断状态的模型；如果全部熔断，则仍在其中选择，避免请求直接失败
+        healthy_models_usage = {
+            model_name: usage_data
+            for model_name, usage_data in candidate_models_usage.items()
+            if model_health_registry.is_available(model_name)
+        }
+        if healthy_models_usage:
+            candidate_models_usage = healthy_models_usage
+        else:
+            logger.warning("所有候选模型均处于熔断状态，仍尝试从中选择一个。")
+
         # 核心负载均衡算法：选择一个综合得分最低的模型。
-        # 公式: total_tokens + penalty * 300 + usage_penalty * 1000 + avg_latency * 200
+        # 公式: total_tokens + penalty * 300 + usage_penalty * 1000 + ewma_latency * 200 + error_rate * 2000
         # 设计思路:
         # - `total_tokens`: 基础成本，优先使用累计token少的模型，实现长期均衡。
         # - `penalty * 300`: 失败惩罚项。每次失败会增加penalty，使其在短期内被选中的概率降低。权重300意味着一次失败大致相当于300个token的成本。
         # - `usage_penalty * 1000`: 短期使用惩罚项。每次被选中后会增加，完成后会减少。高权重确保在多个模型都健康的情况下，请求会均匀分布（轮询）。
-        # - `avg_latency * 200`: 延迟惩罚项。优先选择平均响应时间更快的模型。权重200意味着1秒的延迟约等于200个token的成本。
-        least_used_model_name = min(
-            candidate_models_usage,
-            key=lambda k: candidate_models_usage[k].total_tokens
-            + candidate_models_usage[k].penalty * 300
-            + candidate_models_usage[k].usage_penalty * 1000
-            + candidate_models_usage[k].avg_latency * self.LATENCY_WEIGHT,
-        )
+        # - `ewma_latency * 200`: 延迟惩罚项。使用进程级共享的EWMA延迟，模型近期变慢会很快反映出来。权重200意味着1秒的延迟约等于200个token的成本。
+        # - `error_rate * 2000`: 近期错误率惩罚项（进程级共享，随成功请求衰减）。
+        def score(model_name: str) -> float:
+            usage = candidate_models_usage[model_name]
+            health = model_health_registry.get(model_name)
+            return (
+                usage.total_tokens
+                + usage.penalty * 300
+                + usage.usage_penalty * 1000
+                + health.ewma_latency * self.LATENCY_WEIGHT
+                + health.ewma_error_rate * self.ERROR_RATE_WEIGHT
+            )
+
+        least_used_model_name = min(candidate_models_usage, key=score)
 
         assert model_config is not None, "model_config 不能为 None"
         model_info = model_config.get_model_info(least_used_model_name)
@@ -206,6 +230,7 @@ class _ModelSelector:
         client = client_registry.get_client_class_instance(api_provider)
 
         logger.debug(f"为当前请求选择了最佳可用模型: {model_info.name}")
+        model_health_registry.acquire_request(model_info.name)
         # 增加所选模型的请求使用惩罚值，以实现动态负载均衡。
         await self.update_usage_penalty(model_info.name, increase=True)
         return model_info, api_provider, client
@@ -759,11 +784,15 @@ class _RequestExecutor:
 
 class _RequestStrategy:
     """
-    封装高级请求策略，如故障转移。
+    封装高级请求策略，如故障转移和对冲请求。
     此类协调模型选择、提示处理和请求执行，以实现健壮的请求处理，
     即使在单个模型或API端点失败的情况下也能正常工作。
     """
 
+    HEDGE_PERCENTILE = 0.95  # 以该分位数延迟作为对冲请求的发起时机
+    HEDGE_DEFAULT_DELAY = 10.0  # 延迟样本不足时的默认对冲延迟（秒）
+    HEDGE_MIN_DELAY = 1.0  # 对冲延迟下限（秒），避免对极快模型过早发起备用请求
+
     def __init__(
         self,
         model_selector: _ModelSelector,
@@ -795,14 +824,22 @@ class _RequestStrategy:
         self,
         request_type: RequestType,
         raise_when_empty: bool = True,
+        hedge: bool = False,
         **kwargs,
     ) -> tuple[APIResponse, ModelInfo]:
         """
         执行请求，动态选择最佳可用模型，并在模型失败时进行故障转移。
+
+        Args:
+            request_type (RequestType): 请求类型。
+            raise_when_empty (bool): 所有模型都失败时是否抛出异常。
+            hedge (bool): 是否启用对冲请求。启用后，主请求超过该模型的p95延迟仍未返回时，
+                会向另一个模型发起备用请求，采用先成功者并取消较慢的一个。
         """
         failed_models_in_this_request = set()
         max_attempts = len(self.model_list)
         last_exception: Exception | None = None
+        hedge = hedge and max_attempts > 1
 
         for attempt in range(max_attempts):
             selection_result = await self.model_selector.select_best_available_model(
@@ -816,41 +853,11 @@ class _RequestStrategy:
             logger.debug(f"尝试 {attempt + 1}/{max_attempts}: 正在使用模型 '{model_info.name}'...")
 
             try:
-                # 准备请求参数
-                request_kwargs = kwargs.copy()
-                if request_type == RequestType.RESPONSE and "prompt" in request_kwargs:
-                    prompt = request_kwargs.pop("prompt")
-                    processed_prompt = await self.prompt_processor.prepare_prompt(
-                        prompt, model_info, self.task_name
+                if hedge:
+                    return await self._execute_hedged(
+                        selection_result, failed_models_in_this_request, request_type, **kwargs
                     )
-                    message_list = []
-                    if self.system_prompt:
-                        system_message = (
-                            MessageBuilder()
-                            .set_role(RoleType.System)
-                            .add_text_content(self.system_prompt)
-                            .build()
-                        )
-                        message_list.append(system_message)
-
-                    user_message = MessageBuilder().add_text_content(processed_prompt).build()
-                    message_list.append(user_message)
-                    request_kwargs["message_list"] = message_list
-
-                # 合并模型特定的额外参数
-                if model_info.extra_params:
-                    request_kwargs["extra_params"] = {
-                        **model_info.extra_params,
-                        **request_kwargs.get("extra_params", {}),
-                    }
-
-                response = await self._try_model_request(
-                    model_info, api_provider, client, request_type, **request_kwargs
-                )
-
-                # 成功，立即返回
-                logger.debug(f"模型 '{model_info.name}' 成功生成了回复。")
-                await self.model_selector.update_usage_penalty(model_info.name, increase=False)
+                response = await self._attempt_model(model_info, api_provider, client, request_type, **kwargs)
                 return response, model_info
 
             except Exception as e:
@@ -870,6 +877,121 @@ class _RequestStrategy:
         fallback_model_info = model_config.get_model_info(self.model_list[0])
         return APIResponse(content="所有模型都请求失败"), fallback_model_info
 
+    async def _attempt_model(
+        self, model_info: ModelInfo, api_provider: APIProvider, client: BaseClient, request_type: RequestType, **kwargs
+    ) -> APIResponse:
+        """
+        使用已选定的单个模型发起请求，并将结果记录到进程级健康注册表。
+
+        受模型的并发上限约束；请求被取消时归还使用惩罚值，不计为失败。
+        """
+        # 准备请求参数
+        request_kwargs = kwargs.copy()
+        if request_type == RequestType.RESPONSE and "prompt" in request_kwargs:
+            prompt = request_kwargs.pop("prompt")
+            processed_prompt = await self.prompt_processor.prepare_prompt(prompt, model_info, self.task_name)
+            message_list = []
+            if self.system_prompt:
+                system_message = (
+                    MessageBuilder().set_role(RoleType.System).add_text_content(self.system_prompt).build()
+                )
+                message_list.append(system_message)
+
+            user_message = MessageBuilder().add_text_content(processed_prompt).build()
+            message_list.append(user_message)
+            request_kwargs["message_list"] = message_list
+
+        # 合并模型特定的额外参数
+        if model_info.extra_params:
+            request_kwargs["extra_params"] = {
+                **model_info.extra_params,
+                **request_kwargs.get("extra_params", {}),
+            }
+
+        try:
+            async with model_health_registry.slot(model_info):
+                start_time = time.monotonic()
+                response = await self._try_model_request(
+                    model_info, api_provider, client, request_type, **request_kwargs
+                )
+        except asyncio.CancelledError:
+            model_health_registry.release_probe(model_info.name)
+            await self.model_selector.update_usage_penalty(model_info.name, increase=False)
+            raise
+        except Exception:
+            model_health_registry.record_failure(model_info.name)
+            raise
+
+        model_health_registry.record_success(model_info.name, time.monotonic() - start_time)
+        # 成功，立即返回
+        logger.debug(f"模型 '{model_info.name}' 成功生成了回复。")
+        await self.model_selector.update_usage_penalty(model_info.name, increase=False)
+        return response
+
+    async def _execute_hedged(
+        self,
+        primary: tuple[ModelInfo, APIProvider, BaseClient],
+        failed_models: set,
+        request_type: RequestType,
+        **kwargs,
+    ) -> tuple[APIResponse, ModelInfo]:
+        """
+        对冲请求：先向主模型发起请求，超过其p95延迟仍未返回时向另一个模型发起备用请求。
+
+        采用最先成功的结果并取消另一个；失败的模型会被加入 `failed_models`。
+        两者均失败时抛出最后一个异常，由外层故障转移继续处理。
+        """
+        primary_info = primary[0]
+        pending: dict[asyncio.Task, ModelInfo] = {
+            asyncio.create_task(self._attempt_model(*primary, request_type, **kwargs)): primary_info
+        }
+        hedge_delay = self._get_hedge_delay(primary_info.name)
+        last_exception: BaseException | None = None
+        backup_started = False
+
+        try:
+            while pending:
+                timeout = None if backup_started else hedge_delay
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    model_info = pending.pop(task)
+                    exception = task.exception()
+                    if exception is None:
+                        if backup_started:
+                            logger.info(f"对冲请求由模型 '{model_info.name}' 率先返回")
+                        return task.result(), model_info
+                    logger.warning(f"对冲请求中模型 '{model_info.name}' 失败: {exception}")
+                    failed_models.add(model_info.name)
+                    last_exception = exception
+
+                # 主请求超时未返回（或已失败）时，发起一次备用请求
+                if not backup_started and (not done or not pending):
+                    backup_started = True
+                    excluded = failed_models | {info.name for info in pending.values()}
+                    backup = await self.model_selector.select_best_available_model(excluded, str(request_type.value))
+                    if backup is not None:
+                        if pending:
+                            logger.info(
+                                f"模型 '{primary_info.name}' 超过 {hedge_delay:.1f}s 未返回，"
+                                f"向模型 '{backup[0].name}' 发起对冲请求"
+                            )
+                        pending[asyncio.create_task(self._attempt_model(*backup, request_type, **kwargs))] = backup[0]
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_exception is not None:
+            raise last_exception
+        raise RuntimeError("对冲请求没有可用的模型")
+
+    def _get_hedge_delay(self, model_name: str) -> float:
+        """根据模型近期p95延迟计算对冲请求的发起延迟"""
+        p95 = model_health_registry.latency_percentile(model_name, self.HEDGE_PERCENTILE)
+        if p95 is None:
+            return self.HEDGE_DEFAULT_DELAY
+        return max(self.HEDGE_MIN_DELAY, p95)
+
     async def _try_model_request(
         self, model_info: ModelInfo, api_provider: APIProvider, client: BaseClient, request_type: RequestType, **kwargs
     ) -> APIResponse:
@@ -1024,15 +1146,26 @@ class LLMRequest:
             .build()
         )
 
-        response = await self._executor.execute_request(
-            api_provider,
-            client,
-            RequestType.RESPONSE,
-            model_info,
-            message_list=[message],
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        try:
+            async with model_health_registry.slot(model_info):
+                response = await self._executor.execute_request(
+                    api_provider,
+                    client,
+                    RequestType.RESPONSE,
+                    model_info,
+                    message_list=[message],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+        except asyncio.CancelledError:
+            model_health_registry.release_probe(model_info.name)
+            raise
+        except Exception:
+            model_health_registry.record_failure(model_info.name)
+            raise
+        finally:
+            await self._model_selector.update_usage_penalty(model_info.name, increase=False)
+        model_health_registry.record_success(model_info.name, time.time() - start_time)
 
         await self._record_usage(model_info, response.usage, time.time() - start_time, "/chat/completions")
         content, reasoning, _ = await self._prompt_processor.process_response(response.content or "", False)
@@ -1088,7 +1221,7 @@ class LLMRequest:
                 temperature,
                 max_tokens,
                 tools,
-                raise_when_empty=False,
+                raise_when_empty=True,  # 失败的并发请求以异常形式返回，只采用真正成功的结果
             )
         except Exception as e:
             logger.error(f"所有 {concurrency_count} 个并发请求都失败了: {e}")
@@ -1132,6 +1265,7 @@ class LLMRequest:
                 tool_options=tool_options,
                 temperature=self.model_for_task.temperature if temperature is None else temperature,
                 max_tokens=self.model_for_task.max_tokens if max_tokens is None else max_tokens,
+                hedge=getattr(self.model_for_task, "hedge_requests", False),
             )
 
             await self._record_usage(model_info, response.usage, time.time() - start_time, "/chat/completions")
@@ -1207,8 +1341,8 @@ class LLMRequest:
         """
         记录模型使用情况。
 
-        此方法首先在内存中更新模型的累计token使用量，然后创建一个异步任务，
-        将详细的用量数据（包括模型信息、token数、耗时等）写入数据库。
+        此方法首先在内存中更新模型的累计token使用量，然后将详细的用量数据
+        （包括模型信息、token数、耗时等）放入写入队列，由后台任务批量写入数据库。
 
         Args:
             model_info (ModelInfo): 使用的模型信息。
@@ -1221,9 +1355,14 @@ class LLMRequest:
             async with self._stats_lock:
                 stats = self.model_usage[model_info.name]
 
-                # 计算新的平均延迟
+                # 使用EWMA更新平均延迟，使近期的延迟变化能及时反映出来
                 new_request_count = stats.request_count + 1
-                new_avg_latency = (stats.avg_latency * stats.request_count + time_cost) / new_request_count
+                if stats.request_count == 0:
+                    new_avg_latency = time_cost
+                else:
+                    new_avg_latency = stats.avg_latency + model_health_registry.EWMA_ALPHA * (
+                        time_cost - stats.avg_latency
+                    )
 
                 self.model_usage[model_info.name] = stats._replace(
                     total_tokens=stats.total_tokens + usage.total_tokens,
@@ -1231,16 +1370,14 @@ class LLMRequest:
                     request_count=new_request_count,
                 )
 
-            # 步骤2: 创建一个后台任务，将用量数据异步写入数据库（无需等待）
-            asyncio.create_task(  # noqa: RUF006
-                llm_usage_recorder.record_usage_to_database(
-                    model_info=model_info,
-                    model_usage=usage,
-                    user_id="system",  # 此处可根据业务需求修改
-                    time_cost=time_cost,
-                    request_type=self.task_name,
-                    endpoint=endpoint,
-                )
+            # 步骤2: 放入用量写入队列，由后台任务批量写入数据库（无需等待）
+            llm_usage_recorder.enqueue_usage(
+                model_info=model_info,
+                model_usage=usage,
+                user_id="system",  # 此处可根据业务需求修改
+                time_cost=time_cost,
+                request_type=self.task_name,
+                endpoint=endpoint,
             )
 
     @staticmethod
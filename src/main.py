@@ -19,6 +19,7 @@ from src.common.core_sink_manager import (
     initialize_core_sink_manager,
     shutdown_core_sink_manager,
 )
+from src.common.lazy_import import import_if_enabled, is_feature_enabled
 from src.common.logger import get_logger
 from src.common.mem_monitor import (
     MEM_MONITOR_ENABLED,
@@ -36,8 +37,6 @@ from src.mood.mood_manager import mood_manager
 from src.plugin_system.base.component_types import EventType
 from src.plugin_system.core.event_manager import event_manager
 from src.plugin_system.core.plugin_manager import plugin_manager
-from src.schedule.monthly_plan_manager import monthly_plan_manager
-from src.schedule.schedule_manager import schedule_manager
 
 # 插件系统现在使用统一的插件加载器
 install(extra_lines=3)
@@ -148,6 +147,30 @@ class MainSystem:
         except Exception as e:
             logger.error(f"准备停止消息批处理器时出错: {e}")
 
+        # 刷新LLM使用记录队列
+        try:
+            from src.llm_models.utils import llm_usage_recorder
+
+            cleanup_tasks.append(("LLM使用记录器", llm_usage_recorder.stop()))
+        except Exception as e:
+            logger.error(f"准备停止LLM使用记录器时出错: {e}")
+
+        # 刷新人物信息写回缓冲
+        try:
+            from src.person_info.person_info import person_info_write_buffer
+
+            cleanup_tasks.append(("人物信息写回缓冲", person_info_write_buffer.stop()))
+        except Exception as e:
+            logger.error(f"准备停止人物信息写回缓冲时出错: {e}")
+
+        # 保存表达风格学习器
+        try:
+            from src.chat.express.style_learner import style_learner_manager
+
+            cleanup_tasks.append(("表达风格学习器", style_learner_manager.save_all()))
+        except Exception as e:
+            logger.error(f"准备保存表达风格学习器时出错: {e}")
+
         # 停止消息管理器
         try:
             from src.chat.message_manager import message_manager
@@ -165,12 +188,11 @@ class MainSystem:
             logger.error(f"准备停止消息重组器时出错: {e}")
 
         # 停止增强记忆系统
-        # 停止三层记忆系统
+        # 停止三层记忆系统（未启用时不导入记忆模块）
         try:
-            from src.memory_graph.manager_singleton import get_unified_memory_manager, shutdown_unified_memory_manager
-
-            if get_unified_memory_manager():
-                cleanup_tasks.append(("三层记忆系统", shutdown_unified_memory_manager()))
+            memory_singleton = import_if_enabled("memory.enable", "src.memory_graph.manager_singleton")
+            if memory_singleton and memory_singleton.get_unified_memory_manager():
+                cleanup_tasks.append(("三层记忆系统", memory_singleton.shutdown_unified_memory_manager()))
                 logger.info("准备停止三层记忆系统...")
         except Exception as e:
             logger.error(f"准备停止三层记忆系统时出错: {e}")
@@ -448,31 +470,29 @@ class MainSystem:
         _background_tasks.add(task)
         task.add_done_callback(_background_tasks.discard)
 
-        # 初始化记忆图系统
+        # 初始化记忆图系统与三层记忆系统（未启用时不导入记忆模块）
         try:
-            from src.memory_graph.manager_singleton import initialize_memory_manager
-            await self._safe_init("记忆图系统", initialize_memory_manager)()
-        except Exception as e:
-            logger.error(f"记忆图系统初始化失败: {e}")
-
-        # 初始化三层记忆系统（如果启用）
-        try:
-            if global_config and global_config.memory and global_config.memory.enable:
-                from src.memory_graph.manager_singleton import initialize_unified_memory_manager
+            memory_singleton = import_if_enabled("memory.enable", "src.memory_graph.manager_singleton")
+            if memory_singleton:
+                await self._safe_init("记忆图系统", memory_singleton.initialize_memory_manager)()
                 logger.debug("三层记忆系统已启用，正在初始化...")
-                await initialize_unified_memory_manager()
+                await memory_singleton.initialize_unified_memory_manager()
                 logger.debug("三层记忆系统初始化成功")
             else:
                 logger.debug("三层记忆系统未启用（配置中禁用）")
         except Exception as e:
             logger.error(f"三层记忆系统初始化失败: {e}")
 
-        # 初始化LPMM知识库
+        # 初始化LPMM知识库（未启用时不导入知识库模块）
         try:
-            from src.chat.knowledge.knowledge_lib import initialize_lpmm_knowledge
-
-            initialize_lpmm_knowledge()
-            logger.debug("LPMM知识库初始化成功")
+            initialize_lpmm_knowledge = import_if_enabled(
+                "lpmm_knowledge.enable", "src.chat.knowledge.knowledge_lib", "initialize_lpmm_knowledge"
+            )
+            if initialize_lpmm_knowledge:
+                initialize_lpmm_knowledge()
+                logger.debug("LPMM知识库初始化成功")
+            else:
+                logger.debug("LPMM知识库未启用（配置中禁用）")
         except Exception as e:
             logger.error(f"LPMM知识库初始化失败: {e}")
 
@@ -546,17 +566,22 @@ class MainSystem:
 
     async def _init_planning_components(self) -> None:
         """初始化计划相关组件"""
-        # 初始化月度计划管理器
-        if global_config and global_config.planning_system and global_config.planning_system.monthly_plan_enable:
-            try:
+        # 初始化月度计划管理器（未启用时不导入）
+        try:
+            monthly_plan_manager = import_if_enabled(
+                "planning_system.monthly_plan_enable", "src.schedule.monthly_plan_manager", "monthly_plan_manager"
+            )
+            if monthly_plan_manager is not None:
                 await monthly_plan_manager.start_monthly_plan_generation()
                 logger.debug("月度计划管理器初始化成功")
-            except Exception as e:
-                logger.error(f"月度计划管理器初始化失败: {e}")
+        except Exception as e:
+            logger.error(f"月度计划管理器初始化失败: {e}")
 
-        # 初始化日程管理器
-        if global_config and global_config.planning_system and global_config.planning_system.schedule_enable:
+        # 初始化日程管理器（未启用时不导入）
+        if is_feature_enabled("planning_system.schedule_enable"):
             try:
+                from src.schedule.schedule_manager import schedule_manager
+
                 await schedule_manager.load_or_generate_today_schedule()
                 await schedule_manager.start_daily_schedule_generation()
                 logger.debug("日程表管理器初始化成功")
@@ -2,14 +2,18 @@ import copy
 import datetime
 import hashlib
 import time
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import Any
 
 import orjson
 from json_repair import repair_json
+from sqlalchemy import update
 
 from src.common.database.api.crud import CRUDBase
+from src.common.database.core import get_db_session
 from src.common.database.core.models import PersonInfo
+from src.common.database.optimization.batched_writer import BatchedWriter
 from src.common.database.utils.decorators import cached
 from src.common.logger import get_logger
 from src.config.config import global_config, model_config
@@ -384,7 +388,10 @@ class PersonInfoManager:
         await _db_safe_create_async(final_data)
 
     async def update_one_field(self, person_id: str, field_name: str, value, data: dict | None = None):
-        """更新某一个字段，会补全"""
+        """更新某一个字段，会补全
+
+        写入先进入写回缓冲，由后台任务按人合并后写库；记录不存在时使用 data 补全并新建。
+        """
         # 获取 SQLAlchemy 模型的所有字段名
         model_fields = [column.name for column in PersonInfo.__table__.columns]
         if field_name not in model_fields:
@@ -398,73 +405,7 @@ class PersonInfoManager:
             elif value is None:  # Store None as "[]" for JSON list fields
                 processed_value = orjson.dumps([]).decode("utf-8")
 
-        async def _db_update_async(p_id: str, f_name: str, val_to_set):
-            start_time = time.time()
-            try:
-                # 使用CRUD进行更新
-                crud = CRUDBase(PersonInfo)
-                record = await crud.get_by(person_id=p_id)
-                query_time = time.time()
-
-                if record:
-                    # 更新记录
-                    await crud.update(record.id, {f_name: val_to_set})
-                    save_time = time.time()
-                    total_time = save_time - start_time
-
-                    if total_time > 0.5:
-                        logger.warning(
-                            f"数据库更新操作耗时 {total_time:.3f}秒 (查询: {query_time - start_time:.3f}s, 保存: {save_time - query_time:.3f}s) person_id={p_id}, field={f_name}"
-                        )
-
-                    # 使缓存失效
-                    from src.common.database.optimization.cache_manager import get_cache
-                    from src.common.database.utils.decorators import generate_cache_key
-                    cache = await get_cache()
-                    # 使相关缓存失效
-                    await cache.delete(generate_cache_key("person_value", p_id, f_name))
-                    await cache.delete(generate_cache_key("person_values", p_id))
-                    await cache.delete(generate_cache_key("person_has_field", p_id, f_name))
-
-                    return True, False
-                else:
-                    total_time = time.time() - start_time
-                    if total_time > 0.5:
-                        logger.warning(f"数据库查询操作耗时 {total_time:.3f}秒 person_id={p_id}, field={f_name}")
-                    return False, True
-            except Exception as e:
-                total_time = time.time() - start_time
-                logger.error(f"数据库操作异常，耗时 {total_time:.3f}秒: {e}")
-                raise
-
-        _found, needs_creation = await _db_update_async(person_id, field_name, processed_value)
-
-        if needs_creation:
-            logger.info(f"{person_id} 不存在，将新建。")
-            creation_data = data if data is not None else {}
-            # Ensure platform and user_id are present for context if available from 'data'
-            # but primarily, set the field that triggered the update.
-            # The create_person_info will handle defaults and serialization.
-            creation_data[field_name] = value  # Pass original value to create_person_info
-
-            # Ensure platform and user_id are in creation_data if available,
-            # otherwise create_person_info will use defaults.
-            if data and "platform" in data:
-                creation_data["platform"] = data["platform"]
-            if data and "user_id" in data:
-                creation_data["user_id"] = data["user_id"]
-
-            # 额外检查关键字段，如果为None则使用默认值
-            if creation_data.get("user_id") is None:
-                logger.warning(f"创建用户时user_id为None，使用'unknown'作为默认值 person_id={person_id}")
-                creation_data["user_id"] = "unknown"
-
-            if creation_data.get("platform") is None:
-                logger.warning(f"创建用户时platform为None，使用'unknown'作为默认值 person_id={person_id}")
-                creation_data["platform"] = "unknown"
-
-            # 使用安全的创建方法，处理竞态条件
-            await self._safe_create_person_info(person_id, creation_data)
+        await person_info_write_buffer.set_field(person_id, field_name, processed_value, data)
 
     @staticmethod
     @cached(ttl=300, key_prefix="person_has_field")
@@ -645,6 +586,8 @@ class PersonInfoManager:
             logger.debug("删除失败：person_id 不能为空")
             return
 
+        person_info_write_buffer.discard(person_id)
+
         async def _db_delete_async(p_id: str):
             try:
                 # 使用CRUD进行删除
@@ -670,9 +613,16 @@ class PersonInfoManager:
             logger.debug(f"删除失败：未找到 person_id={person_id} 或删除未影响行")
 
     @staticmethod
-    @cached(ttl=600, key_prefix="person_value")
     async def get_value(person_id: str, field_name: str) -> Any:
-        """获取单个字段值（带10分钟缓存）"""
+        """获取单个字段值（带10分钟缓存，写回缓冲中的最近写入优先）"""
+        found, value = person_info_write_buffer.lookup(person_id, field_name)
+        if found:
+            return value
+        return await PersonInfoManager._get_value_cached(person_id, field_name)
+
+    @staticmethod
+    @cached(ttl=600, key_prefix="person_value")
+    async def _get_value_cached(person_id: str, field_name: str) -> Any:
         if not person_id:
             logger.debug("get_value获取失败：person_id不能为空")
             return None
@@ -719,9 +669,24 @@ class PersonInfoManager:
             return copy.deepcopy(person_info_default.get(field_name))
 
     @staticmethod
-    @cached(ttl=600, key_prefix="person_values")
     async def get_values(person_id: str, field_names: list) -> dict:
-        """获取指定person_id文档的多个字段值（带10分钟缓存）"""
+        """获取指定person_id文档的多个字段值（带10分钟缓存，写回缓冲中的最近写入优先）"""
+        result = await PersonInfoManager._get_values_cached(person_id, field_names)
+        if not result:
+            return result
+
+        overridden = None
+        for field_name in field_names:
+            found, value = person_info_write_buffer.lookup(person_id, field_name)
+            if found:
+                if overridden is None:
+                    overridden = dict(result)
+                overridden[field_name] = value
+        return overridden if overridden is not None else result
+
+    @staticmethod
+    @cached(ttl=600, key_prefix="person_values")
+    async def _get_values_cached(person_id: str, field_names: list) -> dict:
         if not person_id:
             logger.debug("get_values获取失败：person_id不能为空")
             return {}
@@ -933,6 +898,227 @@ class PersonInfoManager:
         return None
 
 
+def _decode_field_value(field_name: str, value: Any) -> Any:
+    """把数据库中的字段值转换为 get_value 返回的形式"""
+    if value is None:
+        return copy.deepcopy(person_info_default.get(field_name))
+    if field_name in JSON_SERIALIZED_FIELDS and isinstance(value, str):
+        try:
+            return orjson.loads(value)
+        except Exception:
+            return copy.deepcopy(person_info_default.get(field_name))
+    return value
+
+
+class PersonInfoWriteBuffer(BatchedWriter):
+    """
+    人物信息字段的写回缓冲（identity map）
+
+    update_one_field 只把字段写入按人分组的脏字段表，后台任务按固定间隔把每个人的脏字段合并为
+    一条 UPDATE，关闭时调用 stop() 刷新剩余写入。记录不存在时在首次写入时立即新建，只有字段更新被缓冲。
+    最近写入的值在内存中保留 OVERLAY_TTL 秒（不短于 getter 缓存的 TTL），get_value/get_values
+    以其覆盖缓存中的旧值；其他按字段直接查询数据库的读取在写库（最长 flush_interval 秒）后才能看到新值。
+    写库后删除 CRUD 层与 get_or_create_person 缓存的整条记录，下次读取时重新加载。
+    """
+
+    OVERLAY_TTL = 600.0  # 与 get_value/get_values 的缓存 TTL 一致
+    MAX_KNOWN_PERSONS = 10000  # 记录已确认存在的 person_id 数量上限（LRU）
+
+    def __init__(self, flush_interval: float = 2.0):
+        """
+        Args:
+            flush_interval: 最长写库间隔（秒）
+        """
+        super().__init__("person_info_writer", flush_interval)
+
+        self._dirty: dict[str, dict[str, Any]] = {}  # person_id -> {字段: 待写入的数据库值}
+        self._creation_data: dict[str, dict] = {}  # person_id -> 写库时记录已被删除的情况下用于重建的补全数据
+        self._recent: dict[str, dict[str, Any]] = {}  # person_id -> {字段: 最近写入的数据库值}
+        self._recent_at: dict[str, float] = {}  # person_id -> 最近写入时间
+        self._known_persons: OrderedDict[str, None] = OrderedDict()  # 已确认存在记录的 person_id
+
+        self.stats = {"field_writes": 0, "flushed_persons": 0, "created_persons": 0, "batches": 0, "failed_batches": 0}
+
+    def lookup(self, person_id: str, field_name: str) -> tuple[bool, Any]:
+        """查询最近写入的字段值，返回 (是否命中, get_value 形式的值)"""
+        fields = self._recent.get(person_id)
+        if not fields or field_name not in fields:
+            return False, None
+        if person_id not in self._dirty and time.time() - self._recent_at[person_id] > self.OVERLAY_TTL:
+            self._recent.pop(person_id, None)
+            self._recent_at.pop(person_id, None)
+            return False, None
+        return True, copy.deepcopy(_decode_field_value(field_name, fields[field_name]))
+
+    async def set_field(self, person_id: str, field_name: str, db_value: Any, data: dict | None = None) -> None:
+        """记录一次字段写入（数据库形式的值），并就地更新对应的缓存条目
+
+        记录不存在时立即以 data 与本字段新建，保证按字段查询的读取路径也能立即看到新用户。
+        """
+        self._recent.setdefault(person_id, {})[field_name] = db_value
+        self._recent_at[person_id] = time.time()
+        self.stats["field_writes"] += 1
+
+        await self._ensure_person_exists(person_id, field_name, db_value, data)
+        # 新建时字段已随记录写入，仍进入缓冲：并发新建时本次写入可能落在他人创建的记录上
+        self._dirty.setdefault(person_id, {})[field_name] = db_value
+        if data:
+            self._creation_data.setdefault(person_id, {}).update(data)
+
+        try:
+            from src.common.database.optimization.cache_manager import get_cache
+            from src.common.database.utils.decorators import generate_cache_key
+
+            cache = await get_cache()
+            await cache.set(
+                generate_cache_key("person_value", person_id, field_name),
+                _decode_field_value(field_name, db_value),
+                ttl=int(self.OVERLAY_TTL),
+            )
+            await cache.set(generate_cache_key("person_has_field", person_id, field_name), True, ttl=300)
+        except Exception as e:
+            logger.debug(f"更新人物信息缓存失败: {e}")
+
+        self.schedule()
+
+    def discard(self, person_id: str) -> None:
+        """丢弃某人尚未写入的字段（记录被删除时调用）"""
+        self._dirty.pop(person_id, None)
+        self._creation_data.pop(person_id, None)
+        self._recent.pop(person_id, None)
+        self._recent_at.pop(person_id, None)
+        self._known_persons.pop(person_id, None)
+
+    def has_pending(self) -> bool:
+        return bool(self._dirty)
+
+    async def _flush_pending(self) -> None:
+        """把全部脏字段写入数据库，每人一条 UPDATE；失败或被取消时放回缓冲"""
+        batch, self._dirty = self._dirty, {}
+        creation_data = {person_id: self._creation_data.pop(person_id, None) for person_id in batch}
+
+        start_time = time.time()
+        written = False
+        try:
+            updated: dict[str, tuple[int, str]] = {}  # person_id -> (记录ID, 平台)
+            async with get_db_session() as session:
+                for person_id, fields in batch.items():
+                    result = await session.execute(
+                        update(PersonInfo)
+                        .where(PersonInfo.person_id == person_id)
+                        .values(**fields)
+                        .returning(PersonInfo.id, PersonInfo.platform)
+                    )
+                    row = result.first()
+                    if row is not None:
+                        updated[person_id] = (row[0], row[1])
+                await session.commit()
+            written = True
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"批量写入人物信息失败 ({len(batch)} 人): {e}")
+        finally:
+            if not written:
+                # 放回缓冲等待下次重试（包括写入任务被取消的情况），期间的新写入优先
+                for person_id, fields in batch.items():
+                    self._dirty[person_id] = {**fields, **self._dirty.get(person_id, {})}
+                    if creation_data[person_id]:
+                        self._creation_data[person_id] = {
+                            **creation_data[person_id],
+                            **self._creation_data.get(person_id, {}),
+                        }
+        if not written:
+            return
+
+        await self._invalidate_record_cache(updated)
+
+        # 记录在写库前被删除（例如并发删除后又更新），按原有行为重建
+        for person_id in [person_id for person_id in batch if person_id not in updated]:
+            self._known_persons.pop(person_id, None)
+            await self._create_person(person_id, batch[person_id], creation_data[person_id])
+
+        self.stats["flushed_persons"] += len(updated)
+        self.stats["batches"] += 1
+        total_time = time.time() - start_time
+        if total_time > 0.5:
+            logger.warning(f"人物信息批量写入耗时 {total_time:.3f}秒 ({len(batch)} 人)")
+
+        self._prune_recent()
+
+    async def stop(self) -> None:
+        """停止后台写入任务并刷新剩余写入"""
+        await super().stop()
+        if self._dirty:
+            logger.warning(f"人物信息写回缓冲关闭时仍有 {len(self._dirty)} 人的字段未能写入数据库")
+        logger.info(
+            f"人物信息写回缓冲已停止 (字段写入 {self.stats['field_writes']} 次, "
+            f"合并写库 {self.stats['flushed_persons']} 人次, 新建 {self.stats['created_persons']} 人)"
+        )
+
+    async def _ensure_person_exists(self, person_id: str, field_name: str, db_value: Any, data: dict | None) -> None:
+        """确认记录存在，不存在时立即以 data 与本字段新建"""
+        if person_id in self._known_persons:
+            self._known_persons.move_to_end(person_id)
+            return
+
+        if person_id not in self._dirty:
+            try:
+                exists = await CRUDBase(PersonInfo).get_by(person_id=person_id) is not None
+            except Exception as e:
+                logger.warning(f"查询人物信息失败，将在写库时确认记录是否存在: {e}")
+                return
+            if not exists:
+                await self._create_person(person_id, {field_name: db_value}, data)
+
+        self._known_persons[person_id] = None
+        while len(self._known_persons) > self.MAX_KNOWN_PERSONS:
+            self._known_persons.popitem(last=False)
+
+    async def _create_person(self, person_id: str, fields: dict[str, Any], data: dict | None) -> None:
+        """使用补全数据与写入的字段新建记录"""
+        logger.info(f"{person_id} 不存在，将新建。")
+        creation_data = dict(data) if data else {}
+        creation_data.update(fields)
+
+        # 额外检查关键字段，如果为None则使用默认值
+        if creation_data.get("user_id") is None:
+            logger.warning(f"创建用户时user_id为None，使用'unknown'作为默认值 person_id={person_id}")
+            creation_data["user_id"] = "unknown"
+
+        if creation_data.get("platform") is None:
+            logger.warning(f"创建用户时platform为None，使用'unknown'作为默认值 person_id={person_id}")
+            creation_data["platform"] = "unknown"
+
+        # 使用安全的创建方法，处理竞态条件
+        await PersonInfoManager._safe_create_person_info(person_id, creation_data)
+        self.stats["created_persons"] += 1
+
+    @staticmethod
+    async def _invalidate_record_cache(updated: dict[str, tuple[int, str]]) -> None:
+        """删除 CRUD 层与 get_or_create_person 缓存的整条记录，避免读到写库前的旧值"""
+        try:
+            from src.common.database.optimization.cache_manager import get_cache
+            from src.common.database.utils.decorators import generate_cache_key
+
+            cache = await get_cache()
+            table = PersonInfo.__tablename__
+            for person_id, (record_id, platform) in updated.items():
+                await cache.delete(f"{table}:id:{record_id}")
+                await cache.delete(f"{table}:filter:{[('person_id', person_id)]!s}")
+                await cache.delete(generate_cache_key("person_info", platform, person_id))
+        except Exception as e:
+            logger.debug(f"清除人物信息记录缓存失败: {e}")
+
+    def _prune_recent(self) -> None:
+        """清理已写库且超过保留时间的最近写入"""
+        expire_before = time.time() - self.OVERLAY_TTL
+        for person_id in [p for p, at in self._recent_at.items() if at < expire_before and p not in self._dirty]:
+            self._recent.pop(person_id, None)
+            self._recent_at.pop(person_id, None)
+
+
+person_info_write_buffer = PersonInfoWriteBuffer()
+
 person_info_manager = None
 
 
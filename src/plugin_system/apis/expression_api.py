@@ -15,6 +15,7 @@ import orjson
 from sqlalchemy import and_, or_, select
 
 from src.chat.express.expression_learner import ExpressionLearner
+from src.chat.express.expression_pool import expression_pool
 from src.chat.message_receive.chat_stream import get_chat_manager
 from src.common.database.compatibility import get_db_session
 from src.common.database.core.models import Expression
@@ -500,6 +501,7 @@ async def create_expression(
             # 清除缓存
             cache = await get_cache()
             await cache.delete(generate_cache_key("chat_expressions", chat_id_hash))
+            expression_pool.invalidate(chat_id_hash)
 
             logger.info(f"创建表达方式成功: {situation} -> {style} (chat_id={chat_id_hash})")
 
@@ -550,6 +552,7 @@ async def update_expression(
             # 清除缓存
             cache = await get_cache()
             await cache.delete(generate_cache_key("chat_expressions", expr.chat_id))
+            expression_pool.invalidate(expr.chat_id)
 
             logger.info(f"更新表达方式成功: ID={expression_id}")
             return True
@@ -578,6 +581,7 @@ async def delete_expression(expression_id: int) -> bool:
             # 清除缓存
             cache = await get_cache()
             await cache.delete(generate_cache_key("chat_expressions", chat_id))
+            expression_pool.invalidate(chat_id)
 
             logger.info(f"删除表达方式成功: ID={expression_id}")
             return True
@@ -614,6 +618,7 @@ async def batch_delete_expressions(expression_ids: list[int]) -> int:
         cache = await get_cache()
         for chat_id in affected_chat_ids:
             await cache.delete(generate_cache_key("chat_expressions", chat_id))
+            expression_pool.invalidate(chat_id)
 
         logger.info(f"批量删除表达方式成功: 删除了 {deleted_count} 个")
         return deleted_count
@@ -644,6 +649,7 @@ async def activate_expression(expression_id: int, increment: float = 0.1) -> boo
             # 清除缓存
             cache = await get_cache()
             await cache.delete(generate_cache_key("chat_expressions", expr.chat_id))
+            expression_pool.invalidate(expr.chat_id)
 
             logger.info(f"激活表达方式成功: ID={expression_id}, new count={expr.count:.2f}")
             return True
@@ -1000,6 +1006,7 @@ async def import_expressions(
         cache = await get_cache()
         for cid in affected_chat_ids:
             await cache.delete(generate_cache_key("chat_expressions", cid))
+            expression_pool.invalidate(cid)
 
         logger.info(
             f"导入完成: 导入{imported_count}个, 跳过{skipped_count}个, "
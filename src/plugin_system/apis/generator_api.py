@@ -92,6 +92,8 @@ async def generate_reply(
     request_type: str = "generator_api",
     from_plugin: bool = True,
     read_mark: float = 0.0,
+    prebuilt_prompt: str | None = None,
+    prebuilt_llm_response: dict[str, Any] | None = None,
 ) -> tuple[bool, list[tuple[str, Any]], str | None]:
     """生成回复
 
@@ -110,6 +112,8 @@ async def generate_reply(
         model_set_with_weight: 模型配置列表，每个元素为 (TaskConfig, weight) 元组
         request_type: 请求类型（可选，记录LLM使用）
         from_plugin: 是否来自插件
+        prebuilt_prompt: 预先构建好的提示词，提供时跳过提示词构建
+        prebuilt_llm_response: 预先生成的LLM回复，需与prebuilt_prompt配合使用
     Returns:
         Tuple[bool, List[Tuple[str, Any]], Optional[str]]: (是否成功, 回复集合, 提示词)
     """
@@ -156,6 +160,8 @@ async def generate_reply(
             from_plugin=from_plugin,
             stream_id=chat_stream.stream_id if chat_stream else chat_id,
             reply_message=reply_message,
+            prebuilt_prompt=prebuilt_prompt,
+            prebuilt_llm_response=prebuilt_llm_response,
         )
         if not success:
             logger.warning("[GeneratorAPI] 回复生成失败")
@@ -12,13 +12,15 @@
 """
 
 import asyncio
+import heapq
+import itertools
 import time
 import uuid
 import weakref
 from collections import defaultdict
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any
 
@@ -36,7 +38,8 @@ class SchedulerConfig:
     """调度器配置"""
 
     # 检查间隔
-    check_interval: float = 1.0  # 主循环检查间隔(秒)
+    check_interval: float = 1.0  # 自定义条件任务的默认轮询间隔(秒)，可通过 trigger_config["poll_interval"] 单独指定
+    max_sleep_interval: float = 60.0  # 主循环单次休眠上限(秒)，用于兜底系统时钟调整
     deadlock_check_interval: float = 30.0  # 死锁检查间隔(秒)
 
     # 超时配置
@@ -163,6 +166,7 @@ class ScheduleTask:
     # 运行时引用
     _asyncio_task: asyncio.Task | None = field(default=None, init=False, repr=False)
     _weak_scheduler: Any = field(default=None, init=False, repr=False)
+    _heap_seq: int | None = field(default=None, init=False, repr=False)  # 当前有效的截止时间堆条目序号
 
     def __repr__(self) -> str:
         return (
@@ -313,7 +317,8 @@ class UnifiedScheduler:
     7. 健康监控 - 任务健康度评分和统计
 
     特点：
-    - 每秒检查一次所有任务
+    - 时间任务和自定义条件任务按下次触发/轮询时间存放在最小堆中，
+      主循环只休眠到最早的截止时间，新增或恢复任务时提前唤醒
     - 自动执行到期任务
     - 支持循环和一次性任务
     - 提供完整的任务管理API
@@ -337,6 +342,11 @@ class UnifiedScheduler:
         self._deadlock_check_task: asyncio.Task | None = None
         self._cleanup_task: asyncio.Task | None = None
 
+        # 截止时间堆: (触发时间戳, 序号, schedule_id)，过期条目惰性删除
+        self._deadline_heap: list[tuple[float, int, str]] = []
+        self._heap_counter = itertools.count()
+        self._wakeup_event = asyncio.Event()
+
         # 事件订阅追踪
         self._event_subscriptions: dict[str | EventType, set[str]] = defaultdict(set)  # event -> {task_ids}
 
@@ -423,6 +433,7 @@ class UnifiedScheduler:
         # 清理资源
         self._tasks.clear()
         self._tasks_by_name.clear()
+        self._deadline_heap.clear()
         self._event_subscriptions.clear()
         self._completed_tasks.clear()
         self._deadlock_detector.clear()
@@ -462,16 +473,24 @@ class UnifiedScheduler:
     # ==================== 后台循环 ====================
 
     async def _check_loop(self) -> None:
-        """主循环：定期检查和触发任务"""
+        """主循环：休眠到最早的截止时间，触发到期任务"""
         logger.debug("调度器主循环已启动")
 
         while self._running:
             try:
-                await asyncio.sleep(self.config.check_interval)
+                self._wakeup_event.clear()
+                delay = self._seconds_until_next_deadline()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup_event.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
 
                 if not self._stopping:
-                    # 使用 create_task 避免阻塞循环
-                    asyncio.create_task(self._check_and_trigger_tasks(), name="check_trigger_tasks")
+                    due_tasks = self._pop_due_tasks()
+                    if due_tasks:
+                        # 使用 create_task 避免阻塞循环
+                        asyncio.create_task(self._check_and_trigger_tasks(due_tasks), name="check_trigger_tasks")
 
             except asyncio.CancelledError:
                 logger.debug("调度器主循环被取消")
@@ -515,72 +534,126 @@ class UnifiedScheduler:
             except Exception as e:
                 logger.error(f"清理循环发生错误: {e}")
 
+    # ==================== 截止时间堆 ====================
+
+    def _schedule_task(self, task: ScheduleTask) -> None:
+        """计算任务的下次触发/轮询时间并放入截止时间堆，旧条目自动失效"""
+        task._heap_seq = None
+        if task.trigger_type == TriggerType.EVENT or not task.can_trigger():
+            return
+
+        try:
+            if task.trigger_type == TriggerType.TIME:
+                fire_time = self._compute_next_fire_time(task)
+                task.next_trigger_at = fire_time
+                if fire_time is None:
+                    logger.warning(f"任务 {task.task_name} 缺少 trigger_at 或 delay_seconds，不会被触发")
+                    return
+                deadline = fire_time.timestamp()
+            else:
+                poll_interval = task.trigger_config.get("poll_interval", self.config.check_interval)
+                deadline = time.time() + max(float(poll_interval), 0.0)
+        except Exception as e:
+            logger.error(f"计算任务 {task.task_name} 的触发时间时出错: {e}")
+            return
+
+        seq = next(self._heap_counter)
+        task._heap_seq = seq
+        heapq.heappush(self._deadline_heap, (deadline, seq, task.schedule_id))
+
+        # 大量任务被移除后压缩堆，避免过期条目堆积
+        if len(self._deadline_heap) > 2 * len(self._tasks) + 64:
+            self._deadline_heap = [
+                entry
+                for entry in self._deadline_heap
+                if (t := self._tasks.get(entry[2])) is not None and t._heap_seq == entry[1]
+            ]
+            heapq.heapify(self._deadline_heap)
+
+        # 新的截止时间可能早于主循环当前的休眠目标
+        if self._deadline_heap[0][1] == seq:
+            self._wakeup_event.set()
+
+    def _compute_next_fire_time(self, task: ScheduleTask) -> datetime | None:
+        """计算时间触发任务的下次触发时间"""
+        config = task.trigger_config
+
+        if "trigger_at" in config:
+            trigger_time = config["trigger_at"]
+            if isinstance(trigger_time, str):
+                trigger_time = datetime.fromisoformat(trigger_time)
+
+            if task.last_triggered_at is None or not task.is_recurring:
+                # 首次触发或一次性任务（包括失败重试）：到达触发时间即可
+                return trigger_time
+            if "interval_seconds" in config:
+                # 循环任务：距上次触发达到间隔
+                return task.last_triggered_at + timedelta(seconds=config["interval_seconds"])
+            # 未配置间隔的循环任务：按默认检查间隔重复触发
+            return max(trigger_time, task.last_triggered_at + timedelta(seconds=self.config.check_interval))
+
+        if "delay_seconds" in config:
+            # 首次触发从创建时间算起，后续从上次触发时间算起
+            base_time = task.last_triggered_at or task.created_at
+            return base_time + timedelta(seconds=config["delay_seconds"])
+
+        return None
+
+    def _seconds_until_next_deadline(self) -> float:
+        """距离最早截止时间的秒数（清理堆顶的过期条目）"""
+        while self._deadline_heap:
+            deadline, seq, schedule_id = self._deadline_heap[0]
+            task = self._tasks.get(schedule_id)
+            if task is None or task._heap_seq != seq:
+                heapq.heappop(self._deadline_heap)
+                continue
+            return min(deadline - time.time(), self.config.max_sleep_interval)
+        return self.config.max_sleep_interval
+
+    def _pop_due_tasks(self) -> list[ScheduleTask]:
+        """弹出所有已到期的任务"""
+        now = time.time()
+        due_tasks: list[ScheduleTask] = []
+
+        while self._deadline_heap and self._deadline_heap[0][0] <= now:
+            _, seq, schedule_id = heapq.heappop(self._deadline_heap)
+            task = self._tasks.get(schedule_id)
+            if task is None or task._heap_seq != seq:
+                continue
+            task._heap_seq = None
+            # 暂停或运行中的任务在恢复/执行结束时会重新入堆
+            if task.can_trigger():
+                due_tasks.append(task)
+
+        return due_tasks
+
     # ==================== 任务触发逻辑 ====================
 
-    async def _check_and_trigger_tasks(self) -> None:
+    async def _check_and_trigger_tasks(self, due_tasks: list[ScheduleTask]) -> None:
         """检查并触发到期任务（完全无锁设计）"""
-        current_time = datetime.now()
         tasks_to_trigger: list[ScheduleTask] = []
 
-        # 第一阶段：收集需要触发的任务
-        for task in list(self._tasks.values()):
-            if not task.can_trigger():
+        # 第一阶段：时间任务已到期；自定义任务需要检查条件，不满足时按轮询间隔重新入堆
+        for task in due_tasks:
+            if task.trigger_type != TriggerType.CUSTOM:
+                tasks_to_trigger.append(task)
                 continue
 
             try:
-                should_trigger = await self._should_trigger_task(task, current_time)
-                if should_trigger:
-                    tasks_to_trigger.append(task)
+                should_trigger = await self._check_custom_trigger(task)
             except Exception as e:
                 logger.error(f"检查任务 {task.task_name} 触发条件时出错: {e}")
+                should_trigger = False
+
+            if should_trigger and task.can_trigger():
+                tasks_to_trigger.append(task)
+            elif task.schedule_id in self._tasks:
+                self._schedule_task(task)
 
         # 第二阶段：并发触发所有任务
         if tasks_to_trigger:
             await self._trigger_tasks_concurrently(tasks_to_trigger)
 
-    async def _should_trigger_task(self, task: ScheduleTask, current_time: datetime) -> bool:
-        """判断任务是否应该触发"""
-        if task.trigger_type == TriggerType.TIME:
-            return self._check_time_trigger(task, current_time)
-        elif task.trigger_type == TriggerType.CUSTOM:
-            return await self._check_custom_trigger(task)
-        # EVENT 类型由 event_manager 触发
-        return False
-
-    def _check_time_trigger(self, task: ScheduleTask, current_time: datetime) -> bool:
-        """检查时间触发条件"""
-        config = task.trigger_config
-
-        # 检查 trigger_at
-        if "trigger_at" in config:
-            trigger_time = config["trigger_at"]
-            if isinstance(trigger_time, str):
-                trigger_time = datetime.fromisoformat(trigger_time)
-
-            if task.is_recurring and "interval_seconds" in config:
-                # 循环任务：检查是否达到间隔
-                if task.last_triggered_at is None:
-                    return current_time >= trigger_time
-                else:
-                    elapsed = (current_time - task.last_triggered_at).total_seconds()
-                    return elapsed >= config["interval_seconds"]
-            else:
-                # 一次性任务：检查是否到达触发时间
-                return current_time >= trigger_time
-
-        # 检查 delay_seconds
-        elif "delay_seconds" in config:
-            if task.last_triggered_at is None:
-                # 首次触发：从创建时间算起
-                elapsed = (current_time - task.created_at).total_seconds()
-                return elapsed >= config["delay_seconds"]
-            else:
-                # 后续触发：从上次触发时间算起
-                elapsed = (current_time - task.last_triggered_at).total_seconds()
-                return elapsed >= config["delay_seconds"]
-
-        return False
-
     async def _check_custom_trigger(self, task: ScheduleTask) -> bool:
         """检查自定义触发条件"""
         condition_func = task.trigger_config.get("condition_func")
@@ -672,6 +745,9 @@ class UnifiedScheduler:
             # 如果是一次性任务且成功完成，移动到已完成列表
             if not task.is_recurring and task.status == TaskStatus.COMPLETED:
                 await self._move_to_completed(task)
+            elif task.schedule_id in self._tasks:
+                # 循环任务或等待重试的任务：按新的触发时间重新入堆
+                self._schedule_task(task)
 
     async def _run_callback(self, task: ScheduleTask) -> Any:
         """运行任务回调函数"""
@@ -991,6 +1067,8 @@ class UnifiedScheduler:
                 raise ValueError("事件触发类型必须提供 event_name")
             self._event_subscriptions[event_name].add(schedule_id)
             logger.debug(f"任务 {task_name} 订阅事件: {event_name}")
+        else:
+            self._schedule_task(task)
 
         logger.debug(f"创建调度任务: {task_name} (ID: {schedule_id[:8]}...)")
         return schedule_id
@@ -1130,6 +1208,7 @@ class UnifiedScheduler:
             return False
 
         task.status = TaskStatus.PENDING
+        self._schedule_task(task)
         logger.debug(f"恢复任务: {task.task_name}")
         return True
 
@@ -1254,6 +1333,7 @@ class UnifiedScheduler:
             "recurring_tasks": sum(1 for t in self._tasks.values() if t.is_recurring),
             "one_time_tasks": sum(1 for t in self._tasks.values() if not t.is_recurring),
             "registered_events": list(self._event_subscriptions.keys()),
+            "pending_deadlines": sum(1 for t in self._tasks.values() if t._heap_seq is not None),
             "total_executions": self._total_executions,
             "total_failures": self._total_failures,
             "total_timeouts": self._total_timeouts,
@@ -96,11 +96,46 @@ class BaseEvent:
 
         self.subscribers: list["BaseEventHandler"] = []  # 订阅该事件的事件处理器列表
 
+        # 缓存的分发计划: (按权重排序的订阅者, 对应的处理器名称)，订阅者变化时失效
+        self._dispatch_plan: tuple[tuple["BaseEventHandler", ...], tuple[str, ...]] | None = None
+
         self.event_handle_lock = asyncio.Lock()
 
     def __name__(self):
         return self.name
 
+    def add_subscriber(self, handler: "BaseEventHandler") -> None:
+        """添加订阅者并使分发计划失效"""
+        self.subscribers.append(handler)
+        self.invalidate_dispatch_plan()
+
+    def remove_subscriber(self, handler: "BaseEventHandler") -> None:
+        """移除订阅者并使分发计划失效"""
+        self.subscribers.remove(handler)
+        self.invalidate_dispatch_plan()
+
+    def invalidate_dispatch_plan(self) -> None:
+        """使缓存的分发计划失效，直接修改 subscribers 列表后需要调用"""
+        self._dispatch_plan = None
+
+    def _get_dispatch_plan(self) -> tuple[tuple["BaseEventHandler", ...], tuple[str, ...]]:
+        """获取按权重排序的订阅者及其名称（带缓存）"""
+        plan = self._dispatch_plan
+        if plan is None:
+            sorted_subscribers = tuple(
+                sorted(
+                    self.subscribers,
+                    key=lambda h: h.weight if hasattr(h, "weight") and h.weight != -1 else 0,
+                    reverse=True,
+                )
+            )
+            handler_names = tuple(
+                subscriber.handler_name if hasattr(subscriber, "handler_name") else subscriber.__class__.__name__
+                for subscriber in sorted_subscribers
+            )
+            plan = self._dispatch_plan = (sorted_subscribers, handler_names)
+        return plan
+
     async def activate(
         self, params: dict, handler_timeout: float | None = None, max_concurrency: int | None = None
     ) -> HandlerResultsCollection:
@@ -117,13 +152,20 @@ class BaseEvent:
 
         # 移除全局锁，允许同一事件并发触发
         # async with self.event_handle_lock:
-        sorted_subscribers = sorted(
-            self.subscribers, key=lambda h: h.weight if hasattr(h, "weight") and h.weight != -1 else 0, reverse=True
-        )
+        sorted_subscribers, handler_names = self._get_dispatch_plan()
 
         if not sorted_subscribers:
             return HandlerResultsCollection([])
 
+        # 只有一个订阅者或并发上限为1时直接顺序执行，不创建任务
+        if len(sorted_subscribers) == 1 or max_concurrency == 1:
+            return HandlerResultsCollection(
+                [
+                    await self._run_handler(subscriber, handler_name, params, handler_timeout)
+                    for subscriber, handler_name in zip(sorted_subscribers, handler_names)
+                ]
+            )
+
         concurrency_limit = None
         if max_concurrency is not None:
             concurrency_limit = max_concurrency if max_concurrency > 0 else None
@@ -136,47 +178,20 @@ class BaseEvent:
             else None
         )
 
-        async def _run_handler(subscriber):
-            handler_name = (
-                subscriber.handler_name if hasattr(subscriber, "handler_name") else subscriber.__class__.__name__
-            )
-
-            async def _invoke():
-                return await self._execute_subscriber(subscriber, params)
-
-            try:
-                if handler_timeout and handler_timeout > 0:
-                    result = await asyncio.wait_for(_invoke(), timeout=handler_timeout)
-                else:
-                    result = await _invoke()
-            except asyncio.TimeoutError:
-                logger.warning(f"事件处理器 {handler_name} 执行超时 ({handler_timeout}s)")
-                return HandlerResult(False, True, f"timeout after {handler_timeout}s", handler_name)
-            except Exception as exc:
-                logger.error(f"事件处理器 {handler_name} 执行失败: {exc}")
-                return HandlerResult(False, True, str(exc), handler_name)
-
-            if not isinstance(result, HandlerResult):
-                return HandlerResult(True, True, result, handler_name)
-
-            if not result.handler_name:
-                result.handler_name = handler_name
-            return result
-
-        async def _guarded_run(subscriber):
+        async def _guarded_run(subscriber, handler_name: str):
             if semaphore:
                 async with semaphore:
-                    return await _run_handler(subscriber)
-            return await _run_handler(subscriber)
+                    return await self._run_handler(subscriber, handler_name, params, handler_timeout)
+            return await self._run_handler(subscriber, handler_name, params, handler_timeout)
 
-        tasks = [asyncio.create_task(_guarded_run(subscriber)) for subscriber in sorted_subscribers]
+        tasks = [
+            asyncio.create_task(_guarded_run(subscriber, handler_name))
+            for subscriber, handler_name in zip(sorted_subscribers, handler_names)
+        ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         processed_results: list[HandlerResult] = []
-        for subscriber, result in zip(sorted_subscribers, results):
-            handler_name = (
-                subscriber.handler_name if hasattr(subscriber, "handler_name") else subscriber.__class__.__name__
-            )
+        for handler_name, result in zip(handler_names, results):
             if isinstance(result, Exception):
                 logger.error(f"事件处理器 {handler_name} 执行失败: {result}")
                 processed_results.append(HandlerResult(False, True, str(result), handler_name))
@@ -185,6 +200,30 @@ class BaseEvent:
 
         return HandlerResultsCollection(processed_results)
 
+    async def _run_handler(
+        self, subscriber, handler_name: str, params: dict, handler_timeout: float | None
+    ) -> HandlerResult:
+        """执行单个处理器并将结果规范化为 HandlerResult"""
+        try:
+            if handler_timeout and handler_timeout > 0:
+                async with asyncio.timeout(handler_timeout):
+                    result = await self._execute_subscriber(subscriber, params)
+            else:
+                result = await self._execute_subscriber(subscriber, params)
+        except asyncio.TimeoutError:
+            logger.warning(f"事件处理器 {handler_name} 执行超时 ({handler_timeout}s)")
+            return HandlerResult(False, True, f"timeout after {handler_timeout}s", handler_name)
+        except Exception as exc:
+            logger.error(f"事件处理器 {handler_name} 执行失败: {exc}")
+            return HandlerResult(False, True, str(exc), handler_name)
+
+        if not isinstance(result, HandlerResult):
+            return HandlerResult(True, True, result, handler_name)
+
+        if not result.handler_name:
+            result.handler_name = handler_name
+        return result
+
     @staticmethod
     async def _execute_subscriber(subscriber, params: dict) -> HandlerResult:
         """执行单个订阅者处理器"""
@@ -3,6 +3,7 @@
 提供兴趣值计算的标准接口，确保只能有一个兴趣值计算组件实例运行
 """
 
+import asyncio
 import time
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any
@@ -109,6 +110,20 @@ class BaseInterestCalculator(ABC):
         """
         pass
 
+    async def calculate_batch(self, messages: list["DatabaseMessages"]) -> list[InterestCalculationResult]:
+        """批量执行兴趣值计算
+
+        兴趣值管理器会把短时间内到达的多条消息合并后调用此方法。
+        默认实现逐条并发调用 execute；子类可以重写以合并嵌入、模型推理和关系查询等开销。
+
+        Args:
+            messages: 数据库消息对象列表
+
+        Returns:
+            list[InterestCalculationResult]: 与 messages 一一对应的计算结果
+        """
+        return list(await asyncio.gather(*(self.execute(message) for message in messages)))
+
     async def initialize(self) -> bool:
         """初始化组件
 
@@ -210,6 +225,29 @@ class BaseInterestCalculator(ABC):
             self._update_statistics(result)
             return result
 
+    async def _safe_execute_batch(self, messages: list["DatabaseMessages"]) -> list[InterestCalculationResult]:
+        """安全执行批量计算，批量计算失败时退回逐条计算"""
+        if not messages:
+            return []
+        if not self._enabled:
+            return [await self._safe_execute(message) for message in messages]
+
+        start_time = time.time()
+        try:
+            results = await self.calculate_batch(messages)
+            if len(results) != len(messages):
+                raise ValueError(f"批量计算返回 {len(results)} 个结果，期望 {len(messages)} 个")
+        except Exception as e:
+            logger.warning(f"批量兴趣值计算失败，退回逐条计算: {e}")
+            return list(await asyncio.gather(*(self._safe_execute(message) for message in messages)))
+
+        # 批量耗时平摊到每条消息
+        per_message_time = (time.time() - start_time) / len(messages)
+        for result in results:
+            result.calculation_time = per_message_time
+            self._update_statistics(result)
+        return results
+
     def get_config(self, key: str, default: Any = None) -> Any:
         """获取插件配置，支持嵌套键访问"""
         if not self.plugin_config:
@@ -243,7 +243,7 @@ class EventManager:
             # 创建订阅者列表的副本进行迭代，以安全地修改原始列表
             for subscriber in list(event.subscribers):
                 if getattr(subscriber, "handler_name", None) == handler_name:
-                    event.subscribers.remove(subscriber)
+                    event.remove_subscriber(subscriber)
                     logger.debug(f"事件处理器 {handler_name} 已从事件 {event.name} 取消订阅。")
 
         logger.debug(f"事件处理器 {handler_name} 已被完全移除。")
@@ -279,7 +279,7 @@ class EventManager:
             logger.warning(f"事件处理器 {handler_name} 不在事件 {event_name} 的订阅者白名单中，无法订阅")
             return False
 
-        event.subscribers.append(handler_instance)
+        event.add_subscriber(handler_instance)
 
         # 按权重从高到低排序订阅者
         event.subscribers.sort(key=lambda h: getattr(h, "weight", 0), reverse=True)
@@ -306,7 +306,7 @@ class EventManager:
         removed = False
         for subscriber in event.subscribers[:]:
             if hasattr(subscriber, "handler_name") and subscriber.handler_name == handler_name:
-                event.subscribers.remove(subscriber)
+                event.remove_subscriber(subscriber)
                 removed = True
                 break
 
@@ -1,5 +1,10 @@
 import asyncio
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from importlib.util import module_from_spec, spec_from_file_location
 from pathlib import Path
 from typing import Any, Optional
@@ -17,6 +22,24 @@ logger = get_logger("plugin_manager")
 # 全局背景任务集合
 _background_tasks = set()
 
+LOAD_PLAN_CACHE_FILE = os.path.join("data", "plugin_load_plan.json")  # 插件加载计划缓存
+LOAD_PLAN_CACHE_VERSION = 2
+MAX_IMPORT_WORKERS = 8  # 同一层插件并行导入的最大线程数
+SLOW_PLUGIN_REPORT_COUNT = 5  # 加载耗时报告中列出的插件数量
+SLOW_ON_LOADED_THRESHOLD = 1.0  # on_plugin_loaded 钩子超过该耗时（秒）时输出日志
+
+
+@dataclass
+class _PluginCandidate:
+    """发现阶段得到的待加载插件"""
+
+    plugin_dir: str
+    plugin_file: str
+    manifest_hash: str  # __init__.py 内容哈希
+    plugin_name: str  # 缓存中记录的插件名，首次加载前以目录名代替
+    dependencies: list[str] = field(default_factory=list)
+    init_module: Any | None = None  # 发现阶段已执行的 __init__ 模块（缓存命中时为 None）
+
 
 class PluginManager:
     """
@@ -33,6 +56,8 @@ class PluginManager:
 
         self.loaded_plugins: dict[str, PluginBase] = {}  # 已加载的插件类实例注册表，插件名 -> 插件类实例
         self.failed_plugins: dict[str, str] = {}  # 记录加载失败的插件文件及其错误信息，插件名 -> 错误信息
+        self.plugin_load_timings: dict[str, dict[str, float]] = {}  # 插件名 -> 各加载阶段耗时（秒）
+        self._load_plan_cache: dict[str, Any] | None = None
 
         # 核心消息接收器（由主程序设置）
         self._core_sink: Any | None = None
@@ -73,15 +98,10 @@ class PluginManager:
             tuple[int, int]: (插件数量, 组件数量)
         """
         logger.debug("开始加载所有插件...")
+        start_time = time.perf_counter()
 
         # 第一阶段：加载所有插件模块（注册插件类）
-        total_loaded_modules = 0
-        total_failed_modules = 0
-
-        for directory in self.plugin_directories:
-            loaded, failed = self._load_plugin_modules_from_directory(directory)
-            total_loaded_modules += loaded
-            total_failed_modules += failed
+        total_loaded_modules, total_failed_modules = self._load_plugin_modules(self.plugin_directories)
 
         logger.debug(f"插件模块加载完成 - 成功: {total_loaded_modules}, 失败: {total_failed_modules}")
 
@@ -96,6 +116,7 @@ class PluginManager:
                 total_failed_registration += count
 
         self._show_stats(total_registered, total_failed_registration)
+        self._show_load_timings(time.perf_counter() - start_time)
 
         return total_registered, total_failed_registration
 
@@ -125,6 +146,7 @@ class PluginManager:
 
             metadata: PluginMetadata = getattr(module, "__plugin_meta__")
 
+            register_start = time.perf_counter()
             plugin_instance = plugin_class(plugin_dir=plugin_dir, metadata=metadata)
             if not plugin_instance:
                 logger.error(f"插件 {plugin_name} 实例化失败")
@@ -135,7 +157,9 @@ class PluginManager:
                 logger.info(f"插件 {plugin_name} 已禁用，跳过加载")
                 return False, 0
 
-            if plugin_instance.register_plugin():
+            registered = plugin_instance.register_plugin()
+            self.plugin_load_timings.setdefault(plugin_name, {})["register"] = time.perf_counter() - register_start
+            if registered:
                 self.loaded_plugins[plugin_name] = plugin_instance
                 self._show_plugin_components(plugin_name)
 
@@ -156,7 +180,7 @@ class PluginManager:
                     logger.debug(f"为插件 '{plugin_name}' 调用 on_plugin_loaded 钩子")
                     try:
                         # 使用 asyncio.create_task 确保它不会阻塞加载流程
-                        task = asyncio.create_task(plugin_instance.on_plugin_loaded())
+                        task = asyncio.create_task(self._run_on_plugin_loaded(plugin_name, plugin_instance))
                         _background_tasks.add(task)
                         task.add_done_callback(_background_tasks.discard)
                     except Exception as e:
@@ -181,6 +205,19 @@ class PluginManager:
             logger.debug("详细错误信息: ")
             return False, 1
 
+    async def _run_on_plugin_loaded(self, plugin_name: str, plugin_instance: PluginBase) -> None:
+        """执行插件的 on_plugin_loaded 钩子并记录耗时"""
+        start_time = time.perf_counter()
+        try:
+            await plugin_instance.on_plugin_loaded()
+        except Exception as e:
+            logger.error(f"插件 '{plugin_name}' 的 on_plugin_loaded 钩子执行出错: {e}")
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.plugin_load_timings.setdefault(plugin_name, {})["on_loaded"] = elapsed
+            if elapsed >= SLOW_ON_LOADED_THRESHOLD:
+                logger.info(f"插件 '{plugin_name}' 的 on_plugin_loaded 钩子耗时 {elapsed:.2f}s")
+
     async def _register_adapter_components(self, plugin_name: str, plugin_instance: PluginBase) -> None:
         """注册适配器组件
 
@@ -270,17 +307,14 @@ class PluginManager:
         """
         重新扫描插件根目录
         """
-        total_success = 0
-        total_fail = 0
+        directories = []
         for directory in self.plugin_directories:
             if os.path.exists(directory):
                 logger.debug(f"重新扫描插件根目录: {directory}")
-                success, fail = self._load_plugin_modules_from_directory(directory)
-                total_success += success
-                total_fail += fail
+                directories.append(directory)
             else:
                 logger.warning(f"插件根目录不存在: {directory}")
-        return total_success, total_fail
+        return self._load_plugin_modules(directories)
 
     def get_plugin_instance(self, plugin_name: str) -> Optional["PluginBase"]:
         """获取插件实例
@@ -324,6 +358,15 @@ class PluginManager:
         """
         return self.plugin_paths.get(plugin_name)
 
+    def get_plugin_load_timings(self) -> dict[str, dict[str, float]]:
+        """
+        获取各插件的加载耗时。
+
+        Returns:
+            dict: 插件名 -> {"import": 导入耗时, "register": 注册耗时, "on_loaded": on_plugin_loaded 钩子耗时}，单位为秒。
+        """
+        return {name: timings.copy() for name, timings in self.plugin_load_timings.items()}
+
     # === 私有方法 ===
     # == 目录管理 ==
     def _ensure_plugin_directories(self) -> None:
@@ -344,44 +387,322 @@ class PluginManager:
 
     def _load_plugin_modules_from_directory(self, directory: str) -> tuple[int, int]:
         """从指定目录加载插件模块"""
+        return self._load_plugin_modules([directory])
+
+    def _load_plugin_modules(self, directories: list[str]) -> tuple[int, int]:
+        """发现并按依赖分层加载多个根目录中的插件模块
+
+        同一层内的插件互不依赖，在线程池中并行导入；层与层之间串行，保证被依赖的插件类先完成注册。
+        """
+        cache = self._get_load_plan_cache()
+        candidates, failed_count = self._discover_plugins(directories, cache)
+        layers = self._build_load_plan(candidates, cache)
+
         loaded_count = 0
-        failed_count = 0
+        for layer in layers:
+            registered_before = set(self.plugin_classes)
+            if len(layer) == 1:
+                results = [self._import_candidate(layer[0])]
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=min(MAX_IMPORT_WORKERS, len(layer)), thread_name_prefix="plugin_import"
+                ) as executor:
+                    results = list(executor.map(self._import_candidate, layer))
+
+            for candidate, (module, elapsed) in zip(layer, results):
+                if module is None:
+                    # 下次启动重新解析清单并检查依赖
+                    cache["plugins"].pop(candidate.plugin_dir, None)
+                    failed_count += 1
+                    continue
+                self._record_loaded_module(candidate, module, elapsed, cache)
+                loaded_count += 1
+
+            self._order_plugin_classes(layer, registered_before)
 
-        if not os.path.exists(directory):
-            logger.warning(f"插件根目录不存在: {directory}")
-            return 0, 1
+        self._save_load_plan_cache(cache)
+        return loaded_count, failed_count
+
+    def _discover_plugins(
+        self, directories: list[str], cache: dict[str, Any]
+    ) -> tuple[list[_PluginCandidate], int]:
+        """扫描插件目录
 
-        logger.debug(f"正在扫描插件根目录: {directory}")
+        清单（__init__.py）未变化且缓存的 Python 依赖均可导入的插件直接复用缓存的插件名与依赖信息；
+        其余插件在此执行 __init__.py 读取元数据，并完整检查（按需安装）Python 依赖。
 
-        # 遍历目录中的所有包
-        for item in os.listdir(directory):
-            item_path = os.path.join(directory, item)
+        Returns:
+            tuple[list[_PluginCandidate], int]: (待加载插件, 失败数量)
+        """
+        candidates: list[_PluginCandidate] = []
+        failed_count = 0
+        cached_plugins: dict[str, dict[str, Any]] = cache["plugins"]
 
-            if os.path.isdir(item_path) and not item.startswith(".") and not item.startswith("__"):
+        for directory in directories:
+            if not os.path.exists(directory):
+                logger.warning(f"插件根目录不存在: {directory}")
+                failed_count += 1
+                continue
+
+            logger.debug(f"正在扫描插件根目录: {directory}")
+
+            # 遍历目录中的所有包
+            for item in sorted(os.listdir(directory)):
+                item_path = os.path.join(directory, item)
+                if not os.path.isdir(item_path) or item.startswith(".") or item.startswith("__"):
+                    continue
                 plugin_file = os.path.join(item_path, "plugin.py")
-                if os.path.exists(plugin_file):
-                    module = self._load_plugin_module_file(plugin_file)
-                    if module:
-                        # 动态查找插件类并获取真实的 plugin_name
-                        for attr_name in dir(module):
-                            attr = getattr(module, attr_name)
-                            if isinstance(attr, type) and issubclass(attr, PluginBase) and attr is not PluginBase:
-                                plugin_name = getattr(attr, "plugin_name", None)
-                                if plugin_name:
-                                    self.plugin_modules[plugin_name] = module
-                                    break
-                        loaded_count += 1
-                    else:
-                        failed_count += 1
+                if not os.path.exists(plugin_file):
+                    continue
 
-        return loaded_count, failed_count
+                manifest_hash = self._hash_manifest(item_path)
+                entry = cached_plugins.get(item_path)
+                if (
+                    entry
+                    and entry.get("manifest_hash") == manifest_hash
+                    and self._cached_python_dependencies_available(entry)
+                ):
+                    candidates.append(
+                        _PluginCandidate(
+                            plugin_dir=item_path,
+                            plugin_file=plugin_file,
+                            manifest_hash=manifest_hash,
+                            plugin_name=entry.get("plugin_name") or item,
+                            dependencies=list(entry.get("dependencies") or []),
+                        )
+                    )
+                    continue
+
+                try:
+                    init_module = self._exec_plugin_init(plugin_file)
+                except Exception as e:
+                    error_msg = f"加载插件模块 {plugin_file} 失败: {e}"
+                    logger.error(error_msg)
+                    self.failed_plugins[item] = error_msg
+                    failed_count += 1
+                    continue
+
+                metadata = getattr(init_module, "__plugin_meta__", None)
+                if metadata is not None and not self._check_python_dependencies(item, metadata):
+                    failed_count += 1
+                    continue
 
-    def _load_plugin_module_file(self, plugin_file: str) -> Any | None:
+                candidates.append(
+                    _PluginCandidate(
+                        plugin_dir=item_path,
+                        plugin_file=plugin_file,
+                        manifest_hash=manifest_hash,
+                        plugin_name=item,
+                        dependencies=list(metadata.dependencies) if metadata is not None else [],
+                        init_module=init_module,
+                    )
+                )
+
+        return candidates, failed_count
+
+    def _build_load_plan(
+        self, candidates: list[_PluginCandidate], cache: dict[str, Any]
+    ) -> list[list[_PluginCandidate]]:
+        """按插件依赖关系分层（拓扑排序），计划按所有清单的哈希缓存
+
+        依赖无法在本次候选中解析（首次加载时插件名未知）或存在循环依赖的插件放在最后逐个加载，
+        与原先的顺序加载行为一致。
+        """
+        by_dir = {candidate.plugin_dir: candidate for candidate in candidates}
+        plan_key = hashlib.sha256(
+            json.dumps(sorted((c.plugin_dir, c.manifest_hash, c.plugin_name) for c in candidates)).encode("utf-8")
+        ).hexdigest()
+
+        cached_plan = cache.get("plan") or {}
+        if cached_plan.get("key") == plan_key:
+            layers = [[by_dir[d] for d in layer if d in by_dir] for layer in cached_plan.get("layers", [])]
+            if sum(len(layer) for layer in layers) == len(candidates):
+                logger.debug(f"复用缓存的插件加载计划: {len(layers)} 层")
+                return [layer for layer in layers if layer]
+
+        dir_by_name = {candidate.plugin_name: candidate.plugin_dir for candidate in candidates}
+        pending: dict[str, set[str]] = {}
+        deferred: list[str] = []
+        for candidate in candidates:
+            required: set[str] | None = set()
+            for dep_name in candidate.dependencies:
+                dep_dir = dir_by_name.get(dep_name)
+                if dep_dir is None:
+                    if dep_name in self.plugin_classes:
+                        continue  # 已在之前的扫描中注册
+                    required = None
+                    break
+                if dep_dir != candidate.plugin_dir:
+                    required.add(dep_dir)
+            if required is None:
+                deferred.append(candidate.plugin_dir)
+            else:
+                pending[candidate.plugin_dir] = required
+
+        layer_dirs: list[list[str]] = []
+        while pending:
+            ready = sorted(d for d, required in pending.items() if not required)
+            if not ready:
+                break
+            layer_dirs.append(ready)
+            for d in ready:
+                del pending[d]
+            for required in pending.values():
+                required.difference_update(ready)
+
+        # 依赖未解析的插件，以及依赖它们或处于循环依赖中的插件，逐个串行加载
+        deferred.extend(sorted(pending))
+        layer_dirs.extend([d] for d in deferred)
+
+        cache["plan"] = {"key": plan_key, "layers": layer_dirs}
+        logger.debug(f"生成插件加载计划: {len(layer_dirs)} 层, {len(deferred)} 个插件串行加载")
+        return [[by_dir[d] for d in layer] for layer in layer_dirs]
+
+    def _order_plugin_classes(self, layer: list[_PluginCandidate], registered_before: set[str]) -> None:
+        """按加载计划顺序重排本层新注册的插件类
+
+        同一层的插件在线程池中并行导入，注册到 plugin_classes 的先后顺序不确定，
+        而后续实例化按 plugin_classes 的顺序进行，因此在每层导入完成后恢复为计划顺序。
+        """
+        new_names = [name for name in self.plugin_classes if name not in registered_before]
+        if len(new_names) < 2:
+            return
+        position = {str(Path(candidate.plugin_dir).resolve()): i for i, candidate in enumerate(layer)}
+        new_names.sort(key=lambda name: (position.get(self.plugin_paths.get(name, ""), len(position)), name))
+        reordered = {name: self.plugin_classes.pop(name) for name in new_names}
+        self.plugin_classes.update(reordered)
+
+    def _import_candidate(self, candidate: _PluginCandidate) -> tuple[Any | None, float]:
+        """导入单个候选插件（可能在线程池中执行），返回模块与导入耗时"""
+        start_time = time.perf_counter()
+        module = self._load_plugin_module_file(
+            candidate.plugin_file, init_module=candidate.init_module, check_python_dependencies=False
+        )
+        return module, time.perf_counter() - start_time
+
+    def _record_loaded_module(
+        self, candidate: _PluginCandidate, module: Any, elapsed: float, cache: dict[str, Any]
+    ) -> None:
+        """记录导入成功的插件模块，并更新缓存中的插件名与依赖"""
+        plugin_name = None
+        # 动态查找插件类并获取真实的 plugin_name
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            if isinstance(attr, type) and issubclass(attr, PluginBase) and attr is not PluginBase:
+                plugin_name = getattr(attr, "plugin_name", None)
+                if plugin_name:
+                    self.plugin_modules[plugin_name] = module
+                    self.plugin_load_timings[plugin_name] = {"import": elapsed}
+                    break
+
+        metadata = getattr(module, "__plugin_meta__", None)
+        python_dependencies: list[str] = []
+        if metadata is not None and metadata.python_dependencies:
+            from src.plugin_system.utils.dependency_manager import get_dependency_manager
+
+            python_dependencies = get_dependency_manager().get_package_names(metadata.python_dependencies)
+        cache["plugins"][candidate.plugin_dir] = {
+            "manifest_hash": candidate.manifest_hash,
+            "plugin_name": plugin_name or candidate.plugin_name,
+            "dependencies": list(metadata.dependencies) if metadata is not None else [],
+            "python_dependencies": python_dependencies,
+        }
+
+    @staticmethod
+    def _cached_python_dependencies_available(entry: dict[str, Any]) -> bool:
+        """缓存命中时快速确认插件的 Python 依赖仍可导入
+
+        更换解释器或虚拟环境、卸载依赖包后清单哈希不变，此时返回 False，
+        让发现阶段重新执行完整的依赖检查（包括自动安装）。
+        """
+        package_names = entry.get("python_dependencies") or []
+        if not package_names:
+            return True
+
+        from src.plugin_system.utils.dependency_manager import DependencyManager
+
+        return all(DependencyManager.is_importable(name) for name in package_names)
+
+    def _get_load_plan_cache(self) -> dict[str, Any]:
+        """读取插件加载计划缓存，文件不存在或格式不符时返回空缓存"""
+        if self._load_plan_cache is None:
+            cache: dict[str, Any] = {}
+            try:
+                if os.path.exists(LOAD_PLAN_CACHE_FILE):
+                    with open(LOAD_PLAN_CACHE_FILE, encoding="utf-8") as f:
+                        cache = json.load(f)
+            except Exception as e:
+                logger.warning(f"读取插件加载计划缓存失败，将重新生成: {e}")
+                cache = {}
+            if not isinstance(cache, dict) or cache.get("version") != LOAD_PLAN_CACHE_VERSION:
+                cache = {"version": LOAD_PLAN_CACHE_VERSION, "plugins": {}, "plan": {}}
+            self._load_plan_cache = cache
+        return self._load_plan_cache
+
+    @staticmethod
+    def _save_load_plan_cache(cache: dict[str, Any]) -> None:
+        """写回插件加载计划缓存（先写临时文件再替换）"""
+        try:
+            os.makedirs(os.path.dirname(LOAD_PLAN_CACHE_FILE), exist_ok=True)
+            tmp_file = f"{LOAD_PLAN_CACHE_FILE}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, LOAD_PLAN_CACHE_FILE)
+        except Exception as e:
+            logger.warning(f"保存插件加载计划缓存失败: {e}")
+
+    @staticmethod
+    def _hash_manifest(plugin_dir: str) -> str:
+        """计算插件清单（__init__.py）的内容哈希，文件不存在时返回空字符串"""
+        init_file = os.path.join(plugin_dir, "__init__.py")
+        try:
+            with open(init_file, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return ""
+
+    @staticmethod
+    def _exec_plugin_init(plugin_file: str) -> Any | None:
+        """执行插件目录下的 __init__.py 以获取元数据，文件不存在时返回 None"""
+        plugin_path = Path(plugin_file)
+        module_name = ".".join(plugin_path.parent.parts)
+        init_file = os.path.join(plugin_path.parent, "__init__.py")
+        if not os.path.exists(init_file):
+            return None
+
+        init_spec = spec_from_file_location(f"{module_name}.__init__", init_file)
+        if not init_spec or not init_spec.loader:
+            return None
+        init_module = module_from_spec(init_spec)
+        init_spec.loader.exec_module(init_module)
+        return init_module
+
+    def _check_python_dependencies(self, plugin_name: str, metadata: PluginMetadata) -> bool:
+        """检查并按需安装插件的 Python 依赖"""
+        if not metadata.python_dependencies:
+            return True
+
+        from src.plugin_system.utils.dependency_manager import get_dependency_manager
+
+        success, errors = get_dependency_manager().check_and_install_dependencies(
+            metadata.python_dependencies, metadata.name
+        )
+        if not success:
+            error_msg = f"Python依赖检查失败: {', '.join(errors)}"
+            self.failed_plugins[plugin_name] = error_msg
+            logger.error(f" 插件加载失败: {plugin_name} - {error_msg}")
+        return success
+
+    def _load_plugin_module_file(
+        self, plugin_file: str, init_module: Any | None = None, check_python_dependencies: bool = True
+    ) -> Any | None:
         # sourcery skip: extract-method
         """加载单个插件模块文件
 
         Args:
             plugin_file: 插件文件路径
+            init_module: 已执行的 __init__ 模块，为 None 时在此执行
+            check_python_dependencies: 是否检查 Python 依赖（发现阶段已检查或缓存命中时跳过）
         """
         # 生成模块名和插件信息
         plugin_path = Path(plugin_file)
@@ -390,41 +711,26 @@ class PluginManager:
         module_name = ".".join(plugin_path.parent.parts)
 
         try:
-            init_module = None  # 确保下方引用存在
             # 首先加载 __init__.py 来获取元数据
-            init_file = os.path.join(plugin_dir, "__init__.py")
-            if os.path.exists(init_file):
-                init_spec = spec_from_file_location(f"{module_name}.__init__", init_file)
-                if init_spec and init_spec.loader:
-                    init_module = module_from_spec(init_spec)
-                    init_spec.loader.exec_module(init_module)
-
-                    # --- 在这里进行依赖检查 ---
-                    if hasattr(init_module, "__plugin_meta__"):
-                        metadata = getattr(init_module, "__plugin_meta__")
-                        from src.plugin_system.utils.dependency_manager import get_dependency_manager
-
-                        dependency_manager = get_dependency_manager()
-
-                        # 1. 检查Python依赖
-                        if metadata.python_dependencies:
-                            success, errors = dependency_manager.check_and_install_dependencies(
-                                metadata.python_dependencies, metadata.name
-                            )
-                            if not success:
-                                error_msg = f"Python依赖检查失败: {', '.join(errors)}"
-                                self.failed_plugins[plugin_name] = error_msg
-                                logger.error(f" 插件加载失败: {plugin_name} - {error_msg}")
-                                return None  # 依赖检查失败，不加载该模块
+            if init_module is None:
+                init_module = self._exec_plugin_init(plugin_file)
 
-                        # 2. 检查插件依赖
-                        if not self._check_plugin_dependencies(metadata):
-                            error_msg = f"插件依赖检查失败: 请确保依赖 {metadata.dependencies} 已正确安装并加载。"
-                            self.failed_plugins[plugin_name] = error_msg
-                            logger.error(f" 插件加载失败: {plugin_name} - {error_msg}")
-                            return None  # 插件依赖检查失败
+            # --- 在这里进行依赖检查 ---
+            if init_module is not None and hasattr(init_module, "__plugin_meta__"):
+                metadata = getattr(init_module, "__plugin_meta__")
+
+                # 1. 检查Python依赖
+                if check_python_dependencies and not self._check_python_dependencies(plugin_name, metadata):
+                    return None  # 依赖检查失败，不加载该模块
+
+                # 2. 检查插件依赖
+                if not self._check_plugin_dependencies(metadata):
+                    error_msg = f"插件依赖检查失败: 请确保依赖 {metadata.dependencies} 已正确安装并加载。"
+                    self.failed_plugins[plugin_name] = error_msg
+                    logger.error(f" 插件加载失败: {plugin_name} - {error_msg}")
+                    return None  # 插件依赖检查失败
 
-                    # --- 依赖检查逻辑结束 ---
+            # --- 依赖检查逻辑结束 ---
 
             # 然后加载 plugin.py
             spec = spec_from_file_location(module_name, plugin_file)
@@ -447,7 +753,7 @@ class PluginManager:
         except Exception as e:
             error_msg = f"加载插件模块 {plugin_file} 失败: {e}"
             logger.error(error_msg)
-            self.failed_plugins[plugin_name if "plugin_name" in locals() else module_name] = error_msg
+            self.failed_plugins[plugin_name] = error_msg
             return None
 
     def _check_plugin_dependencies(self, plugin_meta: PluginMetadata) -> bool:
@@ -615,6 +921,22 @@ class PluginManager:
         else:
             logger.warning("😕 没有成功加载任何插件")
 
+    def _show_load_timings(self, total_elapsed: float) -> None:
+        """输出插件加载耗时报告，按导入与注册耗时之和降序列出最慢的插件"""
+        if not self.plugin_load_timings:
+            return
+
+        def load_cost(timings: dict[str, float]) -> float:
+            return timings.get("import", 0.0) + timings.get("register", 0.0)
+
+        ranked = sorted(self.plugin_load_timings.items(), key=lambda item: load_cost(item[1]), reverse=True)
+        details = ", ".join(
+            f"{name} (导入 {timings.get('import', 0.0) * 1000:.0f}ms, "
+            f"注册 {timings.get('register', 0.0) * 1000:.0f}ms)"
+            for name, timings in ranked[:SLOW_PLUGIN_REPORT_COUNT]
+        )
+        logger.info(f"⏱️ 插件加载耗时 {total_elapsed:.2f}s，最慢的插件: {details}")
+
     @staticmethod
     def _show_plugin_components(plugin_name: str) -> None:
         if plugin_info := component_registry.get_plugin_info(plugin_name):
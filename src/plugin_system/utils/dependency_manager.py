@@ -256,6 +256,23 @@ class DependencyManager:
 
         return False, all_errors
 
+    def get_package_names(self, dependencies: Any) -> list[str]:
+        """获取依赖列表中各依赖的包名（导入检查使用的名称）"""
+        return [dep.package_name for dep in self._normalize_dependencies(dependencies)]
+
+    @staticmethod
+    def is_importable(package_name: str) -> bool:
+        """快速检查包是否可导入（只查找模块规范，不检查版本、不安装）"""
+        for import_name in (package_name, INSTALL_NAME_TO_IMPORT_NAME.get(package_name)):
+            if not import_name:
+                continue
+            try:
+                if importlib.util.find_spec(import_name) is not None:
+                    return True
+            except (ImportError, ValueError):
+                continue
+        return False
+
     @staticmethod
     def _normalize_dependencies(dependencies: Any) -> list[PythonDependency]:
         """将依赖列表标准化为PythonDependency对象"""
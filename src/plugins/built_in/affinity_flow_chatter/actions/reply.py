@@ -16,6 +16,7 @@ from src.common.logger import get_logger
 from src.config.config import global_config
 from src.plugin_system import ActionActivationType, BaseAction, ChatMode
 from src.plugin_system.apis import generator_api, send_api
+from src.plugins.built_in.affinity_flow_chatter.planner.speculative_reply import take_speculative_result
 
 logger = get_logger("afc_reply_actions")
 
@@ -78,6 +79,11 @@ class ReplyAction(BaseAction):
             action_data = self.action_data.copy()
             action_data["prompt_mode"] = "s4u"
 
+            # 规划阶段可能已经投机构建好了上下文（或回复草稿）
+            speculative = await take_speculative_result(
+                self.chat_stream.stream_id, reply_message.message_id if reply_message else None
+            )
+
             # 生成回复
             success, response_set, _ = await generator_api.generate_reply(
                 chat_stream=self.chat_stream,
@@ -87,6 +93,8 @@ class ReplyAction(BaseAction):
                 enable_tool=global_config.tool.enable_tool,
                 request_type="chat.replyer",
                 from_plugin=False,
+                prebuilt_prompt=speculative.prompt if speculative else None,
+                prebuilt_llm_response=speculative.llm_response if speculative else None,
             )
 
             if not success or not response_set:
@@ -96,11 +96,7 @@ class AffinityInterestCalculator(BaseInterestCalculator):
             start_time = time.time()
             message_id = getattr(message, "message_id", "")
             content = getattr(message, "processed_plain_text", "")
-            user_info = getattr(message, "user_info", None)
-            if user_info and hasattr(user_info, "user_id"):
-                user_id = user_info.user_id
-            else:
-                user_id = ""
+            user_id = self._get_user_id(message)
 
             logger.debug(f"[Affinity兴趣计算] 开始处理消息 {message_id}")
             logger.debug(f"[Affinity兴趣计算] 消息内容: {content[:50]}...")
@@ -114,70 +110,7 @@ class AffinityInterestCalculator(BaseInterestCalculator):
             relationship_score = await self._calculate_relationship_score(user_id)
             logger.debug(f"[Affinity兴趣计算] 关系分: {relationship_score}")
 
-            # 3. 计算提及分
-            mentioned_score = self._calculate_mentioned_score(message, global_config.bot.nickname)
-            logger.debug(f"[Affinity兴趣计算] 提及分: {mentioned_score}")
-
-            # 4. 综合评分
-            # 确保所有分数都是有效的 float 值
-            semantic_score = float(semantic_score) if semantic_score is not None else 0.0
-            relationship_score = float(relationship_score) if relationship_score is not None else 0.0
-            mentioned_score = float(mentioned_score) if mentioned_score is not None else 0.0
-
-            raw_total_score = (
-                semantic_score * self.score_weights["semantic"]
-                + relationship_score * self.score_weights["relationship"]
-                + mentioned_score * self.score_weights["mentioned"]
-            )
-
-            # 限制总分上限为1.0，确保分数在合理范围内
-            total_score = min(raw_total_score, 1.0)
-
-            logger.debug(
-                f"[Affinity兴趣计算] 综合得分计算: "
-                f"{semantic_score:.3f}*{self.score_weights['semantic']} + "
-                f"{relationship_score:.3f}*{self.score_weights['relationship']} + "
-                f"{mentioned_score:.3f}*{self.score_weights['mentioned']} = {raw_total_score:.3f}"
-            )
-
-            if raw_total_score > 1.0:
-                logger.debug(f"[Affinity兴趣计算] 原始分数 {raw_total_score:.3f} 超过1.0，已限制为 {total_score:.3f}")
-
-            # 5. 考虑连续不回复的阈值调整
-            adjusted_score = total_score
-            adjusted_reply_threshold, adjusted_action_threshold = self._apply_threshold_adjustment()
-            logger.debug(
-                f"[Affinity兴趣计算] 连续不回复调整: 回复阈值 {self.reply_threshold:.3f} → {adjusted_reply_threshold:.3f}, "
-                f"动作阈值 {global_config.affinity_flow.non_reply_action_interest_threshold:.3f} → {adjusted_action_threshold:.3f}"
-            )
-
-            # 6. 决定是否回复和执行动作
-            should_reply = adjusted_score >= adjusted_reply_threshold
-            should_take_action = adjusted_score >= adjusted_action_threshold
-
-            logger.debug(
-                f"[Affinity兴趣计算] 阈值判断: {adjusted_score:.3f} >= 回复阈值:{adjusted_reply_threshold:.3f}? = {should_reply}"
-            )
-            logger.debug(
-                f"[Affinity兴趣计算] 阈值判断: {adjusted_score:.3f} >= 动作阈值:{adjusted_action_threshold:.3f}? = {should_take_action}"
-            )
-
-            calculation_time = time.time() - start_time
-
-            logger.debug(
-                f"Affinity兴趣值计算完成 - 消息 {message_id}: {adjusted_score:.3f} "
-                f"(语义:{semantic_score:.2f}, 关系:{relationship_score:.2f}, 提及:{mentioned_score:.2f})"
-            )
-
-            return InterestCalculationResult(
-                success=True,
-                message_id=message_id,
-                interest_value=adjusted_score,
-                should_take_action=should_take_action,
-                should_reply=should_reply,
-                should_act=should_take_action,
-                calculation_time=calculation_time,
-            )
+            return self._build_result(message, semantic_score, relationship_score, start_time)
 
         except Exception as e:
             logger.error(f"Affinity兴趣值计算失败: {e}")
@@ -185,6 +118,121 @@ class AffinityInterestCalculator(BaseInterestCalculator):
                 success=False, message_id=getattr(message, "message_id", ""), interest_value=0.0, error_message=str(e)
             )
 
+    async def calculate_batch(self, messages: list["DatabaseMessages"]) -> list[InterestCalculationResult]:
+        """批量计算兴趣值：语义评分一次批量推理，关系分按用户去重查询"""
+        start_time = time.time()
+        contents = [getattr(message, "processed_plain_text", "") or "" for message in messages]
+        user_ids = [self._get_user_id(message) for message in messages]
+
+        unique_user_ids = list(dict.fromkeys(user_ids))
+        semantic_scores, relationship_scores = await asyncio.gather(
+            self._calculate_semantic_scores(contents),
+            asyncio.gather(*(self._calculate_relationship_score(user_id) for user_id in unique_user_ids)),
+        )
+        relationship_by_user = dict(zip(unique_user_ids, relationship_scores))
+
+        # 阈值调整会消耗回复后降低次数，必须按消息顺序逐条生成结果
+        results = []
+        for message, semantic_score, user_id in zip(messages, semantic_scores, user_ids):
+            try:
+                results.append(
+                    self._build_result(message, semantic_score, relationship_by_user[user_id], start_time)
+                )
+            except Exception as e:
+                logger.error(f"Affinity兴趣值计算失败: {e}")
+                results.append(
+                    InterestCalculationResult(
+                        success=False,
+                        message_id=getattr(message, "message_id", ""),
+                        interest_value=0.0,
+                        error_message=str(e),
+                    )
+                )
+        logger.debug(f"[Affinity兴趣计算] 批量计算 {len(messages)} 条消息，耗时 {time.time() - start_time:.3f}s")
+        return results
+
+    @staticmethod
+    def _get_user_id(message: "DatabaseMessages") -> str:
+        user_info = getattr(message, "user_info", None)
+        if user_info and hasattr(user_info, "user_id"):
+            return user_info.user_id
+        return ""
+
+    def _build_result(
+        self,
+        message: "DatabaseMessages",
+        semantic_score: float | None,
+        relationship_score: float | None,
+        start_time: float,
+    ) -> InterestCalculationResult:
+        """根据语义分和关系分计算提及分、综合评分与阈值判断"""
+        message_id = getattr(message, "message_id", "")
+
+        # 3. 计算提及分
+        mentioned_score = self._calculate_mentioned_score(message, global_config.bot.nickname)
+        logger.debug(f"[Affinity兴趣计算] 提及分: {mentioned_score}")
+
+        # 4. 综合评分
+        # 确保所有分数都是有效的 float 值
+        semantic_score = float(semantic_score) if semantic_score is not None else 0.0
+        relationship_score = float(relationship_score) if relationship_score is not None else 0.0
+        mentioned_score = float(mentioned_score) if mentioned_score is not None else 0.0
+
+        raw_total_score = (
+            semantic_score * self.score_weights["semantic"]
+            + relationship_score * self.score_weights["relationship"]
+            + mentioned_score * self.score_weights["mentioned"]
+        )
+
+        # 限制总分上限为1.0，确保分数在合理范围内
+        total_score = min(raw_total_score, 1.0)
+
+        logger.debug(
+            f"[Affinity兴趣计算] 综合得分计算: "
+            f"{semantic_score:.3f}*{self.score_weights['semantic']} + "
+            f"{relationship_score:.3f}*{self.score_weights['relationship']} + "
+            f"{mentioned_score:.3f}*{self.score_weights['mentioned']} = {raw_total_score:.3f}"
+        )
+
+        if raw_total_score > 1.0:
+            logger.debug(f"[Affinity兴趣计算] 原始分数 {raw_total_score:.3f} 超过1.0，已限制为 {total_score:.3f}")
+
+        # 5. 考虑连续不回复的阈值调整
+        adjusted_score = total_score
+        adjusted_reply_threshold, adjusted_action_threshold = self._apply_threshold_adjustment()
+        logger.debug(
+            f"[Affinity兴趣计算] 连续不回复调整: 回复阈值 {self.reply_threshold:.3f} → {adjusted_reply_threshold:.3f}, "
+            f"动作阈值 {global_config.affinity_flow.non_reply_action_interest_threshold:.3f} → {adjusted_action_threshold:.3f}"
+        )
+
+        # 6. 决定是否回复和执行动作
+        should_reply = adjusted_score >= adjusted_reply_threshold
+        should_take_action = adjusted_score >= adjusted_action_threshold
+
+        logger.debug(
+            f"[Affinity兴趣计算] 阈值判断: {adjusted_score:.3f} >= 回复阈值:{adjusted_reply_threshold:.3f}? = {should_reply}"
+        )
+        logger.debug(
+            f"[Affinity兴趣计算] 阈值判断: {adjusted_score:.3f} >= 动作阈值:{adjusted_action_threshold:.3f}? = {should_take_action}"
+        )
+
+        calculation_time = time.time() - start_time
+
+        logger.debug(
+            f"Affinity兴趣值计算完成 - 消息 {message_id}: {adjusted_score:.3f} "
+            f"(语义:{semantic_score:.2f}, 关系:{relationship_score:.2f}, 提及:{mentioned_score:.2f})"
+        )
+
+        return InterestCalculationResult(
+            success=True,
+            message_id=message_id,
+            interest_value=adjusted_score,
+            should_take_action=should_take_action,
+            should_reply=should_reply,
+            should_act=should_take_action,
+            calculation_time=calculation_time,
+        )
+
     async def _calculate_relationship_score(self, user_id: str) -> float:
         """计算用户关系分"""
         if not user_id:
@@ -455,6 +503,34 @@ class AffinityInterestCalculator(BaseInterestCalculator):
             logger.warning(f"[语义评分] 计算失败: {e}")
             return 0.0
 
+    async def _calculate_semantic_scores(self, contents: list[str]) -> list[float]:
+        """批量计算语义兴趣度分数，空内容记为 0.0
+
+        Args:
+            contents: 消息文本列表
+
+        Returns:
+            与 contents 一一对应的语义兴趣度分数
+        """
+        scores = [0.0] * len(contents)
+        if not self.use_semantic_scoring or not self.semantic_scorer:
+            return scores
+
+        indexes = [i for i, content in enumerate(contents) if content and content.strip()]
+        if not indexes:
+            return scores
+
+        try:
+            batch_scores = await self.semantic_scorer.score_batch_async(
+                [contents[i] for i in indexes], timeout=2.0 + 0.1 * len(indexes)
+            )
+            for i, score in zip(indexes, batch_scores):
+                scores[i] = score
+            logger.debug(f"[语义评分] 批量评分 {len(indexes)} 条消息")
+        except Exception as e:
+            logger.warning(f"[语义评分] 批量计算失败: {e}")
+        return scores
+
     async def reload_semantic_model(self):
         """重新加载语义兴趣度模型（支持热更新和人设检查）"""
         if not self.use_semantic_scoring:
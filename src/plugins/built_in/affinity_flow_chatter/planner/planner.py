@@ -15,6 +15,7 @@ from src.plugin_system.base.component_types import ChatMode, ChatType
 from src.plugins.built_in.affinity_flow_chatter.planner.plan_executor import ChatterPlanExecutor
 from src.plugins.built_in.affinity_flow_chatter.planner.plan_filter import ChatterPlanFilter
 from src.plugins.built_in.affinity_flow_chatter.planner.plan_generator import ChatterPlanGenerator
+from src.plugins.built_in.affinity_flow_chatter.planner.speculative_reply import SpeculativeReplyDrafter
 
 if TYPE_CHECKING:
     from src.chat.planner_actions.action_manager import ChatterActionManager
@@ -50,6 +51,7 @@ class ChatterActionPlanner:
         self.action_manager = action_manager
         self.generator = ChatterPlanGenerator(chat_id, action_manager)
         self.executor = ChatterPlanExecutor(action_manager)
+        self.speculative_drafter = SpeculativeReplyDrafter(chat_id)
         self._interest_calculator = None
         self._interest_calculator_lock = asyncio.Lock()
 
@@ -263,6 +265,12 @@ class ChatterActionPlanner:
                 filtered_plan = initial_plan
                 filtered_plan.decided_actions = [no_action]
             else:
+                # 高兴趣度时与规划并行地预先构建回复上下文，规划结束后再判定是否采用
+                if not reply_not_available and self.speculative_drafter.should_speculate(max_message_interest):
+                    speculative_target = self._select_speculative_target(unread_messages, force_reply)
+                    if speculative_target:
+                        self.speculative_drafter.start(speculative_target)
+
                 # 3. 在规划前，先进行动作修改
                 from src.chat.planner_actions.action_modifier import ActionModifier
                 action_modifier = ActionModifier(self.action_manager, self.chat_id)
@@ -292,6 +300,8 @@ class ChatterActionPlanner:
                         if action.action_type not in ["reply", "respond"]
                     ]
 
+                await self.speculative_drafter.resolve(filtered_plan)
+
             # 7. 检查是否正在处理相同的目标消息，防止重复回复
             target_message_id = None
             if filtered_plan and filtered_plan.decided_actions:
@@ -310,6 +320,7 @@ class ChatterActionPlanner:
                     logger.warning(
                         f"Focus模式 - 目标消息 {target_message_id} 已经在处理中，跳过本次规划以防止重复回复"
                     )
+                    self.speculative_drafter.discard_adopted()
                     # 返回 no_action，避免重复处理
                     from src.common.data_models.info_data_model import ActionPlannerInfo
                     no_action = ActionPlannerInfo(
@@ -326,6 +337,8 @@ class ChatterActionPlanner:
 
             # 9. 使用 PlanExecutor 执行 Plan
             execution_result = await self.executor.execute(filtered_plan)
+            # 回复动作未取用的投机结果（如回复被跳过）不再有用
+            self.speculative_drafter.discard_adopted()
 
             # 10. 根据执行结果更新统计信息
             self._update_stats_from_execution_result(execution_result)
@@ -355,6 +368,7 @@ class ChatterActionPlanner:
         except asyncio.CancelledError:
             logger.info(f"Focus模式流程被取消: {self.chat_id}")
             self.planner_stats["failed_plans"] += 1
+            self.speculative_drafter.cancel()
             # 清理处理标记
             if context:
                 context.processing_message_id = None
@@ -362,11 +376,23 @@ class ChatterActionPlanner:
         except Exception as e:
             logger.error(f"Focus模式流程出错: {e}")
             self.planner_stats["failed_plans"] += 1
+            self.speculative_drafter.cancel()
             # 清理处理标记
             if context:
                 context.processing_message_id = None
             return [], None
 
+    @staticmethod
+    def _select_speculative_target(
+        unread_messages: list["DatabaseMessages"], force_reply: bool
+    ) -> "DatabaseMessages | None":
+        """选出最可能被规划器回复的消息：达到回复阈值的消息中兴趣度最高的一条"""
+        candidates = [msg for msg in unread_messages if getattr(msg, "should_reply", False)]
+        if not candidates:
+            # 私聊必回时没有预计算标志，规划器通常回复最新一条
+            return unread_messages[-1] if force_reply and unread_messages else None
+        return max(candidates, key=lambda msg: float(getattr(msg, "interest_value", 0.0) or 0.0))
+
     async def _normal_mode_flow(self, context: "StreamContext | None") -> tuple[list[dict[str, Any]], Any | None]:
         """Normal模式下的简化plan流程
 
@@ -660,7 +686,9 @@ class ChatterActionPlanner:
 
     def get_planner_stats(self) -> dict[str, Any]:
         """获取规划器统计"""
-        return self.planner_stats.copy()
+        stats = self.planner_stats.copy()
+        stats["speculative_reply"] = self.speculative_drafter.get_stats()
+        return stats
 
     def get_current_mood_state(self) -> str:
         """获取当前聊天的情绪状态"""
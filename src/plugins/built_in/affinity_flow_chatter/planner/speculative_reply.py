@@ -0,0 +1,283 @@
+"""
+投机回复模块
+
+在兴趣度足够高时，与规划器并行地预先构建回复上下文（可选直接生成回复草稿）。
+规划器决定对同一条消息执行 reply 动作时复用结果，否则取消或丢弃。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from src.common.logger import get_logger
+from src.config.config import global_config, model_config
+
+if TYPE_CHECKING:
+    from src.common.data_models.database_data_model import DatabaseMessages
+    from src.common.data_models.info_data_model import Plan
+    from src.llm_models.utils_model import LLMRequest
+
+logger = get_logger("speculative_reply")
+
+# 投机结果的 action_data 中出现这些键时，真实回复的 prompt 会与投机构建的不同，无法复用
+_PROMPT_AFFECTING_KEYS = ("reply_to", "extra_info", "thinking")
+
+
+@dataclass
+class SpeculativeReplyResult:
+    """一次投机回复的产物"""
+
+    target_message_id: str
+    prompt: str
+    llm_response: dict[str, Any] | None = None
+    draft_tokens: int = 0
+    build_time: float = 0.0
+
+
+@dataclass
+class _AdoptedSpeculation:
+    """已被规划结果采纳、等待回复动作取用的投机任务"""
+
+    target_message_id: str
+    task: "asyncio.Task[SpeculativeReplyResult | None]"
+    drafter: "SpeculativeReplyDrafter"  # 所属投机回复器，用于统计草稿 token 的使用与浪费
+
+
+# chat_id -> 已采纳的投机任务，由回复动作取出；未被取出的在规划流程结束时丢弃
+_adopted_results: dict[str, _AdoptedSpeculation] = {}
+
+
+async def take_speculative_result(chat_id: str, message_id: str | None) -> SpeculativeReplyResult | None:
+    """取出已被采纳的投机结果，仅当目标消息一致时返回
+
+    Args:
+        chat_id: 聊天流ID
+        message_id: 回复动作的目标消息ID
+
+    Returns:
+        SpeculativeReplyResult | None: 投机结果；没有可用结果或投机失败时返回None
+    """
+    entry = _adopted_results.pop(chat_id, None)
+    if not entry:
+        return None
+
+    if not message_id or entry.target_message_id != str(message_id):
+        entry.drafter._discard(entry.task)
+        return None
+
+    try:
+        result = await entry.task
+    except asyncio.CancelledError:
+        if entry.task.cancelled():
+            return None
+        raise
+    except Exception as e:
+        logger.warning(f"投机回复结果不可用，回退到常规生成: {e}")
+        return None
+
+    if result and result.llm_response is not None:
+        entry.drafter.stats["used_draft_tokens"] += result.draft_tokens
+    return result
+
+
+class SpeculativeReplyDrafter:
+    """
+    单个聊天流的投机回复器。
+
+    每个聊天流同一时间最多只有一个投机任务，由 ChatterActionPlanner 在规划前启动、
+    在规划结束后通过 resolve() 判定命中或丢弃；命中的结果未被回复动作取用时，
+    由 discard_adopted() 丢弃并计入浪费。
+    """
+
+    def __init__(self, chat_id: str):
+        self.chat_id = chat_id
+        self._task: asyncio.Task[SpeculativeReplyResult | None] | None = None
+        self._target_message_id: str | None = None
+        self._draft_model: "LLMRequest | None" = None
+
+        self.stats = {
+            "started": 0,
+            "hits": 0,
+            "misses": 0,
+            "cancelled_in_flight": 0,
+            "failed": 0,
+            "wasted_drafts": 0,
+            "wasted_draft_tokens": 0,
+            "used_draft_tokens": 0,
+        }
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """投机回复是否启用"""
+        return bool(getattr(global_config.affinity_flow, "enable_speculative_reply", False))
+
+    def should_speculate(self, max_message_interest: float) -> bool:
+        """兴趣度是否达到投机阈值"""
+        if not self.is_enabled():
+            return False
+        return max_message_interest >= global_config.affinity_flow.speculative_interest_threshold
+
+    def start(self, target_message: "DatabaseMessages") -> None:
+        """为目标消息启动投机任务，会取消尚未结算的上一次投机"""
+        message_id = str(getattr(target_message, "message_id", "") or "")
+        if not message_id:
+            return
+
+        self.cancel()
+
+        draft = bool(global_config.affinity_flow.speculative_draft_reply)
+        self._target_message_id = message_id
+        self._task = asyncio.create_task(self._speculate(target_message, draft))
+        self.stats["started"] += 1
+        logger.debug(f"[{self.chat_id}] 启动投机回复: 目标消息={message_id}, 预生成草稿={draft}")
+
+    async def resolve(self, plan: "Plan | None") -> bool:
+        """根据最终规划结果判定投机是否命中
+
+        命中时将任务交给回复动作取用；未命中时取消进行中的任务并统计浪费的草稿。
+
+        Returns:
+            bool: 是否命中
+        """
+        task, target_message_id = self._task, self._target_message_id
+        self._task, self._target_message_id = None, None
+        if task is None or target_message_id is None:
+            return False
+
+        if plan is not None and self._plan_matches(plan, target_message_id):
+            self.stats["hits"] += 1
+            self.discard_adopted()
+            _adopted_results[self.chat_id] = _AdoptedSpeculation(target_message_id, task, self)
+            logger.info(f"[{self.chat_id}] 投机回复命中: {target_message_id} ({self._format_hit_rate()})")
+            return True
+
+        self.stats["misses"] += 1
+        self._discard(task)
+        logger.debug(f"[{self.chat_id}] 投机回复未命中，已丢弃: {target_message_id} ({self._format_hit_rate()})")
+        return False
+
+    def cancel(self) -> None:
+        """放弃当前投机任务及尚未取用的已采纳结果（重新投机、规划被取消或出错时调用）"""
+        task = self._task
+        self._task, self._target_message_id = None, None
+        if task is not None:
+            self._discard(task)
+        self.discard_adopted()
+
+    def discard_adopted(self) -> None:
+        """丢弃已采纳但未被回复动作取用的投机结果（如回复被跳过），计入浪费"""
+        entry = _adopted_results.get(self.chat_id)
+        if entry is not None and entry.drafter is self:
+            del _adopted_results[self.chat_id]
+            self._discard(entry.task)
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取投机统计"""
+        stats = self.stats.copy()
+        settled = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / settled if settled else 0.0
+        return stats
+
+    @staticmethod
+    def _plan_matches(plan: "Plan", target_message_id: str) -> bool:
+        """规划是否恰好决定用 reply 动作回复投机的目标消息"""
+        for action in plan.decided_actions or []:
+            if action.action_type != "reply":
+                continue
+            message = action.action_message
+            if isinstance(message, dict):
+                message_id = message.get("message_id")
+            else:
+                message_id = getattr(message, "message_id", None)
+            if str(message_id) != target_message_id:
+                return False
+            action_data = action.action_data or {}
+            return not any(action_data.get(key) for key in _PROMPT_AFFECTING_KEYS)
+        return False
+
+    def _discard(self, task: "asyncio.Task[SpeculativeReplyResult | None]") -> None:
+        if not task.done():
+            task.cancel()
+            self.stats["cancelled_in_flight"] += 1
+            return
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result and result.llm_response is not None:
+            self.stats["wasted_drafts"] += 1
+            self.stats["wasted_draft_tokens"] += result.draft_tokens
+
+    def _format_hit_rate(self) -> str:
+        stats = self.get_stats()
+        return (
+            f"命中率 {stats['hit_rate']:.1%}, 浪费草稿 {stats['wasted_drafts']} 次 / "
+            f"{stats['wasted_draft_tokens']} tokens"
+        )
+
+    def _get_draft_model(self) -> "LLMRequest":
+        """草稿使用独立的 LLMRequest，便于单独统计投机消耗的 token"""
+        if self._draft_model is None:
+            from src.llm_models.utils_model import LLMRequest
+
+            self._draft_model = LLMRequest(
+                model_set=model_config.model_task_config.replyer, request_type="chat.replyer.speculative"
+            )
+        return self._draft_model
+
+    async def _speculate(self, target_message: "DatabaseMessages", draft: bool) -> SpeculativeReplyResult | None:
+        """构建与 ReplyAction 相同参数的回复 prompt，可选生成草稿"""
+        try:
+            from src.chat.message_receive.chat_stream import get_chat_manager
+            from src.plugin_system.apis import generator_api
+            from src.plugins.built_in.affinity_flow_chatter.actions.reply import ReplyAction
+
+            start_time = time.time()
+            chat_stream = await get_chat_manager().get_stream(self.chat_id)
+            if not chat_stream:
+                return None
+            replyer = await generator_api.get_replyer(chat_stream, request_type="chat.replyer")
+            if not replyer:
+                return None
+
+            await replyer._initialize_chat_info()
+            prompt = await replyer.build_prompt_reply_context(
+                reply_to="",
+                extra_info="",
+                available_actions={
+                    ReplyAction.action_name: ReplyAction.get_action_info(),
+                    "_prompt_mode": "s4u",  # type: ignore
+                },
+                enable_tool=global_config.tool.enable_tool,
+                reply_message=target_message,
+                prompt_mode="s4u",
+            )
+            if not prompt:
+                return None
+
+            result = SpeculativeReplyResult(target_message_id=str(target_message.message_id), prompt=prompt)
+            if draft:
+                draft_model = self._get_draft_model()
+                tokens_before = sum(usage.total_tokens for usage in draft_model.model_usage.values())
+                content, reasoning_content, model_name, tool_calls = await replyer.llm_generate_content(
+                    prompt, llm_request=draft_model
+                )
+                result.draft_tokens = (
+                    sum(usage.total_tokens for usage in draft_model.model_usage.values()) - tokens_before
+                )
+                result.llm_response = {
+                    "content": content,
+                    "reasoning": reasoning_content,
+                    "model": model_name,
+                    "tool_calls": tool_calls,
+                }
+            result.build_time = time.time() - start_time
+            logger.debug(f"[{self.chat_id}] 投机回复构建完成，耗时 {result.build_time:.2f}s")
+            return result
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"[{self.chat_id}] 投机回复构建失败: {e}")
+            return None
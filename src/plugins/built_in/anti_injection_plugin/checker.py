@@ -3,7 +3,6 @@
 """
 
 import hashlib
-import re
 import time
 
 from src.chat.security.interfaces import (
@@ -14,6 +13,8 @@ from src.chat.security.interfaces import (
 )
 from src.common.logger import get_logger
 
+from .matcher import RuleMatcher
+
 logger = get_logger("anti_injection.checker")
 
 
@@ -54,7 +55,7 @@ class AntiInjectionChecker(SecurityChecker):
         self.config = config or {}
 
         # 编译正则表达式
-        self._compiled_patterns: list[re.Pattern] = []
+        self._matcher: RuleMatcher
         self._compile_patterns()
 
         # 缓存
@@ -68,15 +69,9 @@ class AntiInjectionChecker(SecurityChecker):
     def _compile_patterns(self):
         """编译正则表达式模式"""
         patterns = self.config.get("custom_patterns", []) or self.DEFAULT_PATTERNS
+        self._matcher = RuleMatcher(patterns)
 
-        for pattern in patterns:
-            try:
-                compiled = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
-                self._compiled_patterns.append(compiled)
-            except re.error as e:
-                logger.error(f"编译正则表达式失败: {pattern}, 错误: {e}")
-
-        logger.debug(f"已编译 {len(self._compiled_patterns)} 个检测模式")
+        logger.debug(f"已编译 {len(self._matcher)} 个检测模式")
 
     async def pre_check(self, message: str, context: dict | None = None) -> bool:
         """预检查"""
@@ -88,6 +83,14 @@ class AntiInjectionChecker(SecurityChecker):
         if context and self._is_whitelisted(context):
             return False
 
+        # 仅规则检测时，用字面量自动机预筛：没有任何规则的必然字面量出现则不可能命中
+        if (
+            not self.config.get("enabled_llm", False)
+            and len(message) <= self.config.get("max_message_length", 4096)
+            and (not self.config.get("enabled_rules", True) or not self._matcher.may_match(message))
+        ):
+            return False
+
         return True
 
     def _is_whitelisted(self, context: dict) -> bool:
@@ -165,11 +168,9 @@ class AntiInjectionChecker(SecurityChecker):
         """基于规则的检测"""
         matched_patterns = []
 
-        for pattern in self._compiled_patterns:
-            matches = pattern.findall(message)
-            if matches:
-                matched_patterns.append(pattern.pattern)
-                logger.debug(f"规则匹配: {pattern.pattern[:50]}... -> {matches[:2]}")
+        for pattern, matches in self._matcher.match(message).items():
+            matched_patterns.append(pattern)
+            logger.debug(f"规则匹配: {pattern[:50]}... -> {matches[:2]}")
 
         if matched_patterns:
             # 根据匹配数量计算置信度和风险级别
@@ -0,0 +1,267 @@
+"""
+多模式规则匹配器
+
+将所有检测规则合并为一个带命名分组的交替正则，并从每条规则中提取“必然出现的字面量”
+构建 Aho-Corasick 自动机。自动机一次扫描即可得到可能命中的规则集合，只有候选规则
+存在时才运行合并正则，消息整体只被扫描一次。
+"""
+
+import re
+from collections import deque
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parse  # type: ignore[attr-defined]
+
+from src.common.logger import get_logger
+
+logger = get_logger("anti_injection.matcher")
+
+_REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEAT_OPS.add(sre_constants.POSSESSIVE_REPEAT)
+
+
+class LiteralAutomaton:
+    """Aho-Corasick 自动机，对大小写不敏感（按 casefold 匹配）"""
+
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[frozenset[int]] = [frozenset()]
+        self._pending_output: list[set[int]] = [set()]
+        self._built = False
+
+    def add(self, literal: str, rule_id: int) -> None:
+        """添加一个字面量，命中时输出 rule_id"""
+        state = 0
+        for char in literal.casefold():
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(frozenset())
+                self._pending_output.append(set())
+            state = next_state
+        self._pending_output[state].add(rule_id)
+        self._built = False
+
+    def build(self) -> None:
+        """按 BFS 顺序计算失败指针并合并输出集合"""
+        outputs = [set(ids) for ids in self._pending_output]
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._output = [frozenset(ids) for ids in outputs]
+        self._built = True
+
+    def search(self, text: str, stop_at_first: bool = False) -> set[int]:
+        """扫描文本，返回命中的 rule_id 集合"""
+        if not self._built:
+            self.build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        hits: set[int] = set()
+        state = 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits |= output[state]
+                if stop_at_first:
+                    break
+        return hits
+
+
+class RuleMatcher:
+    """检测规则的单次扫描匹配器
+
+    命中结果与逐条执行 ``pattern.search`` 完全一致：
+    合并正则的匹配互不重叠，被其他规则的匹配覆盖的候选规则会单独复核。
+    """
+
+    def __init__(self, patterns: list[str], flags: int = re.IGNORECASE | re.MULTILINE):
+        self.patterns: list[str] = []
+        self._compiled: list[re.Pattern] = []
+        self._automaton = LiteralAutomaton()
+        self._unfiltered_rules: list[int] = []  # 无法提取必然字面量的规则，总是候选
+        self._standalone_rules: set[int] = set()  # 无法放入合并正则的规则（含命名分组或反向引用）
+        self._combined: re.Pattern | None = None
+        self._group_to_rule: dict[str, int] = {}
+
+        combined_parts: list[str] = []
+        for pattern in patterns:
+            try:
+                compiled = re.compile(pattern, flags)
+            except re.error as e:
+                logger.error(f"编译正则表达式失败: {pattern}, 错误: {e}")
+                continue
+
+            rule_id = len(self._compiled)
+            self.patterns.append(pattern)
+            self._compiled.append(compiled)
+
+            literals = self._extract_required_literals(pattern, flags)
+            if literals:
+                for literal in literals:
+                    self._automaton.add(literal, rule_id)
+            else:
+                self._unfiltered_rules.append(rule_id)
+
+            group_name = f"_r{rule_id}"
+            if self._can_combine(pattern, group_name, compiled, flags):
+                self._group_to_rule[group_name] = rule_id
+                combined_parts.append(f"(?P<{group_name}>{pattern})")
+            else:
+                self._standalone_rules.add(rule_id)
+
+        self._automaton.build()
+        if combined_parts:
+            try:
+                self._combined = re.compile("|".join(combined_parts), flags)
+            except re.error as e:
+                logger.warning(f"合并检测规则失败，回退为逐条匹配: {e}")
+                self._standalone_rules = set(range(len(self._compiled)))
+                self._group_to_rule.clear()
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+    def may_match(self, message: str) -> bool:
+        """字面量预筛：返回 False 时保证没有任何规则会命中"""
+        if self._unfiltered_rules:
+            return True
+        return bool(self._automaton.search(message, stop_at_first=True))
+
+    def match(self, message: str) -> dict[str, list[str]]:
+        """返回命中的规则及其匹配片段，按规则定义顺序排列"""
+        candidates = self._automaton.search(message)
+        candidates.update(self._unfiltered_rules)
+        if not candidates:
+            return {}
+
+        hits: dict[int, list[str]] = {}
+        first_match_start: int | None = None
+        if self._combined is not None and any(rule_id not in self._standalone_rules for rule_id in candidates):
+            for match in self._combined.finditer(message):
+                if first_match_start is None:
+                    first_match_start = match.start()
+                rule_id = self._group_to_rule[match.lastgroup]  # type: ignore[index]
+                hits.setdefault(rule_id, []).append(match.group(0))
+
+        for rule_id in sorted(candidates):
+            if rule_id in hits:
+                continue
+            if rule_id in self._standalone_rules:
+                found = self._compiled[rule_id].search(message)
+            elif first_match_start is not None:
+                # 只可能被其他规则的匹配覆盖，从第一个匹配位置开始复核即可
+                found = self._compiled[rule_id].search(message, first_match_start)
+            else:
+                # 合并正则在任何位置都没有匹配，说明没有可合并的规则命中
+                continue
+            if found:
+                hits[rule_id] = [found.group(0)]
+
+        return {self.patterns[rule_id]: hits[rule_id] for rule_id in sorted(hits)}
+
+    # ------------------------------------------------------------------
+    # 字面量提取
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _extract_required_literals(cls, pattern: str, flags: int) -> set[str] | None:
+        """提取规则命中时必然出现的一组字面量（任一出现即可），无法提取时返回 None"""
+        try:
+            parsed = sre_parse.parse(pattern, flags)
+        except Exception:
+            return None
+        return cls._best_literal_set(cls._collect_literal_sets(parsed))
+
+    @classmethod
+    def _collect_literal_sets(cls, items) -> list[set[str]]:
+        """遍历解析树的一个序列，收集每个必然出现的字面量集合"""
+        candidates: list[set[str]] = []
+        run: list[str] = []
+
+        def flush():
+            if run:
+                candidates.append({"".join(run)})
+                run.clear()
+
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                run.append(chr(av))
+                continue
+
+            flush()
+            if op is sre_constants.SUBPATTERN:
+                literal_set = cls._best_literal_set(cls._collect_literal_sets(av[-1]))
+            elif op is sre_constants.BRANCH:
+                branch_sets = [cls._best_literal_set(cls._collect_literal_sets(branch)) for branch in av[1]]
+                literal_set = set().union(*branch_sets) if all(branch_sets) else None
+            elif op in _REPEAT_OPS and av[0] >= 1:
+                literal_set = cls._best_literal_set(cls._collect_literal_sets(av[2]))
+            else:
+                literal_set = None
+
+            if literal_set:
+                candidates.append(literal_set)
+
+        flush()
+        return candidates
+
+    @staticmethod
+    def _best_literal_set(candidates: list[set[str]]) -> set[str] | None:
+        """选择最具区分度的字面量集合（最短字面量最长者）"""
+        candidates = [c for c in candidates if c and all(c)]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda c: (min(len(literal) for literal in c), -len(c)))
+
+    @classmethod
+    def _can_combine(cls, pattern: str, group_name: str, compiled: re.Pattern, flags: int) -> bool:
+        """规则能否放入合并正则（不含命名分组、反向引用，且包裹后仍可编译）"""
+        if compiled.groupindex or cls._has_group_reference(pattern, flags):
+            return False
+        try:
+            re.compile(f"(?P<{group_name}>{pattern})", flags)
+        except re.error:
+            return False
+        return True
+
+    @staticmethod
+    def _has_group_reference(pattern: str, flags: int) -> bool:
+        """规则是否包含反向引用（合并后分组编号会变化）"""
+        try:
+            parsed = sre_parse.parse(pattern, flags)
+        except Exception:
+            return True
+
+        stack = [parsed]
+        while stack:
+            for op, av in stack.pop():
+                if op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+                    return True
+                if op is sre_constants.SUBPATTERN:
+                    stack.append(av[-1])
+                elif op is sre_constants.BRANCH:
+                    stack.extend(av[1])
+                elif op in _REPEAT_OPS:
+                    stack.append(av[2])
+                elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                    stack.append(av[1])
+        return False
@@ -164,6 +164,9 @@ class KokoroFlowChatterConfig:
     # LLM 配置
     llm: LLMConfig = field(default_factory=LLMConfig)
 
+    # 主动思考器同时处理的 Session 数量上限
+    max_concurrent_thinking: int = 4
+
     # 自定义决策提示词
     custom_decision_prompt: str = ""
 
@@ -204,6 +207,8 @@ def load_config() -> KokoroFlowChatterConfig:
                 config.enabled_stream_types = list(kfc_cfg.enabled_stream_types)
             if hasattr(kfc_cfg, "debug"):
                 config.debug = kfc_cfg.debug
+            if hasattr(kfc_cfg, "max_concurrent_thinking"):
+                config.max_concurrent_thinking = max(1, int(kfc_cfg.max_concurrent_thinking))
 
             # 工作模式配置
             if hasattr(kfc_cfg, "mode"):
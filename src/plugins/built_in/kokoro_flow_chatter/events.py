@@ -0,0 +1,31 @@
+"""
+Kokoro Flow Chatter - 事件处理器
+
+系统停止时立即写入尚在延迟写盘窗口内的会话
+"""
+
+from typing import ClassVar
+
+from src.common.logger import get_logger
+from src.plugin_system import BaseEventHandler, EventType
+from src.plugin_system.base.base_event import HandlerResult
+
+from .session import get_session_manager
+
+logger = get_logger("kfc_events")
+
+
+class KFCSessionFlushHandler(BaseEventHandler):
+    """系统停止时保存所有已修改的 KFC 会话"""
+
+    handler_name: str = "kfc_session_flush_handler"
+    handler_description: str = "系统停止时写入尚未落盘的 KFC 会话"
+    init_subscribe: ClassVar[list[EventType | str]] = [EventType.ON_STOP]
+
+    async def execute(self, kwargs: dict | None) -> HandlerResult:
+        try:
+            await get_session_manager().close()
+        except Exception as e:
+            logger.error(f"[KFC] 停止时保存会话失败: {e}")
+            return HandlerResult(success=False, continue_process=True, message=str(e))
+        return HandlerResult(success=True, continue_process=True, message=None)
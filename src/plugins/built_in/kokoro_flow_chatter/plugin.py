@@ -13,6 +13,7 @@ from src.plugin_system.base.base_plugin import BasePlugin
 from .chatter import KokoroFlowChatter
 from .config import get_config
 from .proactive_thinker import start_proactive_thinker, stop_proactive_thinker
+from .session import get_session_manager
 
 logger = get_logger("kfc_plugin")
 
@@ -66,6 +67,11 @@ class KokoroFlowChatterPlugin(BasePlugin):
         except Exception as e:
             logger.warning(f"[KFC] 停止主动思考器失败: {e}")
 
+        try:
+            await get_session_manager().close()
+        except Exception as e:
+            logger.warning(f"[KFC] 保存会话失败: {e}")
+
     def get_plugin_components(self):
         """返回组件列表"""
         config = get_config()
@@ -97,6 +103,17 @@ class KokoroFlowChatterPlugin(BasePlugin):
         except Exception as e:
             logger.error(f"[KFC] 加载 Reply 动作失败: {e}")
 
+        try:
+            # 注册停止时保存会话的事件处理器
+            from .events import KFCSessionFlushHandler
+
+            components.append((
+                KFCSessionFlushHandler.get_handler_info(),
+                KFCSessionFlushHandler,
+            ))
+        except Exception as e:
+            logger.error(f"[KFC] 加载会话保存事件处理器失败: {e}")
+
         return components
 
     def get_plugin_info(self) -> dict[str, Any]:
@@ -14,9 +14,12 @@ Kokoro Flow Chatter - 主动思考器
 """
 
 import asyncio
+import itertools
 import random
 import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime
+from functools import partial
 from typing import TYPE_CHECKING
 
 from src.chat.planner_actions.action_manager import ChatterActionManager
@@ -34,6 +37,66 @@ if TYPE_CHECKING:
 logger = get_logger("kfc_proactive_thinker")
 
 
+class _DeadlineWorkerPool:
+    """
+    按截止时间排序的有界并发工作池
+
+    等待检查与主动思考共用同一个工作池：同时运行的任务数不超过 concurrency，
+    排队中的任务按截止时间先后执行，同一个 key 在完成前不会重复入队。
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._queue: asyncio.PriorityQueue[tuple[float, int, str, Callable[[], Awaitable[None]]]] = (
+            asyncio.PriorityQueue()
+        )
+        self._pending: set[str] = set()  # 排队中或执行中的任务 key
+        self._seq = itertools.count()  # 截止时间相同时保持提交顺序
+        self._workers: list[asyncio.Task] = []
+        self._active = 0
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"kfc_thinking_worker_{i}") for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
+        self._pending.clear()
+
+    def submit(self, key: str, deadline: float, job: Callable[[], Awaitable[None]]) -> bool:
+        """提交任务，key 已在排队或执行中时忽略并返回 False"""
+        if key in self._pending:
+            return False
+        self._pending.add(key)
+        self._queue.put_nowait((deadline, next(self._seq), key, job))
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, key, job = await self._queue.get()
+            self._active += 1
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"[ProactiveThinker] 任务 {key} 执行失败: {e}")
+            finally:
+                self._active -= 1
+                self._pending.discard(key)
+                self._queue.task_done()
+
+    def get_stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "active": self._active, "concurrency": self.concurrency}
+
+
 class ProactiveThinker:
     """
     主动思考器
@@ -71,12 +134,16 @@ class ProactiveThinker:
         self._proactive_schedule_id: str | None = None
         self._running = False
 
+        # 等待检查与主动思考共用的工作池
+        self._worker_pool = _DeadlineWorkerPool(self._max_concurrent)
+
         # 统计
         self._stats = {
             "waiting_checks": 0,
             "continuous_thinking_triggered": 0,
             "timeout_decisions": 0,
             "proactive_triggered": 0,
+            "duplicate_jobs_skipped": 0,
         }
 
     def _load_config(self) -> None:
@@ -88,6 +155,9 @@ class ProactiveThinker:
         # 工作模式
         self._mode = config.mode
 
+        # 同时处理的 Session 数量上限
+        self._max_concurrent = config.max_concurrent_thinking
+
         # 等待检查间隔（秒）
         self.waiting_check_interval = 15.0
         # 主动思考检查间隔（秒）
@@ -109,6 +179,7 @@ class ProactiveThinker:
             return
 
         self._running = True
+        self._worker_pool.start()
 
         # 注册等待检查任务（始终启用，用于处理等待中的 Session）
         self._waiting_schedule_id = await unified_scheduler.create_schedule(
@@ -147,6 +218,7 @@ class ProactiveThinker:
             await unified_scheduler.remove_schedule(self._waiting_schedule_id)
         if self._proactive_schedule_id:
             await unified_scheduler.remove_schedule(self._proactive_schedule_id)
+        await self._worker_pool.stop()
 
         logger.info("[ProactiveThinker] 已停止")
 
@@ -154,20 +226,23 @@ class ProactiveThinker:
     # 等待检查
     # ========================
 
+    def _submit(self, key: str, deadline: float, job: Callable[[], Awaitable[None]]) -> None:
+        """提交到共用工作池，同一 Session 的任务尚未完成时跳过"""
+        if not self._worker_pool.submit(key, deadline, job):
+            self._stats["duplicate_jobs_skipped"] += 1
+
     async def _check_waiting_sessions(self) -> None:
-        """检查所有等待中的 Session"""
+        """检查所有等待中的 Session，交给工作池按等待截止时间先后处理"""
         self._stats["waiting_checks"] += 1
 
         sessions = await self.session_manager.get_waiting_sessions()
         if not sessions:
             return
 
-        # 并行处理
-        tasks = [
-            asyncio.create_task(self._process_waiting_session(s))
-            for s in sessions
-        ]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        for session in sessions:
+            waiting_config = session.waiting_config
+            deadline = waiting_config.started_at + waiting_config.max_wait_seconds
+            self._submit(f"waiting:{session.user_id}", deadline, partial(self._process_waiting_session, session))
 
     async def _process_waiting_session(self, session: KokoroSession) -> None:
         """处理单个等待中的 Session"""
@@ -570,12 +645,18 @@ class ProactiveThinker:
 
         sessions = await self.session_manager.get_all_sessions()
         current_time = time.time()
+        # 主动发起没有等待超时，以下一轮检查前完成为截止时间，排在即将超时的等待 Session 之后
+        deadline = current_time + self.proactive_check_interval
 
         for session in sessions:
             try:
                 trigger_reason = self._should_trigger_proactive(session, current_time)
                 if trigger_reason:
-                    await self._handle_proactive(session, trigger_reason)
+                    self._submit(
+                        f"proactive:{session.user_id}",
+                        deadline,
+                        partial(self._handle_proactive, session, trigger_reason),
+                    )
             except Exception as e:
                 logger.error(f"[ProactiveThinker] 检查主动思考失败 {session.user_id}: {e}")
 
@@ -843,6 +924,7 @@ class ProactiveThinker:
         return {
             **self._stats,
             "is_running": self._running,
+            "worker_pool": self._worker_pool.get_stats(),
         }
 
 
@@ -8,12 +8,13 @@ Kokoro Flow Chatter - 会话管理
 """
 
 import asyncio
-import json
 import os
 import time
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 from src.common.logger import get_logger
 
 from .models import (
@@ -271,9 +272,14 @@ class SessionManager:
     """
     会话管理器
 
-    负责会话的创建、获取、保存和清理
+    负责会话的创建、获取、保存和清理。
+    save_session 只标记会话为已修改，短暂延迟后合并写盘；
+    序列化（orjson）与文件写入在工作线程中执行，不阻塞事件循环。
     """
 
+    # 保存请求合并的延迟（秒）
+    SAVE_DEBOUNCE_SECONDS = 2.0
+
     _instance: Optional["SessionManager"] = None
 
     def __new__(cls, *args, **kwargs):
@@ -297,6 +303,11 @@ class SessionManager:
         self._sessions: dict[str, KokoroSession] = {}
         self._locks: dict[str, asyncio.Lock] = {}
 
+        # 延迟写盘
+        self._dirty: set[str] = set()
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
         # 确保数据目录存在
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -342,8 +353,7 @@ class SessionManager:
             return None
 
         try:
-            with open(file_path, encoding="utf-8") as f:
-                data = json.load(f)
+            data = orjson.loads(await asyncio.to_thread(file_path.read_bytes))
             session = KokoroSession.from_dict(data)
             logger.debug(f"从文件加载会话: {user_id}")
             return session
@@ -352,34 +362,70 @@ class SessionManager:
             return None
 
     async def save_session(self, user_id: str) -> bool:
-        """保存会话到文件"""
-        async with self._get_lock(user_id):
-            if user_id not in self._sessions:
-                return False
-
-            session = self._sessions[user_id]
-            file_path = self._get_file_path(user_id)
-
+        """标记会话需要保存，稍后与其他会话合并写盘"""
+        if user_id not in self._sessions:
+            return False
+
+        self._dirty.add(user_id)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._debounced_flush())
+        return True
+
+    async def _debounced_flush(self) -> None:
+        await asyncio.sleep(self.SAVE_DEBOUNCE_SECONDS)
+        # 写盘期间新的保存请求会安排下一轮写盘
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """立即写入所有已修改的会话，返回成功写入的数量"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+
+            user_ids = list(self._dirty)
+            self._dirty.clear()
+            # 在事件循环中生成快照，序列化与写盘交给工作线程
+            snapshots = [
+                (user_id, self._get_file_path(user_id), self._sessions[user_id].to_dict())
+                for user_id in user_ids
+                if user_id in self._sessions
+            ]
+            try:
+                failed = await asyncio.to_thread(self._write_snapshots, snapshots)
+            except Exception as e:
+                logger.error(f"保存会话失败: {e}")
+                failed = [user_id for user_id, _, _ in snapshots]
+
+            # 失败的会话保留修改标记，下次保存时重试
+            self._dirty.update(failed)
+            return len(snapshots) - len(failed)
+
+    @staticmethod
+    def _write_snapshots(snapshots: list[tuple[str, Path, dict]]) -> list[str]:
+        """序列化并原子写入会话文件（在工作线程中执行），返回写入失败的 user_id"""
+        failed = []
+        for user_id, file_path, data in snapshots:
             try:
-                data = session.to_dict()
                 temp_path = file_path.with_suffix(".json.tmp")
-
-                with open(temp_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-
+                temp_path.write_bytes(orjson.dumps(data))
                 os.replace(temp_path, file_path)
-                return True
             except Exception as e:
                 logger.error(f"保存会话失败 {user_id}: {e}")
-                return False
+                failed.append(user_id)
+        return failed
 
     async def save_all(self) -> int:
-        """保存所有会话"""
-        count = 0
-        for user_id in list(self._sessions.keys()):
-            if await self.save_session(user_id):
-                count += 1
-        return count
+        """立即保存所有会话"""
+        self._dirty.update(self._sessions.keys())
+        return await self.flush()
+
+    async def close(self) -> None:
+        """取消等待中的延迟写盘并立即写入所有已修改的会话"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
 
     async def get_waiting_sessions(self) -> list[KokoroSession]:
         """获取所有处于等待状态的会话"""